@@ -9,7 +9,13 @@ import sys
 
 
 class Arsenal():
-    """A collection of gun objects."""
+    """A collection of gun objects.
+
+    Alongside the gun rack the arsenal keeps an index of the guns by name and
+    of the gun names by type. Both are kept up to date by 'add_gun' and
+    'remove_gun_obj', so looking guns up by name doesn't have to search the
+    whole rack.
+    """
 
     def __init__(self, guns=None):
         """Initialize the arsenal."""
@@ -29,9 +35,8 @@ class Arsenal():
         -------
         TypeError: if guns is not an iterable of gun objects.
         """
-        self.num_in_storage = 0
+        self._empty_rack()
         if guns is None:
-            self.gun_rack = None
             return
         try:
             self.gun_rack = {}
@@ -39,18 +44,38 @@ class Arsenal():
                 self._add_gun_to_gunrack(gun)
             self.num_in_storage += len(guns)
         except (TypeError, AttributeError) as err:
-            self.gun_rack = None
-            self.num_in_storage = 0
+            self._empty_rack()
             raise TypeError("Arsenal.__init__(): guns argument must be"
                             " iterable of gun objects.",
                             file=sys.stderr) from err
 
+    def _empty_rack(self):
+        """Empty the gun rack and the indexes."""
+        self.gun_rack = None
+        self.num_in_storage = 0
+        self._guns_by_name = {}   # name -> list of guns in the order added
+        self._names_by_type = {}  # gun type -> set of gun names
+
     def _add_gun_to_gunrack(self, gun):
-        """Add a gun to the gun rack."""
+        """Add a gun to the gun rack and indexes."""
         try:
             self.gun_rack[gun.gun_type].append(gun)
         except KeyError:
             self.gun_rack[gun.gun_type] = [gun]
+        self._guns_by_name.setdefault(gun.name, []).append(gun)
+        self._names_by_type.setdefault(gun.gun_type, set()).add(gun.name)
+
+    def _remove_gun_from_indexes(self, gun):
+        """Remove the gun object from the indexes."""
+        same_name = self._guns_by_name[gun.name]
+        same_name.pop(next(i for i, named in enumerate(same_name)
+                           if named is gun))
+        if not same_name:
+            del self._guns_by_name[gun.name]
+        if not any(named.gun_type == gun.gun_type for named in same_name):
+            self._names_by_type[gun.gun_type].discard(gun.name)
+        if not self._names_by_type[gun.gun_type]:
+            del self._names_by_type[gun.gun_type]
 
     def add_gun(self, gun):
         """Add a gun to the arsenal."""
@@ -60,14 +85,26 @@ class Arsenal():
         self.num_in_storage += 1
 
     def remove_gun_obj(self, gun):
-        """Remove the given gun object from the arsenal."""
-        try:
-            self.gun_rack[gun.gun_type].remove(gun)
-            self.num_in_storage -= 1
-        except KeyError:
-            pass
+        """Remove the given gun object from the arsenal.
+
+        The first gun of the same type that is equal to the given gun is
+        removed, see 'Gun.__eq__'. Nothing happens if the arsenal has no
+        guns of its type.
+
+        Raises:
+        -------
+        ValueError - if there are guns of its type but none equal to it.
+        """
+        if gun.gun_type not in self._names_by_type:
+            return
+        rack = self.gun_rack[gun.gun_type]
+        removed = rack.pop(rack.index(gun))
+        if not rack:
+            del self.gun_rack[gun.gun_type]
+        self._remove_gun_from_indexes(removed)
+        self.num_in_storage -= 1
         if self.num_in_storage == 0:
-            self.gun_rack = None
+            self._empty_rack()
 
     def get_all_gun_types(self):
         """Get the gun types in the arsenal."""
@@ -81,21 +118,19 @@ class Arsenal():
         return guns
 
     def get_weapon_by_name(self, gun_name, gun_types_to_skip=None):
-        """Get a gun from the arsenal by name."""
-        if gun_types_to_skip is None:
-            gun_types_to_skip = []
+        """Get a gun from the arsenal by name.
 
-        for gun_type in self.gun_rack:
-            if gun_type in gun_types_to_skip:
-                continue
-            for gun in self.gun_rack[gun_type]:
-                if gun_name == gun.name:
-                    return gun
+        If more than one gun has the name the first one added is returned.
+        Guns whose type is in gun_types_to_skip are passed over.
+        """
+        for gun in self._guns_by_name.get(gun_name, ()):
+            if gun_types_to_skip is None or gun.gun_type not in gun_types_to_skip:
+                return gun
         return None
 
     def _is_gun_type(self, gun_type):
         """Check if the given gun type is in the arsenal."""
-        return gun_type in self.gun_rack
+        return gun_type in self._names_by_type
 
     def get_guns_or_types_and_return_valid_names(self, gun_or_type_names):
         """Get all guns that match the given weapon or class names.
@@ -113,15 +148,17 @@ class Arsenal():
         """
         valid_names = []
         guns_to_return = []
-        gun_types_to_skip = []
+        gun_types_to_skip = set()
+        seen_names = set()
 
         for gun_or_type_name in gun_or_type_names:
-            if gun_or_type_name in valid_names:
+            if gun_or_type_name in seen_names:
                 continue
+            seen_names.add(gun_or_type_name)
             if self._is_gun_type(gun_or_type_name):
                 guns_to_return.extend(self.gun_rack[gun_or_type_name])
                 valid_names.append(gun_or_type_name)
-                gun_types_to_skip.append(gun_or_type_name)
+                gun_types_to_skip.add(gun_or_type_name)
                 continue
 
             gun = self.get_weapon_by_name(gun_or_type_name,
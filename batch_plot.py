@@ -0,0 +1,178 @@
+"""Script to render many ttk figures in one go from a manifest file.
+
+Running plot_obj_ttk.py once per figure pays for python start up, importing
+matplotlib, building the arsenal and working out the ttk every time. This
+builds each arsenal once, works out the ttk curve of each gun once, however
+many figures it appears in, and renders the figures in a process pool on the
+non interactive 'Agg' backend. With profiling on (see profiling.py) the
+spans timed in the worker processes are added to this process's results.
+
+The manifest is a json list with an object per figure. 'data' and 'weapons'
+are required, every other key is optional and named after the plot_obj_ttk.py
+argument it sets, eg:
+
+[
+    {"data": "ttk_dat", "weapons": ["SMG", "M4A1"], "inc_ads": true,
+     "fig_name": "SMGs", "y_lim": [0, 1100]}
+]
+
+Functions:
+----------
+load_manifest()  - return the plot_obj_ttk arguments of each figure.
+figure_jobs()    - return everything needed to render each figure.
+render_figure()  - render and save a figure.
+render_figures() - render and save all the figures, in parallel.
+main()           - render the figures in the manifest given on the command line.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import file_sys
+import man_bit_plot
+import plot_obj_ttk
+import profiling
+from preset_arsenals import ARSENALS
+
+
+def _figure_args(entry):
+    """Return the plot_obj_ttk arguments for a manifest entry."""
+    args = plot_obj_ttk.build_parser().parse_args([entry["data"],
+                                                   *entry["weapons"]])
+    for key, value in entry.items():
+        if key in ("data", "weapons"):
+            continue
+        if not hasattr(args, key):
+            raise ValueError(f"Manifest figure has unknown setting '{key}'.")
+        setattr(args, key, value)
+    plot_obj_ttk.check_args(args)
+    return args
+
+def load_manifest(path):
+    """Return the plot_obj_ttk arguments for each figure in the manifest.
+
+    Raises:
+    -------
+    ValueError - if a figure has a setting plot_obj_ttk.py doesn't, or one of
+                 its min/max settings is malformed.
+    """
+    with open(path, encoding="utf-8") as manifest:
+        return [_figure_args(entry) for entry in json.load(manifest)]
+
+@profiling.profiled("batch.jobs")
+def figure_jobs(figure_args):
+    """Return the curves, title and styling of each figure.
+
+    Each arsenal is only built once, with just the guns the figures ask for,
+    and each gun's ttk curve only worked out once for a given range and ads
+    setting, however many figures use it. The jobs returned only hold plain
+    data so they can be sent to other processes.
+    """
+    wanted = {}
+    for args in figure_args:
+        wanted.setdefault(args.data, set()).update(args.weapons)
+    arsenals = {data: ARSENALS[data](names) for data, names in wanted.items()}
+    curves = {}
+    jobs = []
+    for args in figure_args:
+        guns, title_list = (arsenals[args.data]
+                            .get_guns_or_types_and_return_valid_names(
+                                args.weapons))
+        fig_curves = []
+        for gun in guns:
+            key = (id(gun), tuple(args.range), args.inc_ads, args.num_points)
+            if key not in curves:
+                curves[key] = plot_obj_ttk.ttk_curves(
+                    [gun], args.range, inc_ads=args.inc_ads,
+                    num_points=args.num_points)[0]
+            fig_curves.append(curves[key])
+        title = man_bit_plot.ttk_plot_title(title_list,
+                                            fig_name=args.fig_name,
+                                            ads_time=args.inc_ads)
+        jobs.append({"curves": fig_curves, "title": title,
+                     "y_lim": args.y_lim, "fig_size": args.fig_size,
+                     "f_size": args.f_size, "tick_size": args.tick_size,
+                     "dark_mode": args.dark_mode})
+    return jobs
+
+def _use_agg_backend():
+    """Make matplotlib render without a display."""
+    import matplotlib
+    matplotlib.use("Agg")
+
+def render_figure(job, save_path):
+    """Render the figure for the job and save it to the save_path directory.
+
+    Returns:
+    --------
+    str: the title of the figure, which is also its file name
+    """
+    import matplotlib.pyplot as plt
+
+    fig = man_bit_plot.plot_ttk_curves(job["curves"], job["title"],
+                                       y_lim=job["y_lim"],
+                                       fig_size=job["fig_size"],
+                                       f_size=job["f_size"],
+                                       tick_size=job["tick_size"],
+                                       dark_mode=job["dark_mode"])
+    with profiling.span("figure.save"):
+        fig.savefig(save_path + job["title"])
+    plt.close(fig)
+    return job["title"]
+
+def _render_figure_in_worker(job, save_path):
+    """Render the job's figure, returning its title and what was profiled."""
+    # forked workers start with a copy of the parent's results, drop them
+    profiling.reset()
+    title = render_figure(job, save_path)
+    return title, profiling.snapshot(clear=True)
+
+def render_figures(jobs, save_dir, workers=None):
+    """Render and save every job's figure using a pool of workers.
+
+    Inputs:
+    -------
+    jobs     - list of jobs from 'figure_jobs'
+    save_dir - the directory to save the figures in, made if it doesn't exist
+    workers  - the number of processes to render with, defaults to the number
+               of cpus. With 1 the figures are rendered in this process.
+
+    Returns:
+    --------
+    list of str: the titles of the figures saved, in the order of the jobs
+    """
+    save_path = file_sys.create_path(save_dir)
+    _use_agg_backend()
+    if workers == 1:
+        return [render_figure(job, save_path) for job in jobs]
+    titles = []
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_use_agg_backend) as pool:
+        for title, profiled in pool.map(_render_figure_in_worker, jobs,
+                                        [save_path] * len(jobs)):
+            profiling.merge(profiled)
+            titles.append(title)
+    return titles
+
+def main(argv=None):
+    """Render the figures in the manifest given on the command line."""
+    parser = argparse.ArgumentParser(description="Render every ttk figure in"
+                                     " a manifest file.")
+    parser.add_argument('manifest', type=str,
+                        help="json file listing the figures to make. See the"
+                        " module docstring for the format.")
+    parser.add_argument('--save', type=str, default="./plots/",
+                        help="The directory to save the figures in.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="The number of processes to render with.")
+    args = parser.parse_args(argv)
+
+    jobs = figure_jobs(load_manifest(args.manifest))
+    for title in render_figures(jobs, args.save, workers=args.workers):
+        print(f"Saved '{title}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare the memory used by gun objects against the old dict based layout.
+
+Before guns used __slots__ every instance carried a __dict__ and six numpy
+arrays of valid attachments. 'LegacyAk74' recreates that layout so the two
+can be measured side by side.
+
+Run this from project root via:
+python3 benchmarks/bench_memory.py [num_guns]
+"""
+
+import sys
+import os
+import tracemalloc
+import numpy as np
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gun_obj
+
+
+class LegacyAk74(gun_obj.Ak74):
+    """Ak74 laid out the way guns were before they had __slots__."""
+
+    # no __slots__ here, so instances get a __dict__ again
+    def __init__(self, gun_name="AK74"):
+        super().__init__(gun_name=gun_name)
+        self.val_barrels = np.array([gun_obj.HeavyBarrel, gun_obj.LongBarrel])
+        self.val_sights = np.array([])
+        self.val_c_sights = np.array([])
+        self.val_mags = np.array([])
+        self.val_s_rails = np.array([])
+        self.val_u_rails = np.array([])
+
+
+def bytes_per_gun(gun_class, num_guns):
+    """Return the average bytes allocated per gun when making num_guns."""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    guns = [gun_class(gun_name=f"gun {i}") for i in range(num_guns)]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del guns
+    return (after - before)/num_guns
+
+
+if __name__ == "__main__":
+    num_guns = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    legacy = bytes_per_gun(LegacyAk74, num_guns)
+    current = bytes_per_gun(gun_obj.Ak74, num_guns)
+    print(f"guns made: {num_guns}")
+    print(f"legacy layout : {legacy:8.0f} bytes per gun")
+    print(f"__slots__     : {current:8.0f} bytes per gun")
+    print(f"saving        : {1 - current/legacy:8.1%}")
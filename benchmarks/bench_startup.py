@@ -0,0 +1,89 @@
+"""Time how long the command line scripts take to import.
+
+Each script is imported in a fresh python with '-X importtime' and the
+cumulative import time of the script's module is read back from its report.
+The median of several runs is used as single runs are noisy. The scripts
+should never import the plotting or fitting libraries just to start up, so
+finding one of those imported is a failure too.
+
+Run this from project root via:
+python3 benchmarks/bench_startup.py [--runs 5] [--max_ms 400]
+
+Exits with 1 if a script imports a heavy library or, given --max_ms, takes
+longer than that to import.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (module, directory it is run from)
+ENTRY_POINTS = [("plot_obj_ttk", ROOT),
+                ("batch_plot", ROOT),
+                ("kill_change", ROOT),
+                ("patch_delta", ROOT),
+                ("export_tables", ROOT),
+                ("ttk_server", ROOT),
+                ("crossovers", ROOT),
+                ("expected_ttk", ROOT),
+                ("monte_carlo", ROOT),
+                ("model_accuracy", os.path.join(ROOT, "modeling_tools")),
+                ("polyfit_realdat", os.path.join(ROOT, "modeling_tools"))]
+
+HEAVY_MODULES = ("matplotlib", "scipy", "pandas", "pyarrow")
+
+
+def import_report(module, cwd):
+    """Return the importtime report and the heavy modules importing module loads.
+
+    Returns:
+    --------
+    tuple of (cumulative import time of the module in microseconds, sorted
+    list of the heavy modules that were imported)
+    """
+    code = (f"import sys; import {module};"
+            f" print(','.join(sorted(set({HEAVY_MODULES!r}) & sys.modules.keys())))")
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=cwd, capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    heavy = [name for name in proc.stdout.strip().split(",") if name]
+    return cumulative, heavy
+
+def main(argv=None):
+    """Print the import time of each script and check it against the limits."""
+    parser = argparse.ArgumentParser(description="Time how long the scripts"
+                                     " take to import.")
+    parser.add_argument('--runs', type=int, default=5,
+                        help="The number of times to import each script.")
+    parser.add_argument('--max_ms', type=float, default=None,
+                        help="Fail if a script takes longer than this to"
+                        " import.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module, cwd in ENTRY_POINTS:
+        reports = [import_report(module, cwd) for _ in range(args.runs)]
+        median_ms = statistics.median(us for us, _ in reports)/1000
+        heavy = reports[0][1]
+        status = "ok"
+        if heavy:
+            status = "imports " + ", ".join(heavy)
+            failed = True
+        elif args.max_ms is not None and median_ms > args.max_ms:
+            status = f"slower than {args.max_ms:g}ms"
+            failed = True
+        print(f"{module:16} {median_ms:8.1f}ms  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
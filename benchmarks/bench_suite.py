@@ -0,0 +1,304 @@
+"""Benchmarks of the damage model, arsenals and figure making.
+
+Each benchmark is timed over several samples, each sample running it enough
+times to take at least --min_time seconds, so the time per call is still
+accurate for the fast ones. The samples can be saved to a json baseline and a
+later run compared against it. A benchmark has regressed when it is both
+slower by more than --threshold and the samples show it is slower with a
+Mann-Whitney U test at the --alpha significance level, so noise alone doesn't
+fail the run.
+
+Run this from project root via:
+python3 benchmarks/bench_suite.py [--filter ttk] [--save baseline.json]
+                                  [--compare baseline.json]
+
+Exits with 1 if any benchmark regressed against the --compare baseline.
+Baselines depend on the machine, so make your own before comparing.
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import numpy as np
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gun_obj
+import plot_obj_ttk
+from arsenal import Arsenal
+from preset_arsenals import ARSENALS
+
+# bump if the layout of the saved baselines changes
+BASELINE_FORMAT = 1
+
+BENCHMARKS = {}  # name -> function doing the setup and returning the call
+
+
+def benchmark(name):
+    """Register the decorated setup function as the benchmark called name.
+
+    The setup function is called once and returns the function to time, so
+    that making the guns etc. isn't part of the timing.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+_DISTS = np.linspace(0, 300, 301).tolist()
+
+
+@benchmark("gun.shot_dam_at_range")
+def _shot_dam_at_range():
+    gun = gun_obj.Ak74()
+    return lambda: [gun.shot_dam_at_range(dist) for dist in _DISTS]
+
+@benchmark("gun.btk")
+def _btk():
+    gun = gun_obj.Ak74()
+    return lambda: [gun.btk(dist) for dist in _DISTS]
+
+@benchmark("gun.ttk")
+def _ttk():
+    gun = gun_obj.Ak74()
+    return lambda: [gun.ttk(dist, inc_ads=True) for dist in _DISTS]
+
+@benchmark("gun.swap_attach")
+def _swap_attach():
+    gun = gun_obj.Ak74()
+
+    def swap():
+        gun.swap_attach(gun_obj.HeavyBarrel)
+        gun.swap_attach(gun_obj.LongBarrel)
+        gun.swap_attach(gun_obj.EmptyBarrel)
+    return swap
+
+@benchmark("gun.apply_loadout")
+def _apply_loadout():
+    gun = gun_obj.Ak74()
+    loadouts = [{"barrel": gun_obj.HeavyBarrel, "sight": gun_obj.EmptySight},
+                {"barrel": gun_obj.EmptyBarrel, "sight": gun_obj.EmptySight}]
+    return lambda: [gun.apply_loadout(loadout) for loadout in loadouts]
+
+@benchmark("gun.with_attachments")
+def _with_attachments():
+    gun = gun_obj.Ak74()
+    return lambda: gun.with_attachments(barrel=gun_obj.HeavyBarrel,
+                                        name="AK74_HB")
+
+@benchmark("arsenal.build")
+def _arsenal_build():
+    guns = ARSENALS["ttk_dat"]().get_all_guns()
+    return lambda: Arsenal(guns)
+
+@benchmark("arsenal.lookup")
+def _arsenal_lookup():
+    arsenal = ARSENALS["ttk_dat"]()
+    names = ["SMG", "M4A1", "AK74", "LMG", "SCAR-H", "not a gun"]
+    return lambda: arsenal.get_guns_or_types_and_return_valid_names(names)
+
+# the arsenal made by each preset's function is what gets timed
+for _name, _make_arsenal in ARSENALS.items():
+    benchmark(f"preset_arsenals.{_name}")(
+        lambda make_arsenal=_make_arsenal: make_arsenal)
+
+@benchmark("expected_ttk.head_sweep")
+def _expected_ttk_head_sweep():
+    import expected_ttk
+
+    guns = ARSENALS["ttk_dat"]().get_all_guns()
+    head_probs = np.linspace(0, 1, 101)
+    return lambda: expected_ttk.expected_ttk(guns, _DISTS,
+                                             head_prob=head_probs,
+                                             hit_prob=0.8)
+
+@benchmark("monte_carlo.simulate")
+def _monte_carlo_simulate():
+    import monte_carlo
+
+    guns = ARSENALS["ttk_dat"]().get_all_guns()
+    return lambda: monte_carlo.simulate(guns, 40, engagements=10**5,
+                                        head_prob=0.2, hit_prob=0.8,
+                                        reaction_ms=(200, 50), seed=0)
+
+@benchmark("plot_obj_ttk.figure")
+def _figure():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    args = plot_obj_ttk.build_parser().parse_args(["ttk_dat", "SMG", "M4A1",
+                                                   "--inc_ads", "True"])
+    plot_obj_ttk.check_args(args)
+
+    def make_figure():
+        fig, _ = plot_obj_ttk.make_ttk_figure(args,
+                                              ARSENALS[args.data](args.weapons))
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+    return make_figure
+
+
+def measure(func, repeats=15, min_time=0.02):
+    """Return the seconds per call of func in each of repeats samples.
+
+    The number of calls per sample is doubled until a sample takes at least
+    min_time seconds.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= min_time:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start)/loops)
+    return samples
+
+def run_benchmarks(names, repeats=15, min_time=0.02):
+    """Return the samples of each of the named benchmarks.
+
+    Returns:
+    --------
+    dict of benchmark name -> {"median": seconds, "samples": list of seconds}
+    """
+    results = {}
+    for name in names:
+        samples = measure(BENCHMARKS[name](), repeats=repeats,
+                          min_time=min_time)
+        results[name] = {"median": statistics.median(samples),
+                         "samples": samples}
+    return results
+
+def mann_whitney_p(baseline, current):
+    """Return the p value of current being slower than baseline.
+
+    This is the one sided Mann-Whitney U test using the normal approximation,
+    with the variance corrected for ties.
+    """
+    n_base, n_cur = len(baseline), len(current)
+    values = np.concatenate([baseline, current])
+    order = np.argsort(values, kind="stable")
+    ranks = np.empty(values.size)
+    ranks[order] = np.arange(1, values.size + 1)
+    # tied values share the mean of their ranks
+    uniques, inverse, counts = np.unique(values, return_inverse=True,
+                                         return_counts=True)
+    ranks = (np.bincount(inverse, weights=ranks)/counts)[inverse]
+    u_cur = ranks[n_base:].sum() - n_cur*(n_cur + 1)/2
+    total = n_base + n_cur
+    tie_term = ((counts**3 - counts).sum()/(total*(total - 1))
+                if uniques.size < total else 0)
+    variance = n_base*n_cur/12*((total + 1) - tie_term)
+    if variance == 0:
+        return 1.0
+    # continuity corrected z of the current samples being larger
+    z = (u_cur - n_base*n_cur/2 - 0.5)/math.sqrt(variance)
+    return 0.5*math.erfc(z/math.sqrt(2))
+
+def compare(baseline, results, threshold=0.1, alpha=0.01):
+    """Return the comparison of each benchmark in both runs.
+
+    Returns:
+    --------
+    list of (name, median seconds in baseline, median seconds now, p value,
+    regressed bool) tuples
+    """
+    rows = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        p_value = mann_whitney_p(old["samples"], result["samples"])
+        regressed = (result["median"] > old["median"]*(1 + threshold)
+                     and p_value < alpha)
+        rows.append((name, old["median"], result["median"], p_value,
+                     regressed))
+    return rows
+
+def save_baseline(path, results):
+    """Save the results with details of the machine they were timed on."""
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump({"format": BASELINE_FORMAT,
+                   "python": platform.python_version(),
+                   "numpy": np.__version__,
+                   "machine": platform.machine(),
+                   "benchmarks": results}, out, indent=1)
+
+def load_baseline(path):
+    """Return the benchmark results saved in the baseline at path.
+
+    Raises:
+    -------
+    ValueError - if the baseline was saved in a different format.
+    """
+    with open(path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get("format") != BASELINE_FORMAT:
+        raise ValueError(f"'{path}' isn't a format {BASELINE_FORMAT}"
+                         " baseline.")
+    return baseline["benchmarks"]
+
+def main(argv=None):
+    """Run the benchmarks and compare them against a baseline if given one."""
+    parser = argparse.ArgumentParser(description="Benchmark the damage model,"
+                                     " arsenals and figure making.")
+    parser.add_argument('--filter', type=str, default="",
+                        help="Only run the benchmarks with this in their name.")
+    parser.add_argument('--repeats', type=int, default=15,
+                        help="The number of samples to take of each benchmark.")
+    parser.add_argument('--min_time', type=float, default=0.02,
+                        help="The least time in seconds each sample runs for.")
+    parser.add_argument('--save', type=str, default=None,
+                        help="Save the results as a json baseline here.")
+    parser.add_argument('--compare', type=str, default=None,
+                        help="Compare the results with this json baseline.")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="The fraction slower a benchmark can get before"
+                        " it counts as a regression.")
+    parser.add_argument('--alpha', type=float, default=0.01,
+                        help="The significance level the slow down must"
+                        " reach to count as a regression.")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare is not None:
+        try:
+            baseline = load_baseline(args.compare)
+        except (OSError, ValueError) as err:
+            parser.error(str(err))
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, repeats=args.repeats,
+                             min_time=args.min_time)
+    if args.save is not None:
+        save_baseline(args.save, results)
+
+    if baseline is None:
+        for name, result in results.items():
+            print(f"{name:32} {result['median']*1e6:12.1f}us")
+        return 0
+    failed = False
+    for name, old, new, p_value, regressed in compare(
+            baseline, results, threshold=args.threshold, alpha=args.alpha):
+        status = "REGRESSED" if regressed else "ok"
+        failed |= regressed
+        print(f"{name:32} {old*1e6:12.1f}us -> {new*1e6:12.1f}us"
+              f" ({new/old - 1:+7.1%}, p={p_value:.3g})  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""Script to find the distances where one gun's ttk overtakes another's.
+
+A gun's btk only changes at the distances where its shot damage crosses
+100/btk, which 'Gun.btk_intervals' finds exactly from the plateau, cubic
+falloff, plateau damage profile. Between those steps its ttk is a constant
+plus the bullet's time of flight, a straight line in distance. So splitting
+the distances at the btk steps of every gun leaves segments over which the
+difference in ttk of any two guns is a straight line too. Their ttk cross
+either where that line goes through zero inside a segment, or at a btk step
+where the difference jumps from one side of zero to the other.
+
+The lines of every pair of guns over every segment are solved at once as
+arrays rather than sampling the ttk curves densely and comparing them.
+
+Functions:
+----------
+all_crossovers() - return where each pair of guns swap which is faster.
+crossovers()     - return where two guns swap which is faster.
+main()           - print the crossovers of the guns given on the command line.
+"""
+
+import argparse
+from math import inf
+import numpy as np
+
+import ttk_matrix
+from preset_arsenals import ARSENALS
+
+# pairs x segments cells worked out at once
+_CHUNK_CELLS = 2**22
+
+
+def _segment_ttks(guns, min_dist, max_dist, inc_ads):
+    """Return the segments between every btk step and each gun's ttk on them.
+
+    See 'ttk_matrix._segment_lines' for what is returned.
+    """
+    steps = []
+    for gun in guns:
+        intervals = gun.btk_intervals(min_dist, max_dist, inc_ads=inc_ads)
+        steps.append(([interval[0] for interval in intervals],
+                      np.array([interval[3] for interval in intervals]),
+                      gun.velocity))
+    return ttk_matrix._segment_lines(steps, max_dist)
+
+def _pair_crossovers(starts, ends, const_diff, slope_diff):
+    """Return where the sign of each pair's difference in ttk changes.
+
+    Inputs:
+    -------
+    starts, ends - (segments,) arrays, where the segments start and end
+    const_diff   - (pairs x segments) array, the difference in ttk less tof
+    slope_diff   - (pairs x 1) array, the difference in ms of flight per meter
+
+    Returns:
+    --------
+    tuple of (pair, distance and the sign of the difference after the
+    distance) arrays, one entry per crossover.
+    """
+    roots, inside = ttk_matrix._line_crossings(starts, ends, const_diff,
+                                                slope_diff)
+    # past the last btk step nothing changes bar the lines, so any distance
+    # after the root will do for the right hand piece
+    far_ends = np.where(ends == inf, starts + 2, ends)
+    splits = np.where(inside, roots, (starts + far_ends)/2)
+    far_ends = np.where(inside & (ends == inf), splits + 2, far_ends)
+
+    # each segment is split at its root (if any) into a left and right piece
+    pieces = np.empty(const_diff.shape + (2,))
+    pieces[..., 0] = (starts + splits)/2
+    pieces[..., 1] = (splits + far_ends)/2
+    pieces = pieces.reshape(len(const_diff), -1)
+    signs = np.sign(np.repeat(const_diff, 2, axis=1) + pieces*slope_diff)
+    # the distance between each piece and the next
+    borders = np.empty(const_diff.shape + (2,))
+    borders[..., 0] = splits
+    borders[..., 1] = np.append(starts[1:], inf)
+    borders = borders.reshape(len(const_diff), -1)[:, :-1]
+
+    # where the ttk are equal carry the last side the difference was on
+    cols = np.arange(signs.shape[1])
+    last_nonzero = np.maximum.accumulate(np.where(signs != 0, cols, 0), axis=1)
+    signs = np.take_along_axis(signs, last_nonzero, axis=1)
+    pairs, cols = np.nonzero((signs[:, 1:] != signs[:, :-1])
+                             & (signs[:, :-1] != 0))
+    # a change after equal pieces is placed where the ttk became equal
+    return (pairs, borders[pairs, last_nonzero[pairs, cols]],
+            signs[pairs, cols + 1])
+
+def all_crossovers(guns, min_dist=0, max_dist=inf, inc_ads=False):
+    """Return every distance where a pair of the guns swap which is faster.
+
+    Inputs:
+    -------
+    guns     - an Arsenal or iterable of gun objects
+    min_dist - the distance to start from, positive value, meters
+    max_dist - the distance to stop at, meters. Defaults to infinity.
+    inc_ads  - bool, include the aim down sights time in the ttk
+
+    Returns:
+    --------
+    list of (gun_a, gun_b, crossings) tuples for each pair of guns that
+    cross, with gun_a before gun_b in the order given. crossings is a list of
+    (distance, the faster of the two guns after it) tuples ordered by
+    distance.
+
+    Raises:
+    -------
+    ValueError - if min_dist is negative or not less than max_dist
+    """
+    guns = ttk_matrix._gun_list(guns)
+    if len(guns) < 2:
+        return []
+    starts, ends, consts, slopes = _segment_ttks(guns, min_dist, max_dist,
+                                                 inc_ads)
+    firsts, seconds = np.triu_indices(len(guns), k=1)
+    found = {}
+    chunk = max(1, _CHUNK_CELLS // (2*starts.size))
+    for begin in range(0, firsts.size, chunk):
+        a = firsts[begin:begin + chunk]
+        b = seconds[begin:begin + chunk]
+        pairs, dists, signs = _pair_crossovers(starts, ends,
+                                               consts[a] - consts[b],
+                                               slopes[a] - slopes[b])
+        for pair, dist, sign in zip(pairs.tolist(), dists.tolist(),
+                                    signs.tolist()):
+            first, second = a[pair], b[pair]
+            # the difference is a - b, so positive means b is faster
+            found.setdefault((first, second), []).append(
+                (dist, guns[second] if sign > 0 else guns[first]))
+    return [(guns[first], guns[second], crossings)
+            for (first, second), crossings in sorted(found.items())]
+
+def crossovers(gun_a, gun_b, min_dist=0, max_dist=inf, inc_ads=False):
+    """Return the distances where the two guns swap which is faster.
+
+    Returns:
+    --------
+    list of (distance, the faster of the two guns after it) tuples ordered by
+    distance, see 'all_crossovers'.
+    """
+    found = all_crossovers([gun_a, gun_b], min_dist=min_dist,
+                           max_dist=max_dist, inc_ads=inc_ads)
+    return found[0][2] if found else []
+
+
+def main(argv=None):
+    """Print where the guns given on the command line overtake each other."""
+    parser = argparse.ArgumentParser(description="Find the distances where"
+                                     " one gun's ttk overtakes another's.")
+    parser.add_argument('data', type=str, choices=list(ARSENALS.keys()),
+                        help="The data the weapons are from.")
+    parser.add_argument('weapons', type=str, nargs='+',
+                        help="The names of weapons or the class of weapons to"
+                        " compare, at least two guns.")
+    parser.add_argument('--range', type=float, default=[0, 150], nargs=2,
+                        help="The min and max distance to target.")
+    parser.add_argument('--inc_ads', action='store_true',
+                        help="Include the ads time in the ttk.")
+    args = parser.parse_args(argv)
+
+    guns, _ = (ARSENALS[args.data](args.weapons)
+               .get_guns_or_types_and_return_valid_names(args.weapons))
+    if len(guns) < 2:
+        parser.error("Give at least two guns to compare.")
+    try:
+        found = all_crossovers(guns, min_dist=args.range[0],
+                               max_dist=args.range[1], inc_ads=args.inc_ads)
+    except ValueError as err:
+        parser.error(str(err))
+    for gun_a, gun_b, crossings in found:
+        for dist, faster in crossings:
+            print(f"{gun_a.name:>14} x {gun_b.name:<14} {dist:8.2f}m"
+                  f"  {faster.name} faster after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Expected ttk for when not every shot hits, or hits the body.
+
+'Gun.ttk' assumes every shot hits the body. Here each shot hits with chance
+hit_prob, and a hit is a headshot with chance head_prob, doing _HEAD_MULT
+times the body damage. A hit only ever does one of those two amounts, so the
+health left after k hits only depends on how many of them were headshots.
+The dynamic programme over the health left is then one over the number of
+headshots: the chances of j headshots in k hits are built up from those in
+k - 1 hits, for every head_prob at once. The target dies on the first hit
+whose headshots so far are enough, which gives the exact distribution of the
+hits needed. The misses on the way add a negative binomial number of shots
+on top. The mean and percentiles of the ttk follow from the distribution of
+the shots fired.
+
+Distances where the guns do the same damage, eg: along a plateau, need the
+same headshots per hit, so each distinct pattern is only worked out once.
+
+Functions:
+----------
+expected_ttk() - return the mean and percentiles of the ttk of guns over
+                 distances for each head and hit chance.
+main()         - print the expected ttk of the guns given on the command line.
+"""
+
+import argparse
+import numpy as np
+
+import profiling
+import ttk_matrix
+from preset_arsenals import ARSENALS
+
+# slack for the rounding in the summed up chances when finding percentiles
+_CDF_TOL = 1e-12
+
+
+def _binomial_survival(probs, max_trials):
+    """Return the chance of at least j successes in k trials for each prob.
+
+    Returns:
+    --------
+    np.ndarray (probs x max_trials + 1 x max_trials + 2), indexed by k then j
+    """
+    pmf = np.zeros((probs.size, max_trials + 1, max_trials + 2))
+    pmf[:, 0, 0] = 1
+    prob = probs[:, None]
+    for trials in range(1, max_trials + 1):
+        pmf[:, trials] = pmf[:, trials - 1]*(1 - prob)
+        pmf[:, trials, 1:] += pmf[:, trials - 1, :-1]*prob
+    return np.cumsum(pmf[..., ::-1], axis=-1)[..., ::-1]
+
+def _heads_needed(dam, head_mult, max_hits):
+    """Return the headshots needed among k hits to kill, for k = 0..max_hits.
+
+    Inputs:
+    -------
+    dam       - (guns x distances) array, the body damage per hit
+    head_mult - (guns x 1) array, the headshot damage multiplier
+
+    Returns:
+    --------
+    int np.ndarray (guns x distances x max_hits + 1), k + 1 where k hits
+    can't kill however many are headshots.
+    """
+    hits = np.arange(max_hits + 1)
+    dam = dam[..., None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        needed = np.ceil((100 - hits*dam)/(dam*head_mult[..., None] - dam))
+    needed = np.where(np.isfinite(needed), np.clip(needed, 1, hits + 1),
+                      hits + 1)
+    # no headshots needed from the btk on, found as Gun.btk does to match it
+    return np.where(hits >= np.ceil(100/dam), 0, needed).astype(int)
+
+def _shots_percentiles(hits_pmf, hit_probs, fractions):
+    """Return the fewest shots that kill with each chance in fractions.
+
+    Inputs:
+    -------
+    hits_pmf  - (scenarios x patterns x hits + 1) array, the chance the kill
+                takes each number of hits
+    hit_probs - (scenarios,) array, the chance a shot hits
+    fractions - list of the chances, more than 0 and up to 1
+
+    Returns:
+    --------
+    np.ndarray (scenarios x patterns x fractions) of shots, infinite for a
+    chance of 1 when shots can miss as there's always a chance of needing
+    more.
+    """
+    max_hits = hits_pmf.shape[-1] - 1
+    found = np.zeros(hits_pmf.shape[:2] + (len(fractions),))
+    found[..., np.array(fractions) == 1] = np.where(
+        hit_probs < 1, np.inf, 0)[:, None, None]
+    # the chance of each number of hits in the shots so far, capped at
+    # max_hits as more never matters
+    hits_so_far = np.zeros((hit_probs.size, max_hits + 1))
+    hits_so_far[:, 0] = 1
+    prob = hit_probs[:, None]
+    shots = 0
+    while not found.all():
+        shots += 1
+        capped = hits_so_far[:, -1:].copy()
+        hits_so_far[:, 1:] = (hits_so_far[:, 1:]*(1 - prob)
+                              + hits_so_far[:, :-1]*prob)
+        hits_so_far[:, -1:] += capped*prob
+        hits_so_far[:, 0] *= 1 - hit_probs
+        at_least = np.cumsum(hits_so_far[:, ::-1], axis=1)[:, ::-1]
+        cdf = np.einsum("nuk,nk->nu", hits_pmf, at_least)
+        for col, fraction in enumerate(fractions):
+            reached = (found[..., col] == 0) & (cdf >= fraction - _CDF_TOL)
+            found[reached, col] = shots
+    return found
+
+@profiling.profiled("ttk.expected")
+def expected_ttk(guns, dists, head_prob=0, hit_prob=1, percentiles=(50, 90),
+                 inc_ads=False):
+    """Return the mean and percentiles of the ttk of each gun at each distance.
+
+    head_prob and hit_prob can be arrays, eg: np.linspace(0, 1, 101) to sweep
+    the headshot chance, and are broadcast against each other. The results
+    have their broadcast shape followed by (guns x distances). With
+    head_prob=0 and hit_prob=1 the ttk is exactly that of 'Gun.ttk'.
+
+    Inputs:
+    -------
+    guns        - an Arsenal or iterable of gun objects
+    dists       - 1d array like of distances to the target, positive values,
+                  meters
+    head_prob   - the chance a shot that hits is a headshot, 0 to 1
+    hit_prob    - the chance a shot hits, more than 0 and up to 1
+    percentiles - iterable of the percentiles of the ttk to return, more than
+                  0 and up to 100.
+                  The nth percentile is the smallest ttk that the kill takes
+                  no longer than with at least n% chance. If shots can miss
+                  the 100th is infinite.
+    inc_ads     - bool, include the aim down sights time in the ttk
+
+    Returns:
+    --------
+    dict with the keys:
+        "names"       - list of str, the gun name for each row
+        "dists"       - np.ndarray, the distances for each column
+        "head_prob"   - np.ndarray, head_prob broadcast against hit_prob
+        "hit_prob"    - np.ndarray, hit_prob broadcast against head_prob
+        "mean_hits"   - np.ndarray, the mean number of hits to kill
+        "mean"        - np.ndarray, the mean ttk in ms
+        "percentiles" - dict of percentile -> np.ndarray of the ttk in ms
+
+    Raises:
+    -------
+    ValueError - if any of the distances are negative or a chance or
+                 percentile is out of range.
+    """
+    head_prob, hit_prob = np.broadcast_arrays(
+        np.asarray(head_prob, dtype=float), np.asarray(hit_prob, dtype=float))
+    if not np.all((head_prob >= 0) & (head_prob <= 1)):
+        raise ValueError("expected_ttk: head_prob must be between 0 and 1.")
+    if not np.all((hit_prob > 0) & (hit_prob <= 1)):
+        raise ValueError("expected_ttk: hit_prob must be more than 0 and at"
+                         " most 1.")
+    percentiles = list(percentiles)
+    if not all(0 < percentile <= 100 for percentile in percentiles):
+        raise ValueError("expected_ttk: percentiles must be more than 0 and"
+                         " at most 100.")
+    guns = ttk_matrix._gun_list(guns)
+    table = ttk_matrix.ttk_matrix(guns, dists)
+    cols = ttk_matrix.pack_guns(guns)
+    heads, hits = head_prob.ravel(), hit_prob.ravel()
+
+    max_hits = int(table["btk"].max(initial=1))
+    needed = _heads_needed(table["dam"], cols["head_mult"], max_hits)
+    patterns, cells = np.unique(needed.reshape(-1, max_hits + 1), axis=0,
+                                return_inverse=True)
+    cells = cells.reshape(table["btk"].shape)
+    # chance the target is dead after k hits, then of it dying on hit k
+    dead = _binomial_survival(heads, max_hits)[
+        :, np.arange(max_hits + 1), patterns]
+    hits_pmf = np.diff(dead, axis=-1, prepend=0)
+    mean_hits = hits_pmf @ np.arange(max_hits + 1)
+
+    shots = _shots_percentiles(hits_pmf, hits, [percentile/100 for percentile
+                                                in percentiles])
+    shots = shots[:, cells]
+
+    grid = head_prob.shape + table["btk"].shape
+    # same order of operations as Gun.ttk
+    tof = table["dists"].reshape(1, -1)/cols["velocity"]*1000
+    ads_time = cols["aim_down"]*1000 if inc_ads else 0
+
+    def shots_to_ttk(fired):
+        return 1/cols["rof"] * 60000 * (fired - 1) + tof + ads_time
+
+    return {"names": table["names"], "dists": table["dists"],
+            "head_prob": head_prob, "hit_prob": hit_prob,
+            "mean_hits": mean_hits[:, cells].reshape(grid),
+            "mean": shots_to_ttk(
+                mean_hits[:, cells]/hits[:, None, None]).reshape(grid),
+            "percentiles": {percentile: shots_to_ttk(
+                shots[..., col]).reshape(grid)
+                            for col, percentile in enumerate(percentiles)}}
+
+
+def main(argv=None):
+    """Print the expected ttk of the guns given on the command line."""
+    parser = argparse.ArgumentParser(description="Find the expected ttk of"
+                                     " guns when shots can miss or hit the"
+                                     " head.")
+    parser.add_argument('data', type=str, choices=list(ARSENALS.keys()),
+                        help="The data the weapons are from.")
+    parser.add_argument('weapons', type=str, nargs='+',
+                        help="The names of weapons or the class of weapons.")
+    parser.add_argument('--dist', type=float, default=20,
+                        help="The distance to target.")
+    parser.add_argument('--head', type=float, default=0.2,
+                        help="The chance a hit is a headshot, 0 to 1.")
+    parser.add_argument('--hit', type=float, default=1,
+                        help="The chance a shot hits, 0 to 1.")
+    parser.add_argument('--inc_ads', action='store_true',
+                        help="Include the ads time in the ttk.")
+    args = parser.parse_args(argv)
+
+    guns, _ = (ARSENALS[args.data](args.weapons)
+               .get_guns_or_types_and_return_valid_names(args.weapons))
+    try:
+        found = expected_ttk(guns, [args.dist], head_prob=args.head,
+                             hit_prob=args.hit, percentiles=(10, 50, 90),
+                             inc_ads=args.inc_ads)
+    except ValueError as err:
+        parser.error(str(err))
+    print(f"{'gun':14} {'mean ms':>9} {'p10 ms':>9} {'p50 ms':>9}"
+          f" {'p90 ms':>9}")
+    for row, name in enumerate(found["names"]):
+        print(f"{name:14} {found['mean'][row, 0]:9.1f}"
+              + "".join(f" {found['percentiles'][percentile][row, 0]:9.1f}"
+                        for percentile in (10, 50, 90)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Script to export the damage, btk and ttk tables of guns to files.
+
+Writes the guns x distances tables worked out by ttk_matrix in formats other
+programs can read without scraping figures:
+
+    csv     - a row per gun and distance: name, dist, dam, btk, ttk
+    parquet - the same columns as the csv, needs pyarrow installed
+    npy     - a directory of .npy files: names, dists and the (guns x
+              distances) dam, btk and ttk arrays
+    npz     - the npy arrays in one uncompressed .npz file
+
+The tables are worked out a chunk of guns at a time and written as they go,
+so the whole grid is never held in memory. 'load_tables' memory maps the npy
+and npz arrays, so slices of them can be read without loading or copying the
+rest.
+
+Functions:
+----------
+table_chunks()  - yield the tables a chunk of guns at a time.
+export_tables() - write the tables of the guns to a file in the given format.
+load_tables()   - return the arrays of an npy or npz export, memory mapped.
+main()          - export the tables asked for on the command line.
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+
+import ttk_matrix
+from preset_arsenals import ARSENALS
+
+FORMATS = ("csv", "parquet", "npy", "npz")
+_TABLES = ("dam", "btk", "ttk")
+_DTYPES = {"dam": np.float64, "btk": np.int64, "ttk": np.float64}
+# cells worked out at once, ~3 * 8 bytes each
+_DEFAULT_CHUNK_CELLS = 2**20
+
+
+def table_chunks(guns, dists, inc_ads=False, chunk_cells=_DEFAULT_CHUNK_CELLS):
+    """Yield the damage, btk and ttk tables a chunk of guns at a time.
+
+    Each chunk has as many guns as fit in chunk_cells cells, but at least one.
+
+    Yields:
+    -------
+    tuple of (index of the first gun in the chunk, dict as returned by
+    'ttk_matrix.ttk_matrix' for the guns in the chunk)
+    """
+    guns = ttk_matrix._gun_list(guns)
+    dists = np.asarray(dists, dtype=float)
+    guns_per_chunk = max(1, chunk_cells // max(1, dists.size))
+    for start in range(0, len(guns), guns_per_chunk):
+        yield start, ttk_matrix.ttk_matrix(guns[start:start + guns_per_chunk],
+                                           dists, inc_ads=inc_ads)
+
+def _write_csv(path, chunks):
+    """Write the chunks as csv, a row per gun and distance."""
+    with open(path, "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(["name", "dist"] + list(_TABLES))
+        for _, table in chunks:
+            dists = table["dists"].tolist()
+            for row, name in enumerate(table["names"]):
+                writer.writerows(zip([name] * len(dists), dists,
+                                     table["dam"][row].tolist(),
+                                     table["btk"][row].tolist(),
+                                     table["ttk"][row].tolist()))
+
+def _write_parquet(path, chunks):
+    """Write the chunks as parquet, a row group per chunk.
+
+    Raises:
+    -------
+    ImportError - if pyarrow isn't installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise ImportError("Exporting parquet needs pyarrow, install it with"
+                          " 'pip install pyarrow'.") from err
+
+    schema = pa.schema([("name", pa.string()), ("dist", pa.float64()),
+                        ("dam", pa.float64()), ("btk", pa.int64()),
+                        ("ttk", pa.float64())])
+    with pq.ParquetWriter(path, schema) as writer:
+        for _, table in chunks:
+            num_guns, num_dists = table["btk"].shape
+            columns = {"name": np.repeat(table["names"], num_dists),
+                       "dist": np.tile(table["dists"], num_guns)}
+            columns.update({key: table[key].ravel() for key in _TABLES})
+            writer.write_table(pa.table(columns, schema=schema))
+
+def _write_npy(path, names, dists, chunks):
+    """Write the chunks into .npy files in the directory at path."""
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, "names.npy"), np.array(names, dtype=str))
+    np.save(os.path.join(path, "dists.npy"), dists)
+    arrays = {key: np.lib.format.open_memmap(os.path.join(path, key + ".npy"),
+                                             mode="w+", dtype=_DTYPES[key],
+                                             shape=(len(names), dists.size))
+              for key in _TABLES}
+    for start, table in chunks:
+        for key, array in arrays.items():
+            array[start:start + len(table["names"])] = table[key]
+    for array in arrays.values():
+        array.flush()
+
+def _write_npz(path, names, dists, chunks):
+    """Write the chunks into an uncompressed .npz file at path.
+
+    The arrays are written to .npy files first and then copied into the zip
+    a block at a time. They are stored rather than compressed so that
+    'load_tables' can memory map them.
+    """
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))
+                                     ) as tmp_dir:
+        _write_npy(tmp_dir, names, dists, chunks)
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED,
+                             allowZip64=True) as npz:
+            for key in ("names", "dists") + _TABLES:
+                with open(os.path.join(tmp_dir, key + ".npy"), "rb") as npy, \
+                        npz.open(key + ".npy", "w", force_zip64=True) as member:
+                    shutil.copyfileobj(npy, member)
+
+def export_tables(guns, dists, path, fmt, inc_ads=False,
+                  chunk_cells=_DEFAULT_CHUNK_CELLS):
+    """Write the damage, btk and ttk of each gun at each distance to path.
+
+    Inputs:
+    -------
+    guns        - an Arsenal or iterable of gun objects
+    dists       - 1d array like of distances to the target, meters
+    path        - where to write the tables. A directory for "npy", a file
+                  for the rest.
+    fmt         - str, one of FORMATS
+    inc_ads     - bool, include the aim down sights time in the ttk
+    chunk_cells - int, roughly how many cells of each table to hold in memory
+
+    Raises:
+    -------
+    ValueError  - if the format is unknown or any distances are negative.
+    ImportError - if the format is "parquet" and pyarrow isn't installed.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', use one of"
+                         f" {', '.join(FORMATS)}.")
+    guns = ttk_matrix._gun_list(guns)
+    dists = np.asarray(dists, dtype=float)
+    if np.any(dists < 0):
+        raise ValueError("export_tables: distances must be positive.")
+    chunks = table_chunks(guns, dists, inc_ads=inc_ads,
+                          chunk_cells=chunk_cells)
+    if fmt == "csv":
+        _write_csv(path, chunks)
+    elif fmt == "parquet":
+        _write_parquet(path, chunks)
+    elif fmt == "npy":
+        _write_npy(path, [gun.name for gun in guns], dists, chunks)
+    else:
+        _write_npz(path, [gun.name for gun in guns], dists, chunks)
+
+def _npz_member_memmap(path, info):
+    """Return the stored .npy member of the npz file memory mapped."""
+    with open(path, "rb") as npz_file:
+        # the data follows the member's local header, whose name and extra
+        # field lengths can differ from those in the central directory
+        npz_file.seek(info.header_offset + 26)
+        name_len, extra_len = np.frombuffer(npz_file.read(4), dtype="<u2")
+        npz_file.seek(info.header_offset + 30 + int(name_len) + int(extra_len))
+        version = np.lib.format.read_magic(npz_file)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(npz_file)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(npz_file)
+        offset = npz_file.tell()
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape,
+                     order="F" if fortran else "C")
+
+def load_tables(path):
+    """Return the arrays of an "npy" or "npz" export.
+
+    The dam, btk, ttk and dists arrays are memory mapped read only, so only
+    the parts of them that are used get read from disk.
+
+    Returns:
+    --------
+    dict with the keys "names", "dists", "dam", "btk" and "ttk"
+
+    Raises:
+    -------
+    ValueError - if path is a compressed npz file, which can't be mapped.
+    """
+    if os.path.isdir(path):
+        return {key: np.load(os.path.join(path, key + ".npy"), mmap_mode="r")
+                for key in ("names", "dists") + _TABLES}
+    arrays = {}
+    with zipfile.ZipFile(path) as npz:
+        for info in npz.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"'{info.filename}' in '{path}' is"
+                                 " compressed so can't be memory mapped.")
+            arrays[info.filename[:-len(".npy")]] = _npz_member_memmap(path,
+                                                                      info)
+    return arrays
+
+def main(argv=None):
+    """Export the tables asked for on the command line."""
+    parser = argparse.ArgumentParser(description="Export the damage, btk and"
+                                     " ttk of guns over a range of distances.")
+    parser.add_argument('data', type=str, choices=list(ARSENALS.keys()),
+                        help="The data to export.")
+    parser.add_argument('weapons', type=str, nargs='*',
+                        help="The names of weapons or the class of weapons to"
+                        " export, all of the guns in the data by default.")
+    parser.add_argument('--format', type=str, choices=FORMATS, default="csv",
+                        help="The format to write the tables in.")
+    parser.add_argument('--out', type=str, required=True,
+                        help="The file to write to, or directory for 'npy'.")
+    parser.add_argument('--range', type=float, default=[0, 150], nargs=2,
+                        help="The min and max distance to target.")
+    parser.add_argument('--num_points', type=int, default=151,
+                        help="The number of distances in the range.")
+    parser.add_argument('--inc_ads', action='store_true',
+                        help="Include the ads time in the ttk.")
+    args = parser.parse_args(argv)
+
+    if args.weapons:
+        guns, _ = (ARSENALS[args.data](args.weapons)
+                   .get_guns_or_types_and_return_valid_names(args.weapons))
+    else:
+        guns = ARSENALS[args.data]()
+    dists = np.linspace(args.range[0], args.range[1], args.num_points)
+    try:
+        export_tables(guns, dists, args.out, args.format,
+                      inc_ads=args.inc_ads)
+    except (ImportError, ValueError) as err:
+        parser.error(str(err))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,10 @@ This module contains functions that manipulate the file system.
 
 Functions:
 create_path -- creates the path given as a string in the users file system
+cache_dir   -- returns the directory cached results are kept in
 """
 
+import os
 from pathlib import Path
 
 
@@ -17,3 +19,10 @@ def create_path(path):
         save_path.mkdir(parents=True)
 
     return path
+
+def cache_dir():
+    """Return the cache directory, BB_TTK_CACHE_DIR or a default in ~/.cache."""
+    return os.environ.get(
+        "BB_TTK_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache",
+                     "battlebit_gun_analysis"))
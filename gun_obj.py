@@ -2,7 +2,9 @@
     Contains class definitions for each weapon in the game and functions that
     calculate various things including shot damage at a given range, ttk etc.
 
-    The following gun objects are defined:
+    The weapon and weapon category classes are made from the stats in
+    weapons.json, see weapon_registry.py. The following gun objects are
+    defined:
         ARs:
             Ak74
             M4a1
@@ -34,11 +36,68 @@
 """
 
 
-from math import ceil
+from functools import lru_cache
+from math import ceil, inf
 import numpy as np
 
+import weapon_registry
 
-# additions to these require the val_x arrays (list of valid attatchments for
+
+# bump this whenever the way damage, btk or ttk is worked out changes so that
+# results saved by ttk_cache are thrown away
+MODEL_VERSION = 1
+
+# cubic regression of the master falloff curve, see polyfit_realdat.py for the
+# derivation
+_CUBIC_A = 8.353*10**(-8)
+_CUBIC_B = 3.119*10**(-5)
+_CUBIC_C = 2.281*10**(-5)
+
+
+def _falloff_cubic(x):
+    """Return the master falloff curve coefficient x meters into the falloff.
+
+    Works for floats and numpy arrays alike. The powers are written out as
+    products because numpy's pow and python's can disagree in the last digit,
+    which would make the array methods differ from the scalar ones.
+    """
+    return (_CUBIC_A*(x*x*x)
+            - _CUBIC_B*(x*x)
+            - _CUBIC_C*x
+            + 1)
+
+
+def _falloff_scales(falloff_start, falloff_end, min_co):
+    """Return the x and y scale that stretch the master curve to fit a gun.
+
+    See 'Gun._calc_falloff_coef' for the derivation. Works element wise when
+    given numpy arrays.
+    """
+    # because we go from 0 to 250, any guns that have a shorter falloff
+    # interval will require the domain of the cubic func to be scaled
+    xcalcedrange = [50, 300]  # this is the domain of the cubic regression
+    xscale = (xcalcedrange[1] - xcalcedrange[0])/(falloff_end - falloff_start)
+
+    # the y axis may also need scaling depending on _MIN_CO
+    # So I wrote what follows a while ago, and I can't work out y it works
+    # anymore...
+
+    # this is derived from a simultanous equation:
+    # f(250)*m + c = 0.25 (250 being the end of regressed gun's donmain and
+    #                      0.25 being the gun's minimum coefficient)
+    # f(0)*m + c = 1
+    ycalcedmin = 0.35
+    yscale = (min_co - 1)/(ycalcedmin - 1)  # this is m
+    return xscale, yscale
+
+
+def _falloff_coef(offset, xscale, yscale):
+    """Return the damage coefficient offset meters into a gun's falloff range."""
+    #        m    *           f(x)              + (   c    )
+    return yscale * _falloff_cubic(xscale*offset) + 1 - yscale
+
+
+# additions to these require the val_x sets (set of valid attatchments for
 # weapons) in the weapon type classes to be updated if they are able to be
 # attached.
 class AttachmentBaseClass():
@@ -135,6 +194,23 @@ class EmptySRail(SRailBaseClass):
     NAME = "Empty"
 
 
+@lru_cache(maxsize=4096)
+def _loadout_multipliers(attachments):
+    """Return the products of the tuple of attachments' stat multipliers.
+
+    Returns:
+    --------
+    tuple of the (damage, velocity, rof, aim down) multipliers
+    """
+    dam = velocity = rof = aim_down = 1
+    for attachment in attachments:
+        dam *= attachment._DAM
+        velocity *= attachment._VELOCITY
+        rof *= attachment._ROF
+        aim_down *= attachment._AIM_DOWN
+    return dam, velocity, rof, aim_down
+
+
 class Gun():
     """
     Abstract class that provides methods for calculating weapon damage etc.
@@ -148,35 +224,91 @@ class Gun():
     u_rail  - URailBaseClass: the under rail attached to the gun
     barrel  - BarrelBaseClass: the barrel attached to the gun
 
+    These are read only, one for each slot in SLOTS. Change them with
+    'swap_attach' or 'apply_loadout'.
+
     Functions:
     ----------
     - get_dam: returns the base damage of the weapon for the given damage type
     - shot_dam: returns the damage the gun will do at a given range
     - btk: returns the number of shots required to kill a target
     - ttk: returns the time it takes to kill a target
+    - shot_dam_at_ranges, btk_array, ttk_array: numpy versions of the above
+      that take an array of distances
+    - btk_intervals: returns the exact distance intervals of each btk
+    - ttk_curve: returns the exact ttk curve between two distances
     - get_attachments: returns a dict of all attachments attached to the gun
+    - swap_attach: puts an attachment in its slot
+    - apply_loadout: puts several attachments in their slots at once
+    - with_attachments: returns a copy of the gun with other attachments
+    - fingerprint: returns the attachments and stats as a hashable tuple, used
+      for equality and hashing
+
+    Class Variables:
+    ----------------
+    val_barrels, val_sights, val_c_sights, val_mags, val_s_rails,
+    val_u_rails - frozenset: the attachments that can go in each slot. These
+                  are shared by every gun of a class rather than copied into
+                  each instance.
+    _BASE_DAM, _BASE_ROF, _BASE_VELOCITY,
+    _BASE_AIM_DOWN - the weapon's stats with no attachments. The _dam, rof,
+                     velocity and aim_down of a gun are these times its
+                     attachments' multipliers, see '_update_stats'.
     """
+    # guns get made in the hundreds of thousands when searching loadouts so
+    # keep them small. Subclasses must declare __slots__ too or they get a
+    # __dict__ back. 'with_attachments' copies each of these.
+    __slots__ = ("name", "gun_type", "_loadout",
+                 "_dam", "_dam_prof", "rof", "velocity", "aim_down",
+                 "_falloff_cache", "_fingerprint")
+    val_barrels = frozenset()
+    val_sights = frozenset()
+    val_c_sights = frozenset()
+    val_mags = frozenset()
+    val_s_rails = frozenset()
+    val_u_rails = frozenset()
+
     def __init__(self):
         """Initialise all attachment slots with empty attachment classes"""
-        # TODO: make the attachments a set of objects. We can then initialise
-        # here with at single parameter.
-        self.sight = EmptySight
-        self.c_sight = EmptyCSight
-        self.mag = EmptyMag
-        self.s_rail = EmptySRail
-        self.u_rail = EmptyURail
-        self.barrel = EmptyBarrel
+        # the attachment in each slot, in the order of SLOTS
+        self._loadout = _EMPTY_LOADOUT
+        self._falloff_cache = None  # see _falloff_consts
+        self._fingerprint = None    # see fingerprint
+
+    def fingerprint(self):
+        """Return the gun's attachments and stats as a hashable tuple.
+
+        Guns with the same fingerprint do the same damage, btk and ttk at
+        every range, whatever they are called. It is worked out once and kept
+        until an attachment is swapped, so the stats should only be changed
+        through the swap methods.
+        """
+        return self._hashed_fingerprint()[1]
+
+    def _hashed_fingerprint(self):
+        """Return the hash of the fingerprint along with the fingerprint."""
+        if self._fingerprint is None:
+            fingerprint = self._full_loadout() + (
+                self._dam, tuple(self._dam_prof), self.rof, self.velocity,
+                self.aim_down)
+            self._fingerprint = (hash(fingerprint), fingerprint)
+        return self._fingerprint
 
     def __eq__(self, other):
         """Return True if gun attachments and stats are the same."""
-        if (self.sight == other.sight and self.c_sight == other.c_sight
-            and self.mag == other.mag and self.s_rail == other.s_rail
-            and self.u_rail == other.u_rail and self.barrel == other.barrel
-            and self._dam == other._dam
-            and self.rof and self._dam_prof == other._dam_prof and self.velocity
-            and self.aim_down):
-            return True
-        return False
+        if not isinstance(other, Gun):
+            return NotImplemented
+        own_hash, own_fingerprint = self._hashed_fingerprint()
+        other_hash, other_fingerprint = other._hashed_fingerprint()
+        return own_hash == other_hash and own_fingerprint == other_fingerprint
+
+    def __hash__(self):
+        """Return the hash of the fingerprint.
+
+        Like the fingerprint this changes when an attachment is swapped, so
+        don't swap the attachments of a gun that is in a set or is a dict key.
+        """
+        return self._hashed_fingerprint()[0]
 
     def __str__(self):
         return self.name
@@ -248,30 +380,47 @@ class Gun():
         # x=0 for the gun by subtracting its starting falloff value
         dist -= self._dam_prof[0][0]
 
-        # because we go from 0 to 250, any guns that have a shorter falloff
-        # interval will require the domain of the cubic func to be scaled
-        xcalcedrange = [50, 300]  # this is the domain of the cubic regression
-        xrange = [m for m, n in self._dam_prof]  # falloff interval for gun
-        xscale = (xcalcedrange[1] - xcalcedrange[0])/(xrange[1] - xrange[0])
-
-        # the y axis may also need scaling depending on _MIN_CO
-        # So I wrote what follows a while ago, and I can't work out y it works
-        # anymore...
-
-        # this is derived from a simultanous equation:
-        # f(250)*m + c = 0.25 (250 being the end of regressed gun's donmain and
-        #                      0.25 being the gun's minimum coefficient)
-        # f(0)*m + c = 1
-        ycalcedmin = 0.35
-        ymin = self._MIN_CO
-        yscale = (ymin - 1)/(ycalcedmin - 1)  # this is m
-        # see polyfit_real.py for the derivation of the cubic regression
-        coef = (8.353*10**(-8)*(xscale*dist)**3
-                - 3.119*10**(-5)*(xscale*dist)**2
-                - 2.281*10**(-5)*(xscale*dist)
-                + 1)
-        #        m    * f(x) + (   c    )
-        return yscale * coef + 1 - yscale
+        # the domain and range of the cubic regression are then stretched to
+        # fit the gun, see '_falloff_scales'. The scales only depend on the
+        # loadout so they come from the cache.
+        xscale, yscale = self._falloff_consts()[2:4]
+        return _falloff_coef(dist, xscale, yscale)
+
+    def _falloff_consts(self):
+        """Return the loadout's derived damage model constants.
+
+        These are worked out once and cached until an attachment is swapped,
+        so hot loops only pay for evaluating the cubic.
+
+        Returns:
+        --------
+        tuple: (falloff start, falloff end, xscale, yscale, damage before the
+                falloff range, damage after the falloff range)
+        """
+        if self._falloff_cache is None:
+            falloff_start = self._dam_prof[0][0]
+            falloff_end = self._dam_prof[1][0]
+            xscale, yscale = _falloff_scales(falloff_start, falloff_end,
+                                             self._MIN_CO)
+            self._falloff_cache = (falloff_start, falloff_end, xscale, yscale,
+                                   self._dam * self._dam_prof[0][1],
+                                   self._dam_prof[1][1] * self._dam)
+        return self._falloff_cache
+
+    def _calc_falloff_coefs(self, dists):
+        """Return the falloff range damage coeficients for an array of distances.
+
+        This is the numpy counterpart of '_calc_falloff_coef', see there for
+        how the model works. The results are identical to calling that
+        function for each distance.
+
+        Input:
+        ------
+        dists - np.ndarray: distances from the shooter to the target. All of
+                them are assumed to be in the guns falloff range.
+        """
+        falloff_start, _, xscale, yscale, _, _ = self._falloff_consts()
+        return _falloff_coef(dists - falloff_start, xscale, yscale)
 
     def shot_dam_at_range(self, dist):
         """Returns the damage a bullet will do at the given distance.
@@ -284,20 +433,60 @@ class Gun():
         --------
         float: the damage the bullet will do at the given distance
         """
-        dam = self._dam
         assert dist >= 0
-        if dist <= self._dam_prof[0][0]:
-            return dam * self._dam_prof[0][1]
-        if dist >= self._dam_prof[1][0]:
-            return self._dam_prof[1][1] * dam
+        (falloff_start, falloff_end, xscale, yscale,
+         start_dam, end_dam) = self._falloff_consts()
+        if dist <= falloff_start:
+            return start_dam
+        if dist >= falloff_end:
+            return end_dam
+
+        dam_coef = _falloff_coef(dist - falloff_start, xscale, yscale)
+        return self._dam * dam_coef
+
+    def shot_dam_at_ranges(self, dists):
+        """Return the damage a bullet will do at each of the given distances.
+
+        Vectorised version of 'shot_dam_at_range'; the plateaus and the falloff
+        range are worked out with masks in a single pass over the array.
+
+        Inputs:
+        -------
+        dists    - array like of distances to the target, positive values,
+                   meters
 
-        dam_coef = self._calc_falloff_coef(dist)
-        return dam * dam_coef
+        Returns:
+        --------
+        np.ndarray of floats: the damage at each distance, same shape as dists
+
+        Raises:
+        -------
+        ValueError - if any of the distances are negative
+        """
+        dists = np.asarray(dists, dtype=float)
+        if np.any(dists < 0):
+            raise ValueError("shot_dam_at_ranges: distances must be positive.")
+        falloff_start, falloff_end, _, _, start_dam, end_dam = (
+            self._falloff_consts())
+        before_falloff = dists <= falloff_start
+        after_falloff = dists >= falloff_end
+        in_falloff = ~(before_falloff | after_falloff)
+
+        dams = np.empty(dists.shape)
+        dams[before_falloff] = start_dam
+        dams[after_falloff] = end_dam
+        dams[in_falloff] = (self._dam
+                            * self._calc_falloff_coefs(dists[in_falloff]))
+        return dams
 
     def btk(self, dist):
         """Return the number of hits needed to kill at the given distance."""
         return ceil(100/self.shot_dam_at_range(dist))
 
+    def btk_array(self, dists):
+        """Return the number of hits needed to kill at each given distance."""
+        return np.ceil(100/self.shot_dam_at_ranges(dists)).astype(int)
+
     def ttk(self, dist, inc_ads=False):
         """Returns the time to kill a full health opponent in milliseconds (ms).
 
@@ -318,153 +507,166 @@ class Gun():
 
         return shoot_time + tof + ads_time
 
-    def get_attachments(self):
-        """Return the name of each attachment on the gun as a dictionary."""
-        return {"sight": self.sight.NAME, "c_sight": self.c_sight.NAME,
-                "mag": self.mag.NAME, "s_rail": self.s_rail.NAME,
-                "u_rail": self.u_rail.NAME, "barrel": self.barrel.NAME}
-
-    def _apply_attach(self, attachment, dec_places=3):
-        """Apply the attachment to the weapon."""
-        self._dam = round(self._dam * attachment._DAM, dec_places)
-        self.velocity = round(self.velocity * attachment._VELOCITY, dec_places)
-        self.rof = round(self.rof * attachment._ROF, dec_places)
-        self.aim_down = round(self.aim_down * attachment._AIM_DOWN, dec_places)
-
-    def _remove_attach(self, attachment, dec_places=3):
-        """Removes the attachment from the weapon."""
-        self._dam = round(self._dam / attachment._DAM, dec_places)
-        self.velocity = round(self.velocity / attachment._VELOCITY, dec_places)
-        self.rof = round(self.rof / attachment._ROF, dec_places)
-        self.aim_down = round(self.aim_down / attachment._AIM_DOWN, dec_places)
+    def ttk_array(self, dists, inc_ads=False):
+        """Return the time to kill (ms) at each of the given distances.
 
-    def swap_sight(self, attachment):
-        """Swap the gun's current sight out for the given one.
+        Vectorised version of 'ttk', the results are identical.
 
         Inputs:
         -------
-        attachment - class object, the attachment you want to put on the
-                     gun, eg: 'EmptySight'.
-
-        Raises:
-        -------
-        ValueError - if the given attachment isn't in the gun's val_sights
-                     class variable
+        dists    - array like of distances to the target, positive values,
+                   meters
+        inc_ads  - bool, include the aim down sights time
         """
-        # TODO: a composite might allow you to remove all these duplicate
-        # functions
-        if attachment is not EmptySight:    # ensure empty is allowed
-            if attachment not in self.val_sights:
-                raise ValueError(f"This {attachment.TYPE} cannot be put here.")
-        if self.sight != attachment:
-            self._remove_attach(self.sight)
-            self._apply_attach(attachment)
-            self.sight = attachment
+        dists = np.asarray(dists, dtype=float)
+        shoot_time = (1/self.rof * 60000
+                      * (self.btk_array(dists) - 1)
+                     )
+        tof = dists/self.velocity*1000
+        ads_time = self.aim_down*1000 if inc_ads else 0
 
-    def swap_c_sight(self, attachment):
-        """Swap the gun's current canted sight out for the given one.
+        return shoot_time + tof + ads_time
 
-        Inputs:
-        -------
-        attachment - class object, the attachment you want to put on the
-                     gun, eg: 'EmptyCSight'.
+    def _falloff_dists_at_dam(self, dam):
+        """Return the distances inside the falloff range where a shot does dam.
 
-        Raises:
-        -------
-        ValueError - if the given attachment isn't in the gun's val_c_sights
-                     class variable
+        This solves the cubic used by '_calc_falloff_coef' directly rather
+        than searching for the distance.
         """
-        if attachment is not EmptyCSight:    # ensure empty is allowed
-            if attachment not in self.val_c_sights:
-                raise ValueError(f"This {attachment.TYPE} cannot be put here.")
-        if self.c_sight != attachment:
-            self._remove_attach(self.c_sight)
-            self._apply_attach(attachment)
-            self.c_sight = attachment
-
-    def swap_mag(self, attachment):
-        """Swap the gun's current magazine out for the given one.
+        falloff_start, falloff_end, xscale, yscale, _, _ = (
+            self._falloff_consts())
+        if yscale == 0:     # no falloff so the damage never crosses dam
+            return []
+        # dam = self._dam * (yscale * f(x) + 1 - yscale), rearrange for f(x)
+        cubic_val = (dam/self._dam - 1 + yscale)/yscale
+        roots = np.roots([_CUBIC_A, -_CUBIC_B, -_CUBIC_C, 1 - cubic_val])
+        real_roots = roots[np.abs(roots.imag) < 1e-9].real
+        dists = falloff_start + real_roots/xscale
+        return sorted(float(d) for d in dists if falloff_start < d < falloff_end)
+
+    def btk_intervals(self, min_dist=0, max_dist=inf, inc_ads=False):
+        """Return the distance intervals over which the btk doesn't change.
+
+        The btk is a step function of distance that only changes where the
+        shot damage crosses 100/btk. Those distances are found by solving the
+        falloff cubic once per btk, so the result is exact and costs the
+        number of btk steps rather than the number of distances sampled.
 
         Inputs:
         -------
-        attachment - class object, the attachment you want to put on the
-                     gun, eg: 'EmptyMag'.
+        min_dist - the distance to start from, positive value, meters
+        max_dist - the distance to stop at, meters. Defaults to infinity.
+        inc_ads  - bool, include the aim down sights time in the ttk
 
-        Raises:
-        -------
-        ValueError - if the given attachment isn't in the gun's val_mags
-                     class variable
-        """
-        if attachment is not EmptyMag:    # ensure empty is allowed
-            if attachment not in self.val_mags:
-                raise ValueError(f"This {attachment.TYPE} cannot be put here.")
-        if self.mag != attachment:
-            self._remove_attach(self.mag)
-            self._apply_attach(attachment)
-            self.mag = attachment
-
-    def swap_s_rail(self, attachment):
-        """Swap the gun's side rail attachment out for the given one.
-
-        Inputs:
-        -------
-        attachment - class object, the attachment you want to put on the
-                     gun, eg: 'EmptySRail'.
+        Returns:
+        --------
+        list of (start_m, end_m, btk, ttk_without_tof) tuples ordered by
+        distance. Each btk holds for start_m < dist <= end_m, as the damage
+        falls with distance so at a step the lower btk still holds, eg:
+        Mp7().btk(50) is 4 while the interval after 50m is btk 5. The steps
+        inside the falloff range are found with floats, so exactly at one of
+        them 'btk' can give either side's btk. The first interval also holds
+        at min_dist. ttk_without_tof is the ttk in ms less the bullet's time
+        of flight, which is the only part of the ttk that changes inside an
+        interval.
 
         Raises:
         -------
-        ValueError - if the given attachment isn't in the gun's val_s_rails
-                     class variable
+        ValueError - if min_dist is negative or not less than max_dist
         """
-        if attachment is not EmptySRail:    # ensure empty is allowed
-            if attachment not in self.val_s_rails:
-                raise ValueError(f"This {attachment.TYPE} cannot be put here.")
-        if self.s_rail != attachment:
-            self._remove_attach(self.s_rail)
-            self._apply_attach(attachment)
-            self.s_rail = attachment
-
-    def swap_u_rail(self, attachment):
-        """Swap the gun's current under rail out for the given one.
-
-        Inputs:
-        -------
-        attachment - class object, the attachment you want to put on the
-                     gun, eg: 'EmptyURail'.
+        if not 0 <= min_dist < max_dist:
+            raise ValueError("btk_intervals: need 0 <= min_dist < max_dist.")
+        falloff_start, falloff_end = self._dam_prof[0][0], self._dam_prof[1][0]
+        bounds = {min_dist, max_dist}
+        bounds.update(d for d in (falloff_start, falloff_end)
+                      if min_dist < d < max_dist)
+        for btk in range(self.btk(falloff_start), self.btk(falloff_end) + 1):
+            bounds.update(d for d in self._falloff_dists_at_dam(100/btk)
+                          if min_dist < d < max_dist)
+        bounds = sorted(bounds)
+
+        ads_time = self.aim_down*1000 if inc_ads else 0
+        intervals = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            # the last interval can only be infinite on the far plateau
+            btk = self.btk(start if end == inf else (start + end)/2)
+            if intervals and intervals[-1][2] == btk:
+                intervals[-1] = (intervals[-1][0], end) + intervals[-1][2:]
+                continue
+            shoot_time = 1/self.rof * 60000 * (btk - 1)
+            intervals.append((start, end, btk, shoot_time + ads_time))
+        return intervals
+
+    def ttk_curve(self, min_dist, max_dist, inc_ads=False):
+        """Return the vertices of the exact ttk curve between two distances.
+
+        Within a btk interval the ttk only grows with the time of flight,
+        which is linear, so the two ends of each interval describe the curve
+        exactly.
 
-        Raises:
-        -------
-        ValueError - if the given attachment isn't in the gun's val_u_rails
-                     class variable
+        Returns:
+        --------
+        (np.ndarray, np.ndarray): the distances and the ttk at them in ms
         """
-        if attachment is not EmptyURail:    # ensure empty is allowed
-            if attachment not in self.val_u_rails:
-                raise ValueError(f"This {attachment.TYPE} cannot be put here.")
-        if self.u_rail != attachment:
-            self._remove_attach(self.u_rail)
-            self._apply_attach(attachment)
-            self.u_rail = attachment
+        dists = []
+        ttks = []
+        for start, end, _, ttk_without_tof in self.btk_intervals(
+                min_dist, max_dist, inc_ads=inc_ads):
+            for dist in (start, end):
+                dists.append(dist)
+                ttks.append(ttk_without_tof + dist/self.velocity*1000)
+        return np.array(dists), np.array(ttks)
 
-    def swap_barrel(self, attachment):
-        """Swap the gun's current barrel out for the given one.
+    def get_attachments(self):
+        """Return the name of each attachment on the gun as a dictionary."""
+        return {slot: attachment.NAME for slot, attachment
+                in zip(SLOTS, self._full_loadout())}
+
+    def _full_loadout(self):
+        """Return the attachment in every slot, including slots registered
+        since the gun was made."""
+        return self._loadout + _EMPTY_LOADOUT[len(self._loadout):]
+
+    def _clear_caches(self):
+        """Forget everything worked out from the gun's current loadout."""
+        self._falloff_cache = None
+        self._fingerprint = None
+
+    def _update_stats(self):
+        """Work the stats out from the base stats and the attachments on.
+
+        Each stat is its base stat times the product of the attachments'
+        multipliers, taken in slot order. Working it out afresh rather than
+        dividing out the old attachment and multiplying in the new one means
+        the stats only depend on the attachments on the gun, not on the swaps
+        that got them there, so they never drift. The products are cached per
+        loadout, so this is a lookup and four multiplications.
+        """
+        self._clear_caches()
+        dam, velocity, rof, aim_down = _loadout_multipliers(self._loadout)
+        self._dam = self._BASE_DAM * dam
+        self.velocity = self._BASE_VELOCITY * velocity
+        self.rof = self._BASE_ROF * rof
+        self.aim_down = self._BASE_AIM_DOWN * aim_down
 
-        Inputs:
-        -------
-        attachment - class object, the attachment you want to put on the
-                     gun, eg: 'EmptyBarrel'.
+    def _check_attach(self, slot, attachment):
+        """Return the index of the slot, checking the attachment can go in it.
 
         Raises:
         -------
-        ValueError - if the given attachment isn't in the gun's val_barrels
-                     class variable
+        ValueError - if the slot isn't in SLOTS, the attachment isn't for the
+                     slot or the gun can't take it.
         """
-        if attachment is not EmptyBarrel:    # ensure empty is allowed
-            if attachment not in self.val_barrels:
-                raise ValueError(f"This {attachment.TYPE} cannot be put here.")
-        if self.barrel != attachment:
-            self._remove_attach(self.barrel)
-            self._apply_attach(attachment)
-            self.barrel = attachment
+        try:
+            index, empty, valid_attr = _SLOT_INDEX[slot]
+        except KeyError:
+            raise ValueError(f"{slot} is not a valid slot argument.") from None
+        if attachment is not empty:     # empty is always allowed
+            if (getattr(attachment, "TYPE", None) != slot
+                    or attachment not in getattr(self, valid_attr)):
+                raise ValueError(f"This {getattr(attachment, 'TYPE', slot)}"
+                                 " cannot be put here.")
+        return index
 
     def swap_attach(self, attachment):
         """Swap the gun's current attachment out for the given one.
@@ -478,1258 +680,270 @@ class Gun():
 
         Raises:
         -------
-        ValueError - the given attachment doesn't match a slot name.
+        ValueError - the given attachment doesn't match a slot name, or the
+                     gun can't take it.
         """
-        slot = attachment.TYPE
-        if slot == "barrel":
-            self.swap_barrel(attachment)
-        elif slot == "u_rail":
-            self.swap_u_rail(attachment)
-        elif slot == "s_rail":
-            self.swap_s_rail(attachment)
-        elif slot == "mag":
-            self.swap_mag(attachment)
-        elif slot == "c_sight":
-            self.swap_c_sight(attachment)
-        elif slot == "sight":
-            self.swap_sight(attachment)
-        else:
-            raise ValueError(f"{slot} is not a valid slot argument.")
-
-
-class Ar(Gun):
-    """AR Weapon category that extends Gun; to be subclassed by weapons."""
-    _HEAD_MULT = 1.5
-    _MIN_CO = 0.35
-
-    def __init__(self, gun_type="AR"):
-        super().__init__()
-        self.gun_type = gun_type
-        self.val_barrels = np.array([HeavyBarrel, LongBarrel])
-        self.val_sights = np.array([])
-        self.val_c_sights = np.array([])
-        self.val_mags = np.array([])
-        self.val_s_rails = np.array([])
-        self.val_u_rails = np.array([])
-
-
-class Lmg(Gun):
-    """Lmg Weapon category that extends Gun; to be subclassed by weapons."""
-    _HEAD_MULT = 1.5
-    _MIN_CO = 0.3
-
-    def __init__(self, gun_type="LMG"):
-        super().__init__()
-        self.gun_type = gun_type
-        self.val_barrels = np.array([HeavyBarrel, LongBarrel])
-        self.val_sights = np.array([])
-        self.val_c_sights = np.array([])
-        self.val_mags = np.array([])
-        self.val_s_rails = np.array([])
-        self.val_u_rails = np.array([])
-
-
-class Smg(Gun):
-    """Smg Weapon category that extends Gun; to be subclassed by weapons."""
-    _HEAD_MULT = 1.2
-    _MIN_CO = 0.25
-
-    def __init__(self, gun_type="SMG"):
-        super().__init__()
-        self.gun_type = gun_type
-        self.val_barrels = np.array([])
-        self.val_sights = np.array([])
-        self.val_c_sights = np.array([])
-        self.val_mags = np.array([])
-        self.val_s_rails = np.array([])
-        self.val_u_rails = np.array([])
-
-
-class Pdw(Gun):
-    """Pdw Weapon category that extends Gun; to be subclassed by weapons."""
-    _HEAD_MULT = 1.5
-    _MIN_CO = 0.25
-
-    def __init__(self, gun_type="PDW"):
-        super().__init__()
-        self.gun_type = gun_type
-        self.val_barrels = np.array([])
-        self.val_sights = np.array([])
-        self.val_c_sights = np.array([])
-        self.val_mags = np.array([])
-        self.val_s_rails = np.array([])
-        self.val_u_rails = np.array([])
-
-
-class Carbine(Gun):
-    """Carbine Weapon category that extends Gun; to be subclassed by weapons."""
-    _HEAD_MULT = 1.5
-    _MIN_CO = 0.25
-
-    def __init__(self, gun_type="CARBINE"):
-        super().__init__()
-        self.gun_type = gun_type
-        self.val_barrels = np.array([])
-        self.val_sights = np.array([])
-        self.val_c_sights = np.array([])
-        self.val_mags = np.array([])
-        self.val_s_rails = np.array([])
-        self.val_u_rails = np.array([])
-
-
-# additions here need to be added to the arsenal generation functions too if
-# they are to be used in the main scripts.
-class Ak74(Ar):
-    """Simulates AK74 weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-                          attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-                      given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="AK74"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 33
-        # TODO: _dam_prof should be an object...
-        self._dam_prof = [(50, 1), (300, self._MIN_CO)]
-        self.rof = 670
-        self.velocity = 700
-        self.aim_down = 0.25
-
-
-class M4a1(Ar):
-    """Simulates M4A1 weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="M4A1"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 30
-        self._dam_prof = [(50, 1), (300, self._MIN_CO)]
-        self.rof = 700
-        self.velocity = 700
-        self.aim_down = 0.24
-
-
-class Ak15(Ar):
-    """Simulates AK15 weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="AK15"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 40
-        self._dam_prof = [(150, 1), (300, self._MIN_CO)]
-        self.rof = 540
-        self.velocity = 750
-        self.aim_down = 0.3
-
-
-class ScarH(Ar):
-    """Simulates SCARH weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="SCAR-H"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 42
-        self._dam_prof = [(150, 1), (300, self._MIN_CO)]
-        self.rof = 500
-        self.velocity = 750
-        self.aim_down = 0.2
-
-
-class Acr(Ar):
-    """Simulates ACR weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="ACR"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 25
-        self._dam_prof = [(50, 1), (300, self._MIN_CO)]
-        self.rof = 700
-        self.velocity = 650
-        self.aim_down = 0.25
-
-
-class AugA3(Ar):
-    """Simulates AUGA3 weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="AUG_A3"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 31
-        self._dam_prof = [(150, 1), (300, self._MIN_CO)]
-        self.rof = 500
-        self.velocity = 600
-        self.aim_down = 0.15
-
-
-class Sg550(Ar):
-    """Simulates SG550 weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="SG550"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 27
-        self._dam_prof = [(150, 1), (300, self._MIN_CO)]
-        self.rof = 700
-        self.velocity = 640
-        self.aim_down = 0.14
-
-
-class Fal(Ar):
-    """Simulates FAL weapon characteristics. Extends Ar class.
+        self.apply_loadout({attachment.TYPE: attachment})
 
-    Most of the methods here are inherited from Gun.
+    def apply_loadout(self, attachments):
+        """Put each of the attachments in its slot.
 
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="FAL"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 40
-        self._dam_prof = [(150, 1), (300, self._MIN_CO)]
-        self.rof = 650
-        self.velocity = 600
-        self.aim_down = 0.22
-
-
-class G36c(Ar):
-    """Simulates G36C weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="G36C"):
-        super().__init__()
-        self.name = gun_name
-        self.val_barrels = np.array([Ranger, LongBarrel])
-        self._dam = 30
-        self._dam_prof = [(50, 1), (300, self._MIN_CO)]
-        self.rof = 750
-        self.velocity = 600
-        self.aim_down = 0.25
-
-
-class Famas(Ar):
-    """Simulates FAMAS weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="FAMAS"):
-        super().__init__()
-        self.name = gun_name
-        self.val_barrels = np.array([Ranger, LongBarrel])
-        self._dam = 23
-        self._dam_prof = [(50, 1), (300, self._MIN_CO)]
-        self.rof = 900
-        self.velocity = 600
-        self.aim_down = 0.25
-
-
-class Hk419(Ar):
-    """Simulates HK419 weapon characteristics. Extends Ar class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="HK419"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 31
-        self._dam_prof = [(50, 1), (300, self._MIN_CO)]
-        self.rof = 660
-        self.velocity = 700
-        self.aim_down = 0.25
-
-
-class L86a1(Lmg):
-    """Simulates L86A1 weapon characteristics. Extends Lmg class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="L86A1"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 32
-        self._dam_prof = [(100, 1), (300, self._MIN_CO)]
-        self.rof = 775
-        self.velocity = 600
-        self.aim_down = 0.3
-
-
-class M249(Lmg):
-    """Simulates M249 weapon characteristics. Extends Lmg class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="M249"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 30
-        self._dam_prof = [(100, 1), (300, self._MIN_CO)]
-        self.rof = 700
-        self.velocity = 600
-        self.aim_down = 0.35
-
-
-########################################################################
-# SMG
-class Mp7(Smg):
-    """Simulates MP7 weapon characteristics. Extends Smg class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="MP7"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 25
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 950
-        self.velocity = 350
-        self.aim_down = 0.15
-
-
-class Ump45(Smg):
-    """Simulates UMP45 weapon characteristics. Extends Smg class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="UMP-45"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 25
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 700
-        self.velocity = 500
-        self.aim_down = 0.2
+        All the attachments are checked before any are put on, so if one
+        can't go on the gun is left as it was. The stats are worked out once
+        at the end rather than after each attachment.
 
+        Inputs:
+        -------
+        attachments - dict of slot name -> attachment class, eg:
+                      {"barrel": HeavyBarrel}
 
-class Pp2000(Smg):
-    """Simulates PP2000 weapon characteristics. Extends Smg class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="PP2000"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 23
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 900
-        self.velocity = 350
-        self.aim_down = 0.2
-
-
-class KrissVector(Smg):
-    """Simulates KRISSVECTOR weapon characteristics. Extends Smg class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="KRISS_VECTOR"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 24
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 1200
-        self.velocity = 400
-        self.aim_down = 0.25
-
+        Raises:
+        -------
+        ValueError - if a slot isn't in SLOTS, an attachment isn't for its
+                     slot or the gun can't take it.
+        """
+        loadout = self._full_loadout()
+        changed = False
+        for slot, attachment in attachments.items():
+            index = self._check_attach(slot, attachment)
+            if loadout[index] is not attachment:
+                loadout = loadout[:index] + (attachment,) + loadout[index + 1:]
+                changed = True
+        if changed:
+            self._loadout = loadout
+            self._update_stats()
+
+    def with_attachments(self, name=None, **attachments):
+        """Return a copy of the gun with the given attachments put on.
+
+        The copy is made without calling the weapon's constructor. It shares
+        the damage profile and class tables (base stats, valid attachments)
+        with this gun, so only the slots and stats are its own, and the
+        cached falloff constants carry over if nothing changed. The gun is
+        left as it was.
+
+        eg: gun.with_attachments(barrel=HeavyBarrel, name="AK74_HB")
 
-class Mp5(Smg):
-    """Simulates MP5 weapon characteristics. Extends Smg class.
+        Inputs:
+        -------
+        name        - str, the name of the copy. Defaults to this gun's name.
+        attachments - slot name=attachment class for each slot to change
 
-    Most of the methods here are inherited from Gun.
+        Raises:
+        -------
+        ValueError - if a slot isn't in SLOTS, an attachment isn't for its
+                     slot or the gun can't take it.
+        """
+        clone = object.__new__(type(self))
+        clone.name = self.name if name is None else name
+        clone.gun_type = self.gun_type
+        clone._loadout = self._loadout
+        clone._dam = self._dam
+        clone._dam_prof = self._dam_prof   # never changed once made
+        clone.rof = self.rof
+        clone.velocity = self.velocity
+        clone.aim_down = self.aim_down
+        clone._falloff_cache = self._falloff_cache
+        clone._fingerprint = self._fingerprint
+        if attachments:
+            clone.apply_loadout(attachments)
+        return clone
+
+    # the swap methods of each slot, kept for the code that uses them
+    def swap_sight(self, attachment):
+        """Swap the gun's current sight out for the given one."""
+        self.apply_loadout({"sight": attachment})
 
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
+    def swap_c_sight(self, attachment):
+        """Swap the gun's current canted sight out for the given one."""
+        self.apply_loadout({"c_sight": attachment})
 
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="MP5"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 26
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 800
-        self.velocity = 400
-        self.aim_down = 0.2
+    def swap_mag(self, attachment):
+        """Swap the gun's current magazine out for the given one."""
+        self.apply_loadout({"mag": attachment})
 
+    def swap_s_rail(self, attachment):
+        """Swap the gun's side rail attachment out for the given one."""
+        self.apply_loadout({"s_rail": attachment})
 
-class Pp19(Smg):
-    """Simulates PP19 weapon characteristics. Extends Smg class.
+    def swap_u_rail(self, attachment):
+        """Swap the gun's current under rail out for the given one."""
+        self.apply_loadout({"u_rail": attachment})
 
-    Most of the methods here are inherited from Gun.
+    def swap_barrel(self, attachment):
+        """Swap the gun's current barrel out for the given one."""
+        self.apply_loadout({"barrel": attachment})
 
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
 
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
-    """
-    def __init__(self, gun_name="PP19"):
-        super().__init__()
-        self.name = gun_name
-        self.val_barrels = np.array([])
-        self._dam = 25
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 750
-        self.velocity = 400
-        self.aim_down = 0.20
+# slot name -> (the empty attachment for the slot, the name of the Gun class
+# variable with the frozenset of attachments that can go in the slot)
+SLOTS = {}
+_SLOT_INDEX = {}        # slot name -> (index in the loadout,) + SLOTS[name]
+_EMPTY_LOADOUT = ()     # the empty attachment of every slot
 
 
-class HoneyBadger(Pdw):
-    """Simulates HONEYBADGER weapon characteristics. Extends Pdw class.
+def register_slot(slot, empty, valid_attr):
+    """Add an attachment slot to every gun.
 
-    Most of the methods here are inherited from Gun.
+    The gun gets a read only attribute named after the slot holding the
+    attachment in it, empty to start with. The attachments that go in the
+    slot must have their TYPE set to the slot name.
 
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
+    Inputs:
+    -------
+    slot       - str, the name of the slot, eg: "barrel"
+    empty      - the attachment class for nothing being in the slot
+    valid_attr - str, the name of the class variable holding the frozenset of
+                 attachments a gun class can take in the slot, eg:
+                 "val_barrels". Guns take none by default.
 
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
+    Raises:
+    -------
+    ValueError - if the slot is already registered.
     """
-    def __init__(self, gun_name="HONEY_BADGER"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 35
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 800
-        self.velocity = 560
-        self.aim_down = 0.2
-
-
-class P90(Pdw):
-    """Simulates P90 weapon characteristics. Extends Pdw class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
+    global _EMPTY_LOADOUT
+    if slot in SLOTS:
+        raise ValueError(f"There is already a {slot} slot.")
+    index = len(SLOTS)
+    SLOTS[slot] = (empty, valid_attr)
+    _SLOT_INDEX[slot] = (index,) + SLOTS[slot]
+    _EMPTY_LOADOUT += (empty,)
+    if not hasattr(Gun, valid_attr):
+        setattr(Gun, valid_attr, frozenset())
+
+    def attachment(self):
+        return self._full_loadout()[index]
+    attachment.__doc__ = f"The attachment in the {slot} slot."
+    setattr(Gun, slot, property(attachment))
+
+
+register_slot("sight", EmptySight, "val_sights")
+register_slot("c_sight", EmptyCSight, "val_c_sights")
+register_slot("mag", EmptyMag, "val_mags")
+register_slot("s_rail", EmptySRail, "val_s_rails")
+register_slot("u_rail", EmptyURail, "val_u_rails")
+register_slot("barrel", EmptyBarrel, "val_barrels")
+
+
+def _attachment_classes(names):
+    """Return the frozenset of the attachment classes with the given names.
+
+    Raises:
+    -------
+    ValueError - if a name isn't an attachment class in this module.
     """
-    def __init__(self, gun_name="P90"):
-        super().__init__()
+    classes = []
+    for name in names:
+        cls = globals().get(name)
+        if not (isinstance(cls, type) and issubclass(cls, AttachmentBaseClass)):
+            raise ValueError(f"'{name}' is not an attachment.")
+        classes.append(cls)
+    return frozenset(classes)
+
+
+def _category_init(self, gun_type=None):
+    """Initialise the gun and set its type, the category's by default."""
+    Gun.__init__(self)
+    self.gun_type = self.GUN_TYPE if gun_type is None else gun_type
+
+
+def _make_category(cls_name, stats):
+    """Return a weapon category class that extends Gun, eg: Ar."""
+    return type(cls_name, (Gun,), {
+        "__doc__": (f"{cls_name} Weapon category that extends Gun; to be"
+                    " subclassed by weapons."),
+        "__module__": __name__,
+        "__slots__": (),
+        "__init__": _category_init,
+        "val_barrels": _attachment_classes(stats["val_barrels"]),
+        "_HEAD_MULT": stats["head_mult"],
+        "_MIN_CO": stats["min_co"],
+        "GUN_TYPE": stats["gun_type"]})
+
+
+def _make_weapon(cls_name, category, stats):
+    """Return a weapon class that extends its category, eg: Ak74."""
+    falloff_start, falloff_end = stats["falloff"]
+
+    def __init__(self, gun_name=stats["name"]):
+        category.__init__(self)
         self.name = gun_name
-        self._dam = 28
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 800
-        self.velocity = 390
-        self.aim_down = 0.2
-
-
-class Groza(Pdw):
-    """Simulates GROZA weapon characteristics. Extends Pdw class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
+        self._dam_prof = [(falloff_start, 1), (falloff_end, self._MIN_CO)]
+        # no attachments yet, so the stats are the base stats
+        self._dam = self._BASE_DAM
+        self.rof = self._BASE_ROF
+        self.velocity = self._BASE_VELOCITY
+        self.aim_down = self._BASE_AIM_DOWN
+    __init__.__qualname__ = f"{cls_name}.__init__"
+
+    namespace = {
+        "__doc__": (f"Simulates {stats['name']} weapon characteristics."
+                    f" Extends {category.__name__} class.\n\n"
+                    "    Its stats come from weapons.json, see 'Gun' for the"
+                    " methods.\n    "),
+        "__module__": __name__,
+        "__slots__": (),
+        "__init__": __init__,
+        "_BASE_DAM": stats["dam"],
+        "_BASE_ROF": stats["rof"],
+        "_BASE_VELOCITY": stats["velocity"],
+        "_BASE_AIM_DOWN": stats["aim_down"]}
+    if "val_barrels" in stats:
+        namespace["val_barrels"] = _attachment_classes(stats["val_barrels"])
+    return type(cls_name, (category,), namespace)
+
+
+def _make_gun_classes(registry):
+    """Return a dict of class name -> class for each category and weapon.
+
+    The weapons have their stats as of the latest patch.
     """
-    def __init__(self, gun_name="GROZA"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 27
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 700
-        self.velocity = 390
-        self.aim_down = 0.2
-
-
-class AsVal(Carbine):
-    """Simulates ASVAL weapon characteristics. Extends Carbine class.
-
-    Most of the methods here are inherited from Gun.
-
-    Instance Variables:
-    -------------------
-        sight   - sight attachment the gun has
-        c_sight - the canted sight attachment the gun has
-        mag     - magazine attachment the gun has
-        s_rail  - side rail attachment the gun has
-        u_rail  - under rail attachment the gun has
-        barrel  - barrel attachment the gun has
-        val_barrels  - valid barrel attachments
-        val_sights   - valid sight attachments
-        val_c_sights - valid canted sight attachments
-        val_mags     - valid magazine attachments
-        val_s_rails  - valid side rail attachments
-        val_u_rails  - valid under rail attachments
-        self.rof      - rate of fire
-        self.velocity - bullet velocity
-        self.aim_down - time it takes to ads
-
-    Functions:
-    ----------
-        get_dam - return the damage
-        shot_dam - return the damage the gun does at the given range
-        btk - return the bullets to kill a full health target at a given range
-        ttk - return the time to kill a full health target at the given range
-        get_attachments - return a dictionary containing the names of the
-            attachments in each slot
-        swap_attach - swap the the attachment in the given slot to the one
-            given
-        swap_barrel - swap the barrel to the given one
-        swap_c_sight - swap the canted sight to the given one
-        swap_mag - swap the magazine to the given one
-        swap_s_rail - swap the side rail to the given one
-        swap_sight - swap the sight to the given one
-        swap_u_rail - swap the under rail to the given one
+    classes = {}
+    for cls_name, stats in registry["categories"].items():
+        classes[cls_name] = _make_category(cls_name, stats)
+    for cls_name, stats in weapon_registry.weapons_as_of(registry).items():
+        classes[cls_name] = _make_weapon(cls_name, classes[stats["category"]],
+                                         stats)
+    return classes
+
+
+# the categories (Ar, Lmg...) and weapons (Ak74, M4a1...) are made from the
+# weapons.json table. Add new weapons there, and to the arsenal generation
+# functions too if they are to be used in the main scripts.
+_REGISTRY = weapon_registry.load_registry()
+_WEAPON_STATS = weapon_registry.weapons_as_of(_REGISTRY)  # of the classes here
+globals().update(_make_gun_classes(_REGISTRY))
+_PATCH_CLASSES = {}  # patch name -> weapon_classes(patch)
+
+
+def weapon_classes(patch=None):
+    """Return the weapon classes with their stats as of the patch.
+
+    Weapons that are the same in the patch as in the latest one are the
+    module's own classes, eg: 'Ak74'. Those that have changed since are new
+    classes of the same name with the patch's stats, which don't pickle.
+
+    Inputs:
+    -------
+    patch - str, the name of a patch in weapons.json, defaults to the latest
+
+    Returns:
+    --------
+    dict of class name -> weapon class, without the weapons added after the
+    patch.
+
+    Raises:
+    -------
+    ValueError - if weapons.json has no patch with that name.
     """
-    def __init__(self, gun_name="AS_VAL"):
-        super().__init__()
-        self.name = gun_name
-        self._dam = 35
-        self._dam_prof = [(50, 1), (200, self._MIN_CO)]
-        self.rof = 800
-        self.velocity = 560
-        self.aim_down = 0.2
\ No newline at end of file
+    if patch not in _PATCH_CLASSES:
+        classes = {}
+        for cls_name, stats in weapon_registry.weapons_as_of(_REGISTRY,
+                                                             patch).items():
+            if stats == _WEAPON_STATS.get(cls_name):
+                classes[cls_name] = globals()[cls_name]
+            else:
+                classes[cls_name] = _make_weapon(
+                    cls_name, globals()[stats["category"]], stats)
+        _PATCH_CLASSES[patch] = classes
+    return _PATCH_CLASSES[patch]
@@ -5,6 +5,7 @@ import argparse
 from pprint import pprint
 import preset_arsenals
 import gun_obj
+import ttk_cache
 
 
 def return_synonymous_attachments(attachment):
@@ -15,34 +16,60 @@ def return_synonymous_attachments(attachment):
         return [gun_obj.LongBarrel]
     return None
 
-def report_btk_change_for_guns(attachments, all_guns):
-    """Return a dictionary of bools that is True if btk for the gun changes."""
+def btk_steps(gun, min_dist, max_dist, cache=None):
+    """Return the (start, end, btk) steps of the gun's btk over the range."""
+    if cache is None:
+        intervals = gun.btk_intervals(min_dist, max_dist)
+    else:
+        intervals = cache.btk_intervals(gun, min_dist, max_dist)
+    return [interval[:3] for interval in intervals]
+
+def report_btk_change_for_guns(attachments, all_guns, min_dist=0,
+                               max_dist=150, cache=None):
+    """Return a dictionary of bools that is True if btk for the gun changes.
+
+    The btk is compared over the whole range given using the exact btk
+    intervals of the gun rather than at a handful of sampled distances.
+    Giving a ttk_cache.TtkCache keeps the intervals between runs.
+    """
     ret = {}
     for gun in all_guns:
-        before = gun.btk(0, "bod_dam")
+        before = btk_steps(gun, min_dist, max_dist, cache=cache)
         for attach in attachments:
             if attach in gun.val_barrels:
-                gun.swap_attach(attach.TYPE, attach)
+                gun.swap_attach(attach)
 
-        after = gun.btk(0, "bod_dam")
+        after = btk_steps(gun, min_dist, max_dist, cache=cache)
         ret[gun.name] = (before != after)
     return ret
 
 
-parser = argparse.ArgumentParser(description="Determine if the given"
-                                 " attachment will change the number of"
-                                 " bullets required to kill a target.")
-parser.add_argument('attach', type=str, choices=["HeavyBarrel", "LongBarrel"],
-                    help="Check if the given attachment will change the ttk"
-                    " on any of the guns contained in the file given. Note"
-                    " that selecting 'HeavyBarrel' will put the 'Ranger' on"
-                    " on those weapons that don't take the heavy.")
-args = parser.parse_args()
+def main(argv=None):
+    """Print which guns the attachment given on the command line changes."""
+    parser = argparse.ArgumentParser(description="Determine if the given"
+                                     " attachment will change the number of"
+                                     " bullets required to kill a target.")
+    parser.add_argument('attach', type=str, choices=["HeavyBarrel", "LongBarrel"],
+                        help="Check if the given attachment will change the ttk"
+                        " on any of the guns contained in the file given. Note"
+                        " that selecting 'HeavyBarrel' will put the 'Ranger' on"
+                        " on those weapons that don't take the heavy.")
+    parser.add_argument('--range', type=float, default=[0, 150], nargs=2,
+                        help="The min and max distance to target to check for a"
+                        " change in the bullets to kill.")
+    args = parser.parse_args(argv)
+
+    arsenal = preset_arsenals.ARSENALS["naked"]()
+    attachments = return_synonymous_attachments(args.attach)
+
+    all_guns = arsenal.get_all_guns()
+    ret = report_btk_change_for_guns(attachments, all_guns,
+                                     min_dist=args.range[0],
+                                     max_dist=args.range[1],
+                                     cache=ttk_cache.default_cache())
 
-arsenal = preset_arsenals.ARSENALS["naked"]()
-attachments = return_synonymous_attachments(args.attach)
+    pprint(ret)
 
-all_guns = arsenal.get_all_guns()
-ret = report_btk_change_for_guns(attachments, all_guns)
 
-pprint(ret)
+if __name__ == "__main__":
+    main()
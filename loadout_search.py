@@ -0,0 +1,128 @@
+"""Search every attachment combination of a gun for the best loadouts.
+
+The number of loadouts is the product of the number of attachments each slot
+takes, which gets out of hand quickly. Most of those loadouts are redundant
+though; attachments only scale the gun's damage, velocity, rof and aim down
+time, so loadouts with the same scaling are the same gun. The slots are
+combined one at a time keeping a single loadout per distinct scaling, which
+bounds the work by the number of distinct stat multipliers instead.
+
+Functions:
+----------
+slot_options()      - return the attachments with distinct stats per slot.
+distinct_loadouts() - return a loadout for each distinct set of multipliers.
+pareto_loadouts()   - return the loadouts that are Pareto optimal on ttk
+                      versus ads time.
+"""
+
+import numpy as np
+
+import gun_obj
+
+
+def _multipliers(attachment):
+    """Return the damage, velocity, rof and aim down multipliers of attachment."""
+    return (attachment._DAM, attachment._VELOCITY, attachment._ROF,
+            attachment._AIM_DOWN)
+
+def _ttk_key(multipliers, dec_places=9):
+    """Return the part of the multipliers that affects the ttk, as a dict key.
+
+    Rounded so that products taken in a different order still match.
+    """
+    return tuple(round(mult, dec_places) for mult in multipliers[:3])
+
+def slot_options(gun_cls):
+    """Return the attachments for each slot that give the gun distinct stats.
+
+    Attachments with the same multipliers as one already seen for the slot
+    are dropped, the empty attachment is always first.
+
+    Input:
+    ------
+    gun_cls - gun class, eg: 'gun_obj.Ak74'
+
+    Returns:
+    --------
+    dict: slot name -> list of attachment classes
+    """
+    options = {}
+    # read each search so slots registered since import are searched too
+    for slot, (empty, val_attr) in gun_obj.SLOTS.items():
+        distinct = {}
+        for attach in [empty] + sorted(getattr(gun_cls, val_attr),
+                                       key=lambda a: a.NAME):
+            distinct.setdefault(_multipliers(attach), attach)
+        options[slot] = list(distinct.values())
+    return options
+
+def distinct_loadouts(gun_cls):
+    """Return a loadout for each distinct damage, velocity and rof scaling.
+
+    When two loadouts scale these the same, the one that aims down slower can
+    never be the better choice, whatever goes in the slots left to fill, so it
+    is dropped as soon as it is found.
+
+    Input:
+    ------
+    gun_cls - gun class, eg: 'gun_obj.Ak74'
+
+    Returns:
+    --------
+    list of (attachments, multipliers) tuples. attachments is a dict of slot
+    name -> attachment class and multipliers is the combined (damage,
+    velocity, rof, aim down) scaling of the loadout.
+    """
+    partials = {(1, 1, 1): ({}, (1, 1, 1, 1))}
+    for slot, options in slot_options(gun_cls).items():
+        combined = {}
+        for attachments, mults in partials.values():
+            for attach in options:
+                new_mults = tuple(m * a
+                                  for m, a in zip(mults, _multipliers(attach)))
+                key = _ttk_key(new_mults)
+                if key not in combined or new_mults[3] < combined[key][1][3]:
+                    combined[key] = ({**attachments, slot: attach}, new_mults)
+        partials = combined
+    return list(partials.values())
+
+def pareto_loadouts(gun_cls, dists):
+    """Return the loadouts that are Pareto optimal on ttk versus ads time.
+
+    Loadouts that give the same btk everywhere in dists, and the same velocity
+    and rof, kill identically so only the fastest to aim down of them is
+    considered.
+
+    Inputs:
+    -------
+    gun_cls - gun class, eg: 'gun_obj.Ak74'
+    dists   - array like of distances to target, meters. The ttk of a
+              loadout is its mean ttk (without ads time) over these.
+
+    Returns:
+    --------
+    list of dicts, fastest aim down first, with the keys:
+        "attachments" - dict of slot name -> attachment class
+        "gun"         - gun object with the loadout applied
+        "ttk"         - float, mean ttk over dists in ms
+        "aim_down"    - float, the aim down time in s
+    """
+    dists = np.asarray(dists, dtype=float)
+    candidates = {}
+    for attachments, _ in distinct_loadouts(gun_cls):
+        gun = gun_cls()
+        gun.apply_loadout(attachments)
+        kill_key = (gun.btk_array(dists).tobytes(), gun.velocity, gun.rof)
+        if (kill_key in candidates
+                and candidates[kill_key]["aim_down"] <= gun.aim_down):
+            continue
+        candidates[kill_key] = {"attachments": attachments, "gun": gun,
+                                "ttk": float(np.mean(gun.ttk_array(dists))),
+                                "aim_down": gun.aim_down}
+
+    front = []
+    for cand in sorted(candidates.values(),
+                       key=lambda c: (c["aim_down"], c["ttk"])):
+        if not front or cand["ttk"] < front[-1]["ttk"]:
+            front.append(cand)
+    return front
@@ -1,4 +1,10 @@
-"""Module containing formatting for battlebit matplotlib weapon figures."""
+"""Module containing formatting for battlebit matplotlib weapon figures.
+
+matplotlib is only imported when a figure is made, so the backend can still be
+chosen (eg: 'Agg' for batch rendering) after this module has been imported.
+"""
+
+import profiling
 
 def ttk_plot_title(title_list, fig_name=None, ads_time=False):
     """Return the ttk plot title.
@@ -20,4 +26,57 @@ def ttk_plot_title(title_list, fig_name=None, ads_time=False):
         return ("Time to Kill " + ' '.join(title_list)
                 + f"{ads_string}")
     return ("Time to Kill " + fig_name
-            + f"{ads_string}")
\ No newline at end of file
+            + f"{ads_string}")
+
+def ttk_rc_params(fig_size, f_size, tick_size):
+    """Return the matplotlib rcParams used for the ttk figures.
+
+    Inputs:
+    -------
+    fig_size    -- the width and height of the figure in inches
+    f_size      -- font size of the title and axis labels
+    tick_size   -- the tick label font size relative to f_size
+    """
+    return {'lines.linewidth': 2.5,     # TODO: magic const...
+            'figure.figsize': fig_size,
+            'xtick.labelsize': f_size*tick_size,
+            'ytick.labelsize': f_size*tick_size,
+            'axes.titlesize': f_size,
+            'axes.labelsize': f_size,
+            'legend.loc': "lower right",    # TODO: magic const...
+            'legend.fontsize': f_size}
+
+@profiling.profiled("figure.render")
+def plot_ttk_curves(curves, title, y_lim=None, fig_size=(19.2, 10.8),
+                    f_size=20, tick_size=0.8, dark_mode=True):
+    """Return a ttk figure with a line for each of the curves.
+
+    The styling only applies to this figure rather than being left set
+    globally, so a single process can draw figures with different settings.
+
+    Inputs:
+    -------
+    curves      -- list of (label, distances, ttks) tuples
+    title       -- the figure title
+
+    Keyword Arguments:
+    ------------------
+    y_lim       -- the min and max of the y axis, None lets matplotlib decide
+    fig_size, f_size, tick_size -- see 'ttk_rc_params'
+    dark_mode   -- boolean, use the matplotlib dark background style
+    """
+    import matplotlib.pyplot as plt
+
+    style = 'dark_background' if dark_mode else 'default'
+    with plt.style.context(style), \
+            plt.rc_context(ttk_rc_params(fig_size, f_size, tick_size)):
+        fig = plt.figure(tight_layout=True)
+        for label, x, y in curves:
+            plt.plot(x, y, label=label)
+        plt.legend()
+        if y_lim is not None:
+            plt.ylim(y_lim)
+        plt.xlabel("Distance to Target (m)")
+        plt.ylabel("Time to Kill (ms)")
+        plt.title(title)
+    return fig
@@ -1,13 +1,17 @@
-"""Report the accuracy of weapon damage models versus real damage values."""
+"""Report the accuracy of weapon damage models versus real damage values.
 
+matplotlib is only imported when plotting, so '--compute_only' runs without it.
+"""
 
+
+import argparse
 import sys
 import os
-import matplotlib.pyplot as plt
 from gen_realdam_dict import generate_real_damage_dict
 sys.path.insert(
     0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from preset_arsenals import ARSENALS
+import ttk_cache
 
 
 def exit_if_no_gun_objects_returned(gun_objs):
@@ -26,15 +30,38 @@ def remove_guns_from_damage_dict_without_corresponding_gun_obj(damage_dict,
                   file=sys.stderr)
             damage_dict.pop(gun_name)
 
-def add_modelled_damage_to_dict(damage_dict, gun_objs, model_name="model_damage"):
-    """Add calculated damage to the real damage dict."""
+def add_modelled_damage_to_dict(damage_dict, gun_objs, model_name="model_damage",
+                                cache=None):
+    """Add calculated damage to the real damage dict.
+
+    Giving a ttk_cache.TtkCache keeps the modelled damage between runs.
+    """
+    if cache is None:
+        cache = ttk_cache.TtkCache(None)
     for gun in gun_objs:
-        damage_dict[gun.name][model_name] = ([gun.shot_dam_at_range(d)
-                                              for d in
-                                              damage_dict[gun.name]["dist"]])
+        tables = cache.gun_tables(gun, damage_dict[gun.name]["dist"])
+        damage_dict[gun.name][model_name] = tables["dam"].tolist()
+
+def model_errors(damage_dict, model_name="model_damage"):
+    """Return the mean absolute and max percentage error of the model per gun.
+
+    Returns:
+    --------
+    dict of gun name -> (mean absolute error, max percentage error)
+    """
+    errors = {}
+    for gun_name, gun_data in damage_dict.items():
+        abs_errors = [abs(model - real) for model, real
+                      in zip(gun_data[model_name], gun_data["real_damage"])]
+        perc_errors = [abs_error/real*100 for abs_error, real
+                       in zip(abs_errors, gun_data["real_damage"])]
+        errors[gun_name] = (sum(abs_errors)/len(abs_errors), max(perc_errors))
+    return errors
 
 def plot_model_vs_real_damage(damage_dict, MODEL_NAME):
     """Plot the model damage versus the real damage."""
+    import matplotlib.pyplot as plt
+
     gun_names = list(damage_dict.keys())
     fig, ax = plt.subplots(1, len(gun_names))
     for ind, gun_name in enumerate(gun_names):
@@ -50,12 +77,20 @@ def plot_model_vs_real_damage(damage_dict, MODEL_NAME):
     plt.show()
 
 
-if __name__ == "__main__":
+def main(argv=None):
+    """Compare the modelled damage to the real damage of each gun."""
+    parser = argparse.ArgumentParser(description="Report the accuracy of the"
+                                     " damage model versus real damage values.")
+    parser.add_argument('--compute_only', action='store_true',
+                        help="Print the model error of each gun rather than"
+                        " plotting the damage. matplotlib is not imported.")
+    args = parser.parse_args(argv)
+
     # TODO: make a unittest version of this or something that will check the
     # accuracy of the model.
     damage_dict = generate_real_damage_dict()
     names_of_guns = list(damage_dict.keys())
-    arsenal = ARSENALS["ttk_dat"]()
+    arsenal = ARSENALS["ttk_dat"](names_of_guns)
     gun_objs, valid_names = arsenal.get_guns_or_types_and_return_valid_names(names_of_guns)
 
     exit_if_no_gun_objects_returned(gun_objs)
@@ -63,5 +98,16 @@ if __name__ == "__main__":
                                                                gun_objs)
     MODEL_NAME = "model_damage"
     add_modelled_damage_to_dict(damage_dict, gun_objs,
-                                model_name=MODEL_NAME)
+                                model_name=MODEL_NAME,
+                                cache=ttk_cache.default_cache())
+    if args.compute_only:
+        for gun_name, (mean_error, max_perc) in model_errors(
+                damage_dict, MODEL_NAME).items():
+            print(f"{gun_name}: mean error {mean_error:.3f},"
+                  f" max error {max_perc:.2f}%")
+        return
     plot_model_vs_real_damage(damage_dict, MODEL_NAME)
+
+
+if __name__ == "__main__":
+    main()
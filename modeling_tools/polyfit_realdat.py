@@ -1,9 +1,13 @@
+"""Fit polynomials to the real damage falloff of a gun.
+
+scipy is only imported to do the fit and matplotlib only to plot it, so
+'--compute_only' prints the fit without importing matplotlib.
+"""
+
 import os
 import sys
 import argparse
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.optimize import curve_fit
 sys.path.insert(
     0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from preset_arsenals import ARSENALS
@@ -42,10 +46,12 @@ def print_coeffs(coeffs):
 
 
 def normalise_damage_values(real_damage_dict, gun):
-    return np.array([i/gun.get_max_base_dam("bod_dam") for i in real_damage_dict[gun.name]["real_damage"]])
+    return np.array([i/gun._dam for i in real_damage_dict[gun.name]["real_damage"]])
 
 
 def plot_damage_scaling_vs_range_for_regressions_and_real(x, y, y_predictions):
+    import matplotlib.pyplot as plt
+
     plt.plot(x, y, label="real")
     for model in y_predictions:
         plt.plot(x, y_predictions[model], label=model)
@@ -84,44 +90,52 @@ def trim_range_to_falloff_range_and_normalise_x_y(name_of_gun_to_fit, gun,
         enforce_first_point_is_start_of_falloff(falloff_start, falloff_range_x, falloff_range_y, dist)
         if falloff_start <= dist <= falloff_end:
             falloff_range_x.append(dist - falloff_start)
-            falloff_range_y.append(real_damage_dict[name_of_gun_to_fit]["real_damage"][i]/gun.get_max_base_dam("bod_dam"))
+            falloff_range_y.append(real_damage_dict[name_of_gun_to_fit]["real_damage"][i]/gun._dam)
     enforce_last_point_is_end_of_falloff_range(gun._MIN_CO, falloff_start, falloff_end, falloff_range_x, falloff_range_y)
     return np.array(falloff_range_x), np.array(falloff_range_y)
 
 
-
-
-parser = argparse.ArgumentParser(description="Fit a polynomial to real damage data.")
-parser.add_argument("gun_to_fit", nargs="+", help="The gun to have its real"
-                                                  " data fitted.")
-parser.add_argument("--arsenal_name", default="ttk_dat",
-                    help="The name of the arsenal to use.")
-args = parser.parse_args()
-
-
-name_of_gun_to_fit = args.guns_to_fit[0]
-arsenal = ARSENALS[args.arsenal_name]()
-gun = arsenal.get_weapon_by_name(name_of_gun_to_fit)
-real_damage_dict = generate_real_damage_dict()
-x = np.array(real_damage_dict[name_of_gun_to_fit]['dist'])
-# we need to strip the damage values that don't occur in the gun's falloff range
-# use the damage profile instance var
-
-zero_aligned_x, normalised_y = trim_range_to_falloff_range_and_normalise_x_y(name_of_gun_to_fit, gun, real_damage_dict, x)
-print(zero_aligned_x)
-print(normalised_y)
-
-# TODO: This shouldn't be hard coded; it should probably also be an object
-y_predict = {}
-reg_coeffs = {}
-reg_covariance = {}
-reg_coeffs["cub reg"], reg_covariance["cub reg"] = curve_fit(cubic_func, zero_aligned_x, normalised_y)
-y_predict["cub reg"] = cubic_func(zero_aligned_x, *reg_coeffs["cub reg"])
-reg_coeffs["quad reg"], reg_covariance["quad reg"] = curve_fit(quad_func, zero_aligned_x, normalised_y)
-y_predict["quad reg"] = quad_func(zero_aligned_x, *reg_coeffs["quad reg"])
-
-r_2 = calculate_r_2_for_all_models(normalised_y, y_predict, reg_coeffs)
-print_model_coefficients_and_r_2(reg_coeffs, r_2)
-# print_p_errs(y, y_predict)
-
-plot_damage_scaling_vs_range_for_regressions_and_real(zero_aligned_x, normalised_y, y_predict)
+def main(argv=None):
+    """Fit the real damage falloff of the gun given on the command line."""
+    parser = argparse.ArgumentParser(description="Fit a polynomial to real damage data.")
+    parser.add_argument("gun_to_fit", nargs="+", help="The gun to have its real"
+                                                      " data fitted.")
+    parser.add_argument("--arsenal_name", default="ttk_dat",
+                        help="The name of the arsenal to use.")
+    parser.add_argument("--compute_only", action="store_true",
+                        help="Print the fit without plotting it.")
+    args = parser.parse_args(argv)
+
+    from scipy.optimize import curve_fit
+
+    name_of_gun_to_fit = args.gun_to_fit[0]
+    arsenal = ARSENALS[args.arsenal_name]([name_of_gun_to_fit])
+    gun = arsenal.get_weapon_by_name(name_of_gun_to_fit)
+    real_damage_dict = generate_real_damage_dict()
+    x = np.array(real_damage_dict[name_of_gun_to_fit]['dist'])
+    # we need to strip the damage values that don't occur in the gun's falloff range
+    # use the damage profile instance var
+
+    zero_aligned_x, normalised_y = trim_range_to_falloff_range_and_normalise_x_y(name_of_gun_to_fit, gun, real_damage_dict, x)
+    print(zero_aligned_x)
+    print(normalised_y)
+
+    # TODO: This shouldn't be hard coded; it should probably also be an object
+    y_predict = {}
+    reg_coeffs = {}
+    reg_covariance = {}
+    reg_coeffs["cub reg"], reg_covariance["cub reg"] = curve_fit(cubic_func, zero_aligned_x, normalised_y)
+    y_predict["cub reg"] = cubic_func(zero_aligned_x, *reg_coeffs["cub reg"])
+    reg_coeffs["quad reg"], reg_covariance["quad reg"] = curve_fit(quad_func, zero_aligned_x, normalised_y)
+    y_predict["quad reg"] = quad_func(zero_aligned_x, *reg_coeffs["quad reg"])
+
+    r_2 = calculate_r_2_for_all_models(normalised_y, y_predict, reg_coeffs)
+    print_model_coefficients_and_r_2(reg_coeffs, r_2)
+    # print_p_errs(y, y_predict)
+
+    if not args.compute_only:
+        plot_damage_scaling_vs_range_for_regressions_and_real(zero_aligned_x, normalised_y, y_predict)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Monte Carlo simulation of engagements, for what the exact models leave out.
+
+Each engagement is a reaction time, the aim down sights time if asked for,
+then shots until the target is dead. Every shot hits with chance hit_prob and
+a hit is a headshot with chance head_prob, doing _HEAD_MULT times the body
+damage. The engagements are simulated as numpy arrays a chunk at a time, and
+every gun is put through the same random draws in a chunk so that the
+differences between guns aren't swamped by noise.
+
+The engagements are split into chunks of a fixed size, and each chunk gets
+its own random stream spawned from the seed with numpy's SeedSequence. Which
+process simulates a chunk doesn't change its draws, so the results for a
+seed are the same however many workers there are.
+
+The ttk of every engagement aren't kept, a million engagements of the guns of
+an arsenal would take hundreds of MB. Each chunk is summed up instead: the
+mean and spread of each gun's ttk, how often each gun was the fastest and a
+histogram of the ttk in _BIN_MS wide bins, which also holds the slowest ttk
+in each bin. The summaries of the chunks are merged in order, and the
+percentiles read off the merged histograms.
+
+Functions:
+----------
+simulate() - return statistics of the simulated ttk of each gun.
+main()     - print the simulated ttk of the guns given on the command line.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from math import ceil
+import os
+import numpy as np
+
+import profiling
+import ttk_matrix
+from expected_ttk import _heads_needed
+from preset_arsenals import ARSENALS
+
+# engagements per chunk, each chunk has its own random stream. Changing it
+# changes the results for a seed.
+_CHUNK = 2**16
+# width of the bins of the ttk histograms, the percentiles are found to
+# within it
+_BIN_MS = 0.1
+
+
+def _simulate_chunk(stats, size, seed, head_prob, hit_prob, reaction):
+    """Return the (guns x size) ttk in ms of a chunk of engagements.
+
+    Inputs:
+    -------
+    stats    - dict of the guns' (guns x 1) "needed" headshots per hit count
+               (see expected_ttk._heads_needed), "rof", "tof" and "ads_time"
+    size     - the number of engagements
+    seed     - np.random.SeedSequence of the chunk
+    reaction - (mean, standard deviation) of the reaction time in ms
+    """
+    rng = np.random.default_rng(seed)
+    max_hits = stats["needed"].shape[-1] - 1
+    # the same draws are used for every gun, and always drawn in this order
+    reaction_time = np.maximum(rng.normal(reaction[0], reaction[1], size), 0)
+    heads_so_far = np.cumsum(rng.random((size, max_hits)) < head_prob, axis=1)
+    shots_so_far = np.cumsum(rng.geometric(hit_prob, (size, max_hits)),
+                             axis=1)
+
+    # the target dies on the first hit with enough headshots before it
+    dead = heads_so_far[None] >= stats["needed"][:, :, 1:]
+    hits = np.argmax(dead, axis=2)
+    shots = np.take_along_axis(shots_so_far[None], hits[..., None],
+                               axis=2)[..., 0]
+    # same order of operations as Gun.ttk, then the reaction time
+    return (1/stats["rof"] * 60000 * (shots - 1) + stats["tof"]
+            + stats["ads_time"] + reaction_time)
+
+def _histogram(ttk):
+    """Return the (first bin, counts, slowest ttk) of each row's histogram."""
+    bins = np.floor(ttk/_BIN_MS).astype(np.int64)
+    found = []
+    for row, row_bins in zip(ttk, bins):
+        first = int(row_bins.min())
+        counts = np.bincount(row_bins - first)
+        slowest = np.full(counts.size, -np.inf)
+        np.maximum.at(slowest, row_bins - first, row)
+        found.append((first, counts, slowest))
+    return found
+
+def _merge_histograms(hist_a, hist_b):
+    """Return the histograms of both, a row each, see '_histogram'."""
+    merged = []
+    for (first_a, counts_a, slowest_a), (first_b, counts_b, slowest_b) in zip(
+            hist_a, hist_b):
+        first = min(first_a, first_b)
+        size = max(first_a + counts_a.size, first_b + counts_b.size) - first
+        counts = np.zeros(size, dtype=np.int64)
+        slowest = np.full(size, -np.inf)
+        for start, part_counts, part_slowest in (
+                (first_a - first, counts_a, slowest_a),
+                (first_b - first, counts_b, slowest_b)):
+            part = slice(start, start + part_counts.size)
+            counts[part] += part_counts
+            slowest[part] = np.maximum(slowest[part], part_slowest)
+        merged.append((first, counts, slowest))
+    return merged
+
+def _summarise_chunk(stats, size, seed, head_prob, hit_prob, reaction,
+                     keep_samples):
+    """Return the summary of the ttk of a chunk of engagements.
+
+    The inputs are those of '_simulate_chunk'.
+
+    Returns:
+    --------
+    dict with the number of engagements "count", the (guns,) "mean" ttk,
+    "sq_dev" summed squared deviations from the mean and "wins", the
+    engagements each gun was the fastest in (shared between those tied), the
+    "hist" of '_histogram' and "ttk", a list of the (guns x size) ttk if
+    keep_samples, else empty.
+    """
+    ttk = _simulate_chunk(stats, size, seed, head_prob, hit_prob, reaction)
+    mean = ttk.mean(axis=1)
+    wins = np.zeros(len(ttk))
+    if len(ttk):
+        fastest = ttk == ttk.min(axis=0)
+        wins = (fastest/fastest.sum(axis=0)).sum(axis=1)
+    return {"count": size, "mean": mean,
+            "sq_dev": ((ttk - mean[:, None])**2).sum(axis=1), "wins": wins,
+            "hist": _histogram(ttk), "ttk": [ttk] if keep_samples else []}
+
+def _merge_summaries(summary_a, summary_b):
+    """Return the summary of the engagements of both, see '_summarise_chunk'.
+
+    The means and squared deviations are merged as in Chan et al's parallel
+    algorithm, which keeps them accurate over many chunks.
+    """
+    count = summary_a["count"] + summary_b["count"]
+    delta = summary_b["mean"] - summary_a["mean"]
+    return {"count": count,
+            "mean": summary_a["mean"] + delta*summary_b["count"]/count,
+            "sq_dev": (summary_a["sq_dev"] + summary_b["sq_dev"]
+                       + delta**2*summary_a["count"]*summary_b["count"]/count),
+            "wins": summary_a["wins"] + summary_b["wins"],
+            "hist": _merge_histograms(summary_a["hist"], summary_b["hist"]),
+            "ttk": summary_a["ttk"] + summary_b["ttk"]}
+
+def _hist_percentile(hist, percentile, count):
+    """Return the ttk that count*percentile/100 engagements took at most.
+
+    That engagement's ttk is in the first bin whose running count reaches it,
+    and the slowest ttk in that bin is returned, so it is exact if every ttk
+    in the bin is the same and at most _BIN_MS too high otherwise.
+    """
+    rank = max(1, ceil(percentile*count/100))
+    return np.array([slowest[np.searchsorted(np.cumsum(counts), rank)]
+                     for _, counts, slowest in hist])
+
+@profiling.profiled("mc.simulate")
+def simulate(guns, dist, engagements=10**6, head_prob=0, hit_prob=1,
+             reaction_ms=(0, 0), inc_ads=False, seed=None, workers=1,
+             percentiles=(10, 50, 90), keep_samples=False):
+    """Return statistics of the ttk of each gun over simulated engagements.
+
+    With head_prob=0, hit_prob=1 and no reaction time every engagement takes
+    exactly 'Gun.ttk'. Only a summary of each chunk of engagements is kept
+    unless keep_samples is True, see the module docstring.
+
+    Inputs:
+    -------
+    guns        - an Arsenal or iterable of gun objects
+    dist        - distance to the target, positive value, meters
+    engagements - the number of engagements to simulate for each gun
+    head_prob   - the chance a shot that hits is a headshot, 0 to 1
+    hit_prob    - the chance a shot hits, more than 0 and up to 1
+    reaction_ms - (mean, standard deviation) of the time in ms before the
+                  first shot or aiming down sights. Drawn from a normal
+                  distribution cut off at 0.
+    inc_ads     - bool, include the aim down sights time in the ttk
+    seed        - int seed of the random streams, a fresh one if None
+    workers     - the number of processes to simulate with, defaults to 1
+                  which simulates in this process. None uses every cpu.
+    percentiles - iterable of the percentiles of the ttk to return, 0 to 100.
+                  The nth percentile is the smallest ttk that at least n% of
+                  the engagements took no longer than, to within _BIN_MS.
+    keep_samples - bool, also return the ttk of every engagement. Takes 8
+                   bytes per gun per engagement.
+
+    Returns:
+    --------
+    dict with the keys:
+        "names"       - list of str, the gun name for each row
+        "seed"        - int, the seed used, to repeat the simulation
+        "mean"        - np.ndarray (guns,), mean ttk in ms
+        "std"         - np.ndarray (guns,), standard deviation of the ttk in
+                        ms
+        "win_rate"    - np.ndarray (guns,), the share of the engagements the
+                        gun was the fastest in, split evenly between ties
+        "percentiles" - dict of percentile -> np.ndarray (guns,) ttk in ms
+        "ttk"         - np.ndarray (guns x engagements), ttk in ms, only if
+                        keep_samples is True
+
+    Raises:
+    -------
+    ValueError - if dist is negative, a chance or percentile is out of range
+                 or engagements isn't positive.
+    """
+    if not 0 <= head_prob <= 1:
+        raise ValueError("simulate: head_prob must be between 0 and 1.")
+    if not 0 < hit_prob <= 1:
+        raise ValueError("simulate: hit_prob must be more than 0 and at most"
+                         " 1.")
+    if engagements < 1:
+        raise ValueError("simulate: engagements must be at least 1.")
+    percentiles = list(percentiles)
+    if not all(0 <= percentile <= 100 for percentile in percentiles):
+        raise ValueError("simulate: percentiles must be between 0 and 100.")
+    guns = ttk_matrix._gun_list(guns)
+    table = ttk_matrix.ttk_matrix(guns, [dist])
+    cols = ttk_matrix.pack_guns(guns)
+    stats = {"needed": _heads_needed(table["dam"], cols["head_mult"],
+                                     int(table["btk"].max(initial=1))),
+             "rof": cols["rof"],
+             "tof": dist/cols["velocity"]*1000,
+             "ads_time": cols["aim_down"]*1000 if inc_ads else 0}
+
+    seed_seq = np.random.SeedSequence(seed)
+    sizes = [min(_CHUNK, engagements - start)
+             for start in range(0, engagements, _CHUNK)]
+    args = (sizes, seed_seq.spawn(len(sizes)))
+    params = (head_prob, hit_prob, tuple(reaction_ms), keep_samples)
+    # merged in the order of the chunks, so the sums are the same however
+    # many workers there are
+    if workers == 1:
+        summaries = (_summarise_chunk(stats, size, chunk_seed, *params)
+                     for size, chunk_seed in zip(*args))
+        summary = reduce(_merge_summaries, summaries)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            summary = reduce(_merge_summaries, pool.map(
+                _summarise_chunk, [stats]*len(sizes), *args,
+                *([param]*len(sizes) for param in params)))
+    found = {"names": table["names"], "seed": seed_seq.entropy,
+             "mean": summary["mean"],
+             "std": np.sqrt(summary["sq_dev"]/engagements),
+             "win_rate": summary["wins"]/engagements,
+             "percentiles": {percentile: _hist_percentile(
+                 summary["hist"], percentile, engagements)
+                             for percentile in percentiles}}
+    if keep_samples:
+        found["ttk"] = np.concatenate(summary["ttk"], axis=1)
+    return found
+
+
+def main(argv=None):
+    """Print the simulated ttk of the guns given on the command line."""
+    parser = argparse.ArgumentParser(description="Simulate engagements to"
+                                     " find the spread of guns' ttk.")
+    parser.add_argument('data', type=str, choices=list(ARSENALS.keys()),
+                        help="The data the weapons are from.")
+    parser.add_argument('weapons', type=str, nargs='+',
+                        help="The names of weapons or the class of weapons.")
+    parser.add_argument('--dist', type=float, default=20,
+                        help="The distance to target.")
+    parser.add_argument('--head', type=float, default=0.2,
+                        help="The chance a hit is a headshot, 0 to 1.")
+    parser.add_argument('--hit', type=float, default=0.8,
+                        help="The chance a shot hits, 0 to 1.")
+    parser.add_argument('--reaction', type=float, default=[0, 0], nargs=2,
+                        help="The mean and standard deviation of the reaction"
+                        " time in ms.")
+    parser.add_argument('--inc_ads', action='store_true',
+                        help="Include the ads time in the ttk.")
+    parser.add_argument('--engagements', type=int, default=10**6,
+                        help="The number of engagements to simulate.")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="The seed of the simulation.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="The number of processes to simulate with.")
+    args = parser.parse_args(argv)
+
+    guns, _ = (ARSENALS[args.data](args.weapons)
+               .get_guns_or_types_and_return_valid_names(args.weapons))
+    try:
+        found = simulate(guns, args.dist, engagements=args.engagements,
+                         head_prob=args.head, hit_prob=args.hit,
+                         reaction_ms=args.reaction, inc_ads=args.inc_ads,
+                         seed=args.seed, workers=args.workers)
+    except ValueError as err:
+        parser.error(str(err))
+    print(f"seed {found['seed']}")
+    print(f"{'gun':14} {'mean ms':>9} {'p10 ms':>9} {'p50 ms':>9}"
+          f" {'p90 ms':>9} {'wins %':>7}")
+    for row, name in enumerate(found["names"]):
+        print(f"{name:14} {found['mean'][row]:9.1f}"
+              + "".join(f" {found['percentiles'][percentile][row]:9.1f}"
+                        for percentile in (10, 50, 90))
+              + f" {found['win_rate'][row]*100:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
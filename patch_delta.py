@@ -0,0 +1,180 @@
+"""Script to report how the guns changed between two balance patches.
+
+The patches are the ones listed in weapons.json. Only the guns whose weapon
+changed between the two patches have their btk and ttk worked out, for both
+patches, the rest are unchanged by definition and nothing is worked out for
+them. With the ttk cache on, results saved for a
+gun in earlier runs are reused too, whichever patch they were worked out for,
+as the cache is keyed on the gun's stats rather than the patch.
+
+Functions:
+----------
+changed_weapons() - return the weapon classes that differ between two patches.
+patch_delta()     - return the per gun changes between two patches.
+format_delta()    - return the changes as a printable report.
+main()            - print the report for the patches given on the command line.
+"""
+
+import argparse
+import numpy as np
+
+import gun_obj
+import ttk_cache
+import weapon_registry
+from preset_arsenals import ARSENALS
+
+# (report name, function returning the stat from a gun)
+_STATS = (("dam", lambda gun: gun._dam),
+          ("falloff", lambda gun: (gun._dam_prof[0][0], gun._dam_prof[1][0])),
+          ("rof", lambda gun: gun.rof),
+          ("velocity", lambda gun: gun.velocity),
+          ("aim_down", lambda gun: gun.aim_down))
+
+
+def changed_weapons(old_patch, new_patch):
+    """Return the names of the weapon classes that differ between the patches.
+
+    Weapons that are in only one of the patches count as changed.
+    """
+    old = weapon_registry.weapons_as_of(gun_obj._REGISTRY, old_patch)
+    new = weapon_registry.weapons_as_of(gun_obj._REGISTRY, new_patch)
+    return sorted(cls_name for cls_name in old.keys() | new.keys()
+                  if old.get(cls_name) != new.get(cls_name))
+
+def _gun_tables(gun, dists, cache):
+    """Return the btk and ttk of the gun at the distances."""
+    if cache is not None:
+        return cache.gun_tables(gun, dists)
+    return {"btk": gun.btk_array(dists), "ttk": gun.ttk_array(dists)}
+
+def _unchanged_row(name, dists):
+    """Return the row of a gun that is the same in both patches."""
+    return {"name": name, "status": "unchanged", "stats": {},
+            "btk_change": np.zeros(len(dists), dtype=int),
+            "ttk_change": np.zeros(len(dists)), "recomputed": False}
+
+def _guns_by_name(arsenal):
+    """Return a dict of gun name -> gun of the guns in the arsenal."""
+    if arsenal.gun_rack is None:
+        return {}
+    return {gun.name: gun for gun in arsenal.get_all_guns()}
+
+def patch_delta(data, old_patch, new_patch, dists, names=None, cache=None):
+    """Return how each gun of a preset arsenal changed between two patches.
+
+    Inputs:
+    -------
+    data      - str, the preset arsenal, a key of preset_arsenals.ARSENALS
+    old_patch - str, the patch to compare from, see weapons.json
+    new_patch - str, the patch to compare to
+    dists     - 1d array like of distances to compare the btk and ttk at
+    names     - list of str, only compare these guns or gun types, defaults
+                to every gun in the arsenal
+    cache     - ttk_cache.TtkCache to keep the results in, optional
+
+    Returns:
+    --------
+    list of dict, one per gun in the order of the new arsenal followed by any
+    guns that were removed, with the keys:
+        "name"       - str, the gun's name
+        "status"     - str, one of "added", "removed", "changed" and
+                       "unchanged"
+        "stats"      - dict of stat -> (old, new) for each stat that changed
+        "btk_change" - np.ndarray of the new minus old btk at each distance,
+                       None if the gun was added or removed
+        "ttk_change" - np.ndarray of the new minus old ttk at each distance,
+                       None if the gun was added or removed
+        "recomputed" - bool, False if the gun is unchanged and its btk and
+                       ttk weren't worked out
+
+    Raises:
+    -------
+    ValueError - if either patch isn't in weapons.json.
+    """
+    dists = np.asarray(dists, dtype=float)
+    changed = set(changed_weapons(old_patch, new_patch))
+    new_guns = _guns_by_name(ARSENALS[data](names, patch=new_patch))
+    if not changed:
+        return [_unchanged_row(name, dists) for name in new_guns]
+    old_guns = _guns_by_name(ARSENALS[data](names, patch=old_patch))
+
+    rows = []
+    for name in list(new_guns) + [name for name in old_guns
+                                  if name not in new_guns]:
+        old_gun = old_guns.get(name)
+        new_gun = new_guns.get(name)
+        if old_gun is None or new_gun is None:
+            rows.append({"name": name, "stats": {}, "btk_change": None,
+                         "ttk_change": None, "recomputed": True,
+                         "status": "added" if old_gun is None else "removed"})
+            continue
+        if type(new_gun).__name__ not in changed or new_gun == old_gun:
+            rows.append(_unchanged_row(name, dists))
+            continue
+
+        row = {"name": name, "status": "changed", "stats": {},
+               "recomputed": True}
+        for stat, get_stat in _STATS:
+            if get_stat(old_gun) != get_stat(new_gun):
+                row["stats"][stat] = (get_stat(old_gun), get_stat(new_gun))
+        old_tables = _gun_tables(old_gun, dists, cache)
+        new_tables = _gun_tables(new_gun, dists, cache)
+        row["btk_change"] = new_tables["btk"] - old_tables["btk"]
+        row["ttk_change"] = new_tables["ttk"] - old_tables["ttk"]
+        rows.append(row)
+    return rows
+
+def format_delta(rows, dists):
+    """Return the rows from 'patch_delta' as a report, a line per gun.
+
+    Unchanged guns are left out.
+    """
+    lines = []
+    for row in rows:
+        if row["status"] == "unchanged":
+            continue
+        line = f"{row['name']}: {row['status']}"
+        if row["status"] == "changed":
+            stats = ", ".join(f"{stat} {old} -> {new}"
+                              for stat, (old, new) in row["stats"].items())
+            worst = np.argmax(np.abs(row["ttk_change"]))
+            line += (f" ({stats}). ttk {np.mean(row['ttk_change']):+.1f}ms on"
+                     f" average, {row['ttk_change'][worst]:+.1f}ms at"
+                     f" {dists[worst]:g}m")
+            if np.any(row["btk_change"]):
+                line += (f", btk changes at"
+                         f" {np.count_nonzero(row['btk_change'])} of"
+                         f" {len(dists)} distances")
+        lines.append(line)
+    if not lines:
+        return "No guns changed."
+    return "\n".join(lines)
+
+def main(argv=None):
+    """Print the changes between the patches given on the command line."""
+    patches = weapon_registry.patch_names(gun_obj._REGISTRY)
+    parser = argparse.ArgumentParser(description="Report how the guns in a"
+                                     " preset arsenal changed between two"
+                                     " balance patches.")
+    parser.add_argument('data', type=str, choices=list(ARSENALS.keys()),
+                        help="The preset arsenal to compare.")
+    parser.add_argument('old_patch', type=str, choices=patches,
+                        help="The patch to compare from.")
+    parser.add_argument('new_patch', type=str, choices=patches,
+                        help="The patch to compare to.")
+    parser.add_argument('--weapons', type=str, nargs="+", default=None,
+                        help="Only compare these weapons or weapon classes.")
+    parser.add_argument('--range', type=float, default=[0, 150], nargs=2,
+                        help="The min and max distance to compare over.")
+    parser.add_argument('--num_points', type=int, default=151,
+                        help="The number of distances to compare at.")
+    args = parser.parse_args(argv)
+
+    dists = np.linspace(args.range[0], args.range[1], args.num_points)
+    rows = patch_delta(args.data, args.old_patch, args.new_patch, dists,
+                       names=args.weapons, cache=ttk_cache.default_cache())
+    print(format_delta(rows, dists))
+
+
+if __name__ == "__main__":
+    main()
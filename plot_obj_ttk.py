@@ -1,117 +1,189 @@
-"""Script to plot weapon ttk over distance for guns."""
+"""Script to plot weapon ttk over distance for guns.
+
+matplotlib is only imported once a figure is made, so '--compute_only', which
+writes the curves out as csv instead, runs without it.
+
+Functions:
+----------
+build_parser()     - return the command line argument parser.
+check_args()       - raise an error for arguments that can't be plotted.
+ttk_curves()       - return the ttk curve of each gun.
+write_ttk_curves() - write the ttk curves out as csv.
+make_ttk_figure()  - return the ttk figure and its title.
+main()             - plot the figure asked for on the command line.
+"""
 
 import argparse
-import matplotlib.pyplot as plt
-import matplotlib as mpl
+import csv
+import sys
 import numpy as np
 
-import arsenal
 import file_sys
 import man_bit_plot
+import profiling
+import ttk_cache
+import ttk_matrix
 from preset_arsenals import ARSENALS
 
-parser = argparse.ArgumentParser(description="Generate ttk plots for the"
-                                 " given weapon and damage types.")
-parser.add_argument('data', type=str,
-                    choices=list(ARSENALS.keys()),
-                    help="The data to use in the plots.")
-parser.add_argument('weapons', type=str, nargs='+',
-                    help="The names of weapons or the class of weapons to"
-                    " include in the figure. See the file 'gen_arsenal' for"
-                    " the names of things or to create your own set of guns!")
-
-# data configuration
-parser.add_argument('--range', type=int, default=[0, 150], nargs='+',
-                    help="The range of distance to target values used for the"
-                    " charts. Give 2 values with the first being min. Note"
-                    " that this will also set the x axis range.")
-parser.add_argument("--inc_ads", type=bool, default=False,
-                    help="Bool: Include the ads time in the ttk calculation")
-
-# figure customisation
-parser.add_argument('--y_lim', type=int, default=[0, 900], nargs='+',
-                    help="Sets the y axis limits (min and max). Set this to"
-                    " None if you want matplotlib to do it for you")
-parser.add_argument('--fig_size', type=float, default=[19.2, 10.8],
-                    help="The width and height of the figure. This is inches"
-                    " by default. Note that multiplying the numbers here by"
-                    " 100 gives an image resolution.")
-parser.add_argument('--fig_name', type=str, default=None,
-                    help="Set a custom name for the plot(s) generated. Note"
-                    " that 'Time to kill' is always suffixed")
-parser.add_argument('--dark_mode', type=bool, default=True,
-                    help="Use matplotlib dark mode.")
-parser.add_argument('--f_size', type=int, default=20,
-                    help="This determines the font size used for the figure"
-                    " title and axis labels.")
-parser.add_argument('--tick_size', type=float, default=0.8,
-                    help="The relative axis tick font size compared to the"
-                    " given 'f_size'.")
-parser.add_argument('--num_points', type=int, default=150,
-                    help="The number of points to use on the charts. A higher"
-                    " value will increase the resolution of the lines, so"
-                    " increase this if the plot isn't smooth where it should"
-                    " curve.")
-
-parser.add_argument('--save', type=str, default=None,
-                    help="Where to save the figure. If left empty matplotlib"
-                    " will display the graphs in interactive mode.")
-args = parser.parse_args()
-
-# TODO: object?
-double_val_args = {"fig_size": args.fig_size, "y_lim": args.y_lim,
-                   "range": args.range}
-for arg_name in double_val_args:
-    arg_len = len(double_val_args[arg_name])
-    if arg_len != 2:
-        raise ValueError(f"argument {arg_name} has {arg_len} values instead of"
-                         # TODO magic constant
-                         " 2. Please ensure only two values (a min and max)"
-                         " are given.")
-    if arg_name != "fig_size":
-        if double_val_args[arg_name][0] > double_val_args[arg_name][1]:
-            raise ValueError(f"argument {arg_name} has a minimum larger than"
-                             " or equal to the maximum value. Please ensure"
-                             " the second value given to this parameter is"
-                             " larger than the first")
-
-arsenal = ARSENALS[args.data]()
-valid_weaps, title_list = arsenal.get_guns_or_types_and_return_valid_names(args.weapons)
-
-mpl.rcParams['lines.linewidth'] = 2.5   # TODO: magic const...
-mpl.rcParams['figure.figsize'] = args.fig_size
-mpl.rcParams['xtick.labelsize'] = args.f_size*args.tick_size
-mpl.rcParams['ytick.labelsize'] = args.f_size*args.tick_size
-mpl.rcParams['axes.titlesize'] = args.f_size
-mpl.rcParams['axes.labelsize'] = args.f_size
-mpl.rcParams['legend.loc'] = "lower right"  # TODO: magic const...
-mpl.rcParams['legend.fontsize'] = args.f_size
-if args.dark_mode:
-    plt.style.use('dark_background')
-
-figs = []
-x = np.linspace(args.range[0], args.range[1], args.num_points)
-fig = plt.figure(tight_layout=True)
-for gun in valid_weaps:
-    y = np.array([gun.ttk(j, inc_ads=args.inc_ads) for j in x])
-    plt.plot(x, y, label=gun.name)
-plt.legend()
-if args.y_lim is not None:
-    plt.ylim(args.y_lim)
-plt.xlabel("Distance to Target (m)")
-plt.ylabel("Time to Kill (ms)")
-fig_title = man_bit_plot.ttk_plot_title(title_list,
-                                        fig_name=args.fig_name,
-                                        ads_time=args.inc_ads
-                                        )
-plt.title(fig_title)
-figs.append((fig, fig_title))
-
-if args.save is not None:
-    path = file_sys.create_path(args.save)
-    for figure, title in figs:
-        figure.savefig(path + title)
-else:
-    for figure, title in figs:
-        figure.show()
-    input()  # hacky way of keeping multiple plots open
+
+def build_parser():
+    """Return the argument parser for this script."""
+    parser = argparse.ArgumentParser(description="Generate ttk plots for the"
+                                     " given weapon and damage types.")
+    parser.add_argument('data', type=str,
+                        choices=list(ARSENALS.keys()),
+                        help="The data to use in the plots.")
+    parser.add_argument('weapons', type=str, nargs='+',
+                        help="The names of weapons or the class of weapons to"
+                        " include in the figure. See the file 'gen_arsenal' for"
+                        " the names of things or to create your own set of guns!")
+
+    # data configuration
+    parser.add_argument('--range', type=int, default=[0, 150], nargs='+',
+                        help="The range of distance to target values used for the"
+                        " charts. Give 2 values with the first being min. Note"
+                        " that this will also set the x axis range.")
+    parser.add_argument("--inc_ads", type=bool, default=False,
+                        help="Bool: Include the ads time in the ttk calculation")
+
+    # figure customisation
+    parser.add_argument('--y_lim', type=int, default=[0, 900], nargs='+',
+                        help="Sets the y axis limits (min and max). Set this to"
+                        " None if you want matplotlib to do it for you")
+    parser.add_argument('--fig_size', type=float, default=[19.2, 10.8],
+                        help="The width and height of the figure. This is inches"
+                        " by default. Note that multiplying the numbers here by"
+                        " 100 gives an image resolution.")
+    parser.add_argument('--fig_name', type=str, default=None,
+                        help="Set a custom name for the plot(s) generated. Note"
+                        " that 'Time to kill' is always suffixed")
+    parser.add_argument('--dark_mode', type=bool, default=True,
+                        help="Use matplotlib dark mode.")
+    parser.add_argument('--f_size', type=int, default=20,
+                        help="This determines the font size used for the figure"
+                        " title and axis labels.")
+    parser.add_argument('--tick_size', type=float, default=0.8,
+                        help="The relative axis tick font size compared to the"
+                        " given 'f_size'.")
+    parser.add_argument('--num_points', type=int, default=None,
+                        help="The number of points to sample the lines at. By"
+                        " default the exact curves are drawn from the distances"
+                        " where the bullets to kill change, so only give this if"
+                        " you want the lines sampled.")
+
+    parser.add_argument('--save', type=str, default=None,
+                        help="Where to save the figure. If left empty matplotlib"
+                        " will display the graphs in interactive mode.")
+    parser.add_argument('--compute_only', action='store_true',
+                        help="Write the ttk curves to stdout as csv rather than"
+                        " plotting them. matplotlib is not imported.")
+    return parser
+
+def check_args(args):
+    """Raise a ValueError if the min/max style arguments are malformed."""
+    # TODO: object?
+    double_val_args = {"fig_size": args.fig_size, "y_lim": args.y_lim,
+                       "range": args.range}
+    for arg_name in double_val_args:
+        arg_len = len(double_val_args[arg_name])
+        if arg_len != 2:
+            raise ValueError(f"argument {arg_name} has {arg_len} values instead of"
+                             # TODO magic constant
+                             " 2. Please ensure only two values (a min and max)"
+                             " are given.")
+        if arg_name != "fig_size":
+            if double_val_args[arg_name][0] > double_val_args[arg_name][1]:
+                raise ValueError(f"argument {arg_name} has a minimum larger than"
+                                 " or equal to the maximum value. Please ensure"
+                                 " the second value given to this parameter is"
+                                 " larger than the first")
+
+@profiling.profiled("ttk.compute")
+def ttk_curves(guns, dist_range, inc_ads=False, num_points=None, cache=None):
+    """Return the ttk curve of each gun over the range of distances.
+
+    Inputs:
+    -------
+    guns       - iterable of gun objects
+    dist_range - the min and max distance to target, meters
+    inc_ads    - bool, include the ads time in the ttk
+    num_points - number of distances to sample the curves at. If None the
+                 exact curves are returned.
+    cache      - ttk_cache.TtkCache to keep sampled curves in, optional
+
+    Returns:
+    --------
+    list of (gun name, distances, ttks) tuples
+    """
+    if num_points is None:
+        return [(gun.name,) + gun.ttk_curve(dist_range[0], dist_range[1],
+                                            inc_ads=inc_ads)
+                for gun in guns]
+    x = np.linspace(dist_range[0], dist_range[1], num_points)
+    if cache is not None:
+        return [(gun.name, x, cache.gun_tables(gun, x, inc_ads=inc_ads)["ttk"])
+                for gun in guns]
+    table = ttk_matrix.ttk_matrix(guns, x, inc_ads=inc_ads)
+    return [(name, x, y) for name, y in zip(table["names"], table["ttk"])]
+
+def write_ttk_curves(curves, out):
+    """Write the curves from 'ttk_curves' to out as csv.
+
+    There is a row per point on each curve with the gun name, the distance in
+    meters and the ttk in ms.
+    """
+    writer = csv.writer(out)
+    writer.writerow(["name", "dist", "ttk"])
+    for name, x, y in curves:
+        writer.writerows((name, repr(dist), repr(ttk))
+                         for dist, ttk in zip(x.tolist(), y.tolist()))
+
+def make_ttk_figure(args, arsenal, cache=None):
+    """Return the ttk figure described by args and its title."""
+    valid_weaps, title_list = (
+        arsenal.get_guns_or_types_and_return_valid_names(args.weapons))
+    curves = ttk_curves(valid_weaps, args.range, inc_ads=args.inc_ads,
+                        num_points=args.num_points, cache=cache)
+    fig_title = man_bit_plot.ttk_plot_title(title_list,
+                                            fig_name=args.fig_name,
+                                            ads_time=args.inc_ads
+                                            )
+    fig = man_bit_plot.plot_ttk_curves(curves, fig_title, y_lim=args.y_lim,
+                                       fig_size=args.fig_size,
+                                       f_size=args.f_size,
+                                       tick_size=args.tick_size,
+                                       dark_mode=args.dark_mode)
+    return fig, fig_title
+
+def main(argv=None):
+    """Plot the ttk figure asked for on the command line."""
+    args = build_parser().parse_args(argv)
+    check_args(args)
+
+    if args.compute_only:
+        valid_weaps, _ = (ARSENALS[args.data](args.weapons)
+                          .get_guns_or_types_and_return_valid_names(
+                              args.weapons))
+        write_ttk_curves(ttk_curves(valid_weaps, args.range,
+                                    inc_ads=args.inc_ads,
+                                    num_points=args.num_points,
+                                    cache=ttk_cache.default_cache()),
+                         sys.stdout)
+        return
+
+    figs = [make_ttk_figure(args, ARSENALS[args.data](args.weapons),
+                            cache=ttk_cache.default_cache())]
+
+    if args.save is not None:
+        path = file_sys.create_path(args.save)
+        for figure, title in figs:
+            with profiling.span("figure.save"):
+                figure.savefig(path + title)
+    else:
+        for figure, title in figs:
+            figure.show()
+        input()  # hacky way of keeping multiple plots open
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
 """Premade arsenals for use in the main program.
 
+Each arsenal is described by a list of gun specs rather than built up front.
+Only the guns that are asked for get made, with 'Gun.with_attachments' from a
+template of the naked gun that is made once per gun class and never handed
+out. So asking for two weapons costs the same however many guns the arsenal
+has.
+
 Functions:
 ----------
 make_naked_arsenal()                    - return arsenal with no attachments.
@@ -12,123 +18,125 @@ make_heavy_barrel_long_barrel_arsenal() - return arsenal with only one of each
 make_barrel_compare_arsenal() - return arsenal only with guns that are affected
                                 heavy or long barrel. All possible combinations
                                 that result in different TTKs are included.
+
+All of them take an optional list of gun names and gun types, eg:
+['MP7', 'AR'], to only put the guns that match in the arsenal, and an optional
+patch name from weapons.json to build the arsenal as it was in that patch.
 """
 
+from functools import lru_cache
 
 from arsenal import Arsenal
 import gun_obj
-
-def make_naked_arsenal():
+import profiling
+
+# (name, gun class, barrel or None for no barrel)
+_NAKED_SPECS = [
+    ("AK74", gun_obj.Ak74, None),
+    ("M4A1", gun_obj.M4a1, None),
+    ("AK15", gun_obj.Ak15, None),
+    ("SCAR-H", gun_obj.ScarH, None),
+    ("ACR", gun_obj.Acr, None),
+    ("AUG_A3", gun_obj.AugA3, None),
+    ("SG550", gun_obj.Sg550, None),
+    ("FAL", gun_obj.Fal, None),
+    ("G36C", gun_obj.G36c, None),
+    ("FAMAS", gun_obj.Famas, None),
+    ("HK419", gun_obj.Hk419, None),
+
+    ("L86A1", gun_obj.L86a1, None),
+    ("M249", gun_obj.M249, None),
+
+    ("MP7", gun_obj.Mp7, None),
+    ("UMP-45", gun_obj.Ump45, None),
+    ("PP2000", gun_obj.Pp2000, None),
+    ("KRISS_VECTOR", gun_obj.KrissVector, None),
+    ("MP5", gun_obj.Mp5, None),
+    ("PP19", gun_obj.Pp19, None),
+
+    ("HONEY_BADGER", gun_obj.HoneyBadger, None),
+    ("P90", gun_obj.P90, None),
+    ("GROZA", gun_obj.Groza, None),
+
+    ("AS_VAL", gun_obj.AsVal, None),
+]
+
+_BARREL_SPECS = [
+    ("AK74_HB", gun_obj.Ak74, gun_obj.HeavyBarrel),
+    ("AUG_A3_HB", gun_obj.AugA3, gun_obj.HeavyBarrel),
+    ("HK419_HB", gun_obj.Hk419, gun_obj.HeavyBarrel),
+    ("L86A1_LB", gun_obj.L86a1, gun_obj.LongBarrel),
+]
+
+_BARREL_COMPARE_SPECS = [
+    ("AK74", gun_obj.Ak74, None),
+    ("AK74_HB", gun_obj.Ak74, gun_obj.HeavyBarrel),
+    ("AK74_LB", gun_obj.Ak74, gun_obj.LongBarrel),
+
+    ("AUG_A3", gun_obj.AugA3, None),
+    ("AUG_A3_HB", gun_obj.AugA3, gun_obj.HeavyBarrel),
+
+    ("L86A1", gun_obj.L86a1, None),
+    ("L86A1_LB", gun_obj.L86a1, gun_obj.LongBarrel),
+    ("L86A1_HB", gun_obj.L86a1, gun_obj.HeavyBarrel),
+
+    ("HK419", gun_obj.Hk419, None),
+    ("HK419_HB", gun_obj.Hk419, gun_obj.HeavyBarrel),
+]
+
+
+@lru_cache(maxsize=None)
+def _template(gun_cls):
+    """Return the naked gun of the class that preset guns are copied from.
+
+    The template is never put in an arsenal, only copies of it, so it can be
+    shared by every preset.
+    """
+    return gun_cls()
+
+def _make_gun(name, gun_cls, barrel):
+    """Return a new gun made from the spec."""
+    if barrel is None:
+        return _template(gun_cls).with_attachments(name=name)
+    return _template(gun_cls).with_attachments(name=name, barrel=barrel)
+
+@profiling.profiled("arsenal.build")
+def _build_arsenal(specs, names=None, patch=None):
+    """Return an arsenal of the guns in specs whose name or type is in names.
+
+    All the guns are put in the arsenal if names is None. If a patch is given
+    the guns have their stats as of the patch and those added after it are
+    left out.
+    """
+    if patch is not None:
+        classes = gun_obj.weapon_classes(patch)
+        specs = [(name, classes[gun_cls.__name__], barrel)
+                 for name, gun_cls, barrel in specs
+                 if gun_cls.__name__ in classes]
+    if names is not None:
+        names = set(names)
+        specs = [spec for spec in specs
+                 if spec[0] in names or spec[1].GUN_TYPE in names]
+    return Arsenal(guns=[_make_gun(*spec) for spec in specs])
+
+def make_naked_arsenal(names=None, patch=None):
     """Return an arsenal with all guns with no attachments."""
-    gun_list = []
-
-    gun_list.append(gun_obj.Ak74())
-    gun_list.append(gun_obj.M4a1())
-    gun_list.append(gun_obj.Ak15())
-    gun_list.append(gun_obj.ScarH())
-    gun_list.append(gun_obj.Acr())
-    gun_list.append(gun_obj.AugA3())
-    gun_list.append(gun_obj.Sg550())
-    gun_list.append(gun_obj.Fal())
-    gun_list.append(gun_obj.G36c())
-    gun_list.append(gun_obj.Famas())
-    gun_list.append(gun_obj.Hk419())
-
-    gun_list.append(gun_obj.L86a1())
-    gun_list.append(gun_obj.M249())
-
-    gun_list.append(gun_obj.Mp7())
-    gun_list.append(gun_obj.Ump45())
-    gun_list.append(gun_obj.Pp2000())
-    gun_list.append(gun_obj.KrissVector())
-    gun_list.append(gun_obj.Mp5())
-    gun_list.append(gun_obj.Pp19())
-
-    gun_list.append(gun_obj.HoneyBadger())
-    gun_list.append(gun_obj.P90())
-    gun_list.append(gun_obj.Groza())
-
-    gun_list.append(gun_obj.AsVal())
-
-    return Arsenal(guns=gun_list)
-
-def make_ttk_plot_arsenal():
+    return _build_arsenal(_NAKED_SPECS, names, patch)
+
+def make_ttk_plot_arsenal(names=None, patch=None):
     """Return an arsenal with guns that are used in the TTK plots."""
-    a = make_naked_arsenal()
-
-    # TODO: function...
-    weap = gun_obj.Ak74(gun_name="AK74_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    a.add_gun(weap)
-    weap = gun_obj.AugA3(gun_name="AUG_A3_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    a.add_gun(weap)
-    weap = gun_obj.Hk419(gun_name="HK419_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    a.add_gun(weap)
-    weap = gun_obj.L86a1(gun_name="L86A1_LB")
-    weap.swap_barrel(gun_obj.LongBarrel)
-    a.add_gun(weap)
-
-    return a
-
-def make_heavy_barrel_long_barrel_arsenal():
+    return _build_arsenal(_NAKED_SPECS + _BARREL_SPECS, names, patch)
+
+def make_heavy_barrel_long_barrel_arsenal(names=None, patch=None):
     """Return an arsenal with naked or barrel swapped guns."""
+    swapped = {gun_cls for _, gun_cls, _ in _BARREL_SPECS}
+    return _build_arsenal([spec for spec in _NAKED_SPECS
+                           if spec[1] not in swapped] + _BARREL_SPECS,
+                          names, patch)
 
-    a = make_naked_arsenal()
-
-    a.remove_gun_obj(gun_obj.Ak74())
-    a.remove_gun_obj(gun_obj.AugA3())
-    a.remove_gun_obj(gun_obj.L86a1())
-    a.remove_gun_obj(gun_obj.Hk419())
-
-    weap = gun_obj.Ak74(gun_name="AK74_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    a.add_gun(weap)
-    weap = gun_obj.AugA3(gun_name="AUG_A3_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    a.add_gun(weap)
-    weap = gun_obj.Hk419(gun_name="HK419_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    a.add_gun(weap)
-    weap = gun_obj.L86a1(gun_name="L86A1_LB")
-    weap.swap_barrel(gun_obj.LongBarrel)
-    a.add_gun(weap)
-
-    return a
-
-def make_barrel_compare_arsenal():
+def make_barrel_compare_arsenal(names=None, patch=None):
     """Return an arsenal only of the guns that are affected by heavy or long barrel."""
-
-    gun_list = []
-
-    gun_list.append(gun_obj.Ak74())
-    weap = gun_obj.Ak74(gun_name="AK74_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    gun_list.append(weap)
-    weap = gun_obj.Ak74(gun_name="AK74_LB")
-    weap.swap_barrel(gun_obj.LongBarrel)
-    gun_list.append(weap)
-
-    gun_list.append(gun_obj.AugA3())
-    weap = gun_obj.AugA3(gun_name="AUG_A3_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    gun_list.append(weap)
-
-    gun_list.append(gun_obj.L86a1())
-    weap = gun_obj.L86a1(gun_name="L86A1_LB")
-    weap.swap_barrel(gun_obj.LongBarrel)
-    gun_list.append(weap)
-    weap = gun_obj.L86a1(gun_name="L86A1_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    gun_list.append(weap)
-
-    gun_list.append(gun_obj.Hk419())
-    weap = gun_obj.Hk419(gun_name="HK419_HB")
-    weap.swap_barrel(gun_obj.HeavyBarrel)
-    gun_list.append(weap)
-
-    return Arsenal(guns=gun_list)
+    return _build_arsenal(_BARREL_COMPARE_SPECS, names, patch)
 
 ARSENALS = {"naked": make_naked_arsenal,
             "ttk_dat": make_ttk_plot_arsenal,
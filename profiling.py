@@ -0,0 +1,281 @@
+"""Named timing spans and counters for finding where the time goes.
+
+Code marks the work worth timing with a named span, eg: "arsenal.build",
+"ttk.compute" or "figure.render", and counts things with named counters.
+While collection is on each span's calls are counted and their latencies
+kept in a histogram of power of two buckets, and every call is kept as an
+event that can be written out in the Chrome trace event format (open it at
+chrome://tracing or https://ui.perfetto.dev). While it's off, which is the
+default, a span is a shared object that does nothing, so leaving them in
+costs next to nothing.
+
+Environment Variables:
+----------------------
+BB_PROFILE       - set to '1' to collect, and print a summary to stderr on
+                   exit.
+BB_PROFILE_TRACE - write a Chrome trace of the run to this path on exit,
+                   collecting even if BB_PROFILE isn't set.
+
+Functions:
+----------
+enable()      - turn collection on or off.
+enabled()     - return whether collection is on.
+span()        - return a context manager timing the block inside it.
+profiled()    - decorator timing each call of a function.
+count()       - add to a counter.
+stats()       - return the collected counts and latencies.
+summary()     - return the collected counts and latencies as a table.
+trace()       - return the collected events as a Chrome trace.
+write_trace() - write the Chrome trace to a json file.
+snapshot()    - return everything collected, to be merged elsewhere.
+merge()       - add a snapshot from another process to this one's results.
+reset()       - forget everything collected.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# latency buckets are powers of two of microseconds, the last catching the rest
+_NUM_BUCKETS = 32
+# calls kept as trace events, after this they're only counted
+_MAX_EVENTS = 10**6
+
+
+def _env_enabled():
+    """Return whether the environment variables ask for collection."""
+    return (os.environ.get("BB_PROFILE", "off").lower()
+            not in ("", "off", "0", "false")
+            or bool(os.environ.get("BB_PROFILE_TRACE")))
+
+_enabled = _env_enabled()
+_lock = threading.Lock()
+_spans = {}     # name -> [calls, total ns, min ns, max ns, bucket counts]
+_counters = {}  # name -> total
+_events = []    # Chrome trace events
+_dropped = 0    # events not kept once there were _MAX_EVENTS
+
+
+def enable(on=True):
+    """Turn collection on or off, whatever the environment variables say."""
+    global _enabled
+    _enabled = on
+
+def enabled():
+    """Return whether collection is on."""
+    return _enabled
+
+def _record(name, start_ns, duration_ns):
+    """Add a call of the span to the stats and events."""
+    global _dropped
+    bucket = min(_NUM_BUCKETS - 1, (duration_ns // 1000).bit_length())
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = [0, 0, duration_ns, duration_ns,
+                                    [0] * _NUM_BUCKETS]
+        stats[0] += 1
+        stats[1] += duration_ns
+        stats[2] = min(stats[2], duration_ns)
+        stats[3] = max(stats[3], duration_ns)
+        stats[4][bucket] += 1
+        if len(_events) < _MAX_EVENTS:
+            _events.append({"name": name, "ph": "X", "ts": start_ns/1000,
+                            "dur": duration_ns/1000, "pid": os.getpid(),
+                            "tid": threading.get_ident()})
+        else:
+            _dropped += 1
+
+
+class _Span():
+    """Times the block it is entered for."""
+
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        _record(self.name, self._start, time.perf_counter_ns() - self._start)
+        return False
+
+
+class _NullSpan():
+    """Stands in for a span while collection is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Return a context manager timing the block inside it as span name.
+
+    eg:
+        with profiling.span("arsenal.build"):
+            ...
+    """
+    return _Span(name) if _enabled else _NULL_SPAN
+
+def profiled(name):
+    """Decorator timing each call of the function as span name."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, amount=1):
+    """Add amount to the counter called name."""
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + amount
+        if len(_events) < _MAX_EVENTS:
+            _events.append({"name": name, "ph": "C",
+                            "ts": time.perf_counter_ns()/1000,
+                            "pid": os.getpid(), "args": {name: total}})
+
+def _percentile(buckets, fraction, max_ns):
+    """Return the upper bound in ns of the bucket holding the fraction."""
+    target = fraction*sum(buckets)
+    seen = 0
+    for bucket, calls in enumerate(buckets):
+        seen += calls
+        if calls and seen >= target:
+            return min(max_ns, 2**bucket*1000)
+    return max_ns
+
+def stats():
+    """Return the counts and latencies collected so far.
+
+    Returns:
+    --------
+    dict with the keys:
+        "spans"    - dict of span name -> dict of "calls", and "total_ms",
+                     "mean_ms", "min_ms", "p50_ms", "p99_ms" and "max_ms".
+                     The percentiles are the upper bounds of their histogram
+                     buckets.
+        "counters" - dict of counter name -> total
+    """
+    with _lock:
+        spans = {name: (calls, total, min_ns, max_ns, list(buckets))
+                 for name, (calls, total, min_ns, max_ns, buckets)
+                 in _spans.items()}
+        counters = dict(_counters)
+    return {"spans": {name: {"calls": calls, "total_ms": total/1e6,
+                             "mean_ms": total/calls/1e6,
+                             "min_ms": min_ns/1e6,
+                             "p50_ms": _percentile(buckets, 0.5, max_ns)/1e6,
+                             "p99_ms": _percentile(buckets, 0.99, max_ns)/1e6,
+                             "max_ms": max_ns/1e6}
+                      for name, (calls, total, min_ns, max_ns, buckets)
+                      in spans.items()},
+            "counters": counters}
+
+def summary():
+    """Return the counts and latencies collected as a table, slowest first."""
+    collected = stats()
+    lines = [f"{'span':24} {'calls':>8} {'total ms':>10} {'mean ms':>9}"
+             f" {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for name, span_stats in sorted(collected["spans"].items(),
+                                   key=lambda item: -item[1]["total_ms"]):
+        lines.append(f"{name:24} {span_stats['calls']:8}"
+                     f" {span_stats['total_ms']:10.3f}"
+                     f" {span_stats['mean_ms']:9.3f}"
+                     f" {span_stats['p50_ms']:9.3f}"
+                     f" {span_stats['p99_ms']:9.3f}"
+                     f" {span_stats['max_ms']:9.3f}")
+    for name, total in sorted(collected["counters"].items()):
+        lines.append(f"{name:24} {total:8} (counter)")
+    if _dropped:
+        lines.append(f"{_dropped} calls weren't kept as trace events.")
+    return "\n".join(lines)
+
+def trace():
+    """Return the events collected as a Chrome trace event format dict."""
+    with _lock:
+        return {"traceEvents": list(_events), "displayTimeUnit": "ms"}
+
+def write_trace(path):
+    """Write the events collected to path as Chrome trace event json."""
+    with open(path, "w", encoding="utf-8") as out:
+        json.dump(trace(), out)
+
+def snapshot(clear=False):
+    """Return everything collected, so it can be merged into another process.
+
+    Inputs:
+    -------
+    clear - bool, forget what was collected once it's in the snapshot
+    """
+    global _dropped
+    with _lock:
+        collected = {"spans": {name: (calls, total, min_ns, max_ns,
+                                      list(buckets))
+                               for name, (calls, total, min_ns, max_ns,
+                                          buckets) in _spans.items()},
+                     "counters": dict(_counters), "events": list(_events),
+                     "dropped": _dropped}
+        if clear:
+            _spans.clear()
+            _counters.clear()
+            _events.clear()
+            _dropped = 0
+    return collected
+
+def merge(collected):
+    """Add a snapshot, eg: from a worker process, to what's been collected."""
+    global _dropped
+    with _lock:
+        for name, (calls, total, min_ns, max_ns, buckets) in (
+                collected["spans"].items()):
+            stats = _spans.get(name)
+            if stats is None:
+                _spans[name] = [calls, total, min_ns, max_ns, list(buckets)]
+                continue
+            stats[0] += calls
+            stats[1] += total
+            stats[2] = min(stats[2], min_ns)
+            stats[3] = max(stats[3], max_ns)
+            stats[4] = [mine + theirs for mine, theirs
+                        in zip(stats[4], buckets)]
+        for name, total in collected["counters"].items():
+            _counters[name] = _counters.get(name, 0) + total
+        room = _MAX_EVENTS - len(_events)
+        _events.extend(collected["events"][:room])
+        _dropped += (collected["dropped"]
+                     + max(0, len(collected["events"]) - room))
+
+def reset():
+    """Forget everything collected."""
+    snapshot(clear=True)
+
+def _report_at_exit(pid):
+    """Print the summary and write the trace asked for by the environment."""
+    if os.getpid() != pid or not (_spans or _counters):
+        return  # a forked child, or nothing to report
+    if os.environ.get("BB_PROFILE_TRACE"):
+        write_trace(os.environ["BB_PROFILE_TRACE"])
+    print(summary(), file=sys.stderr)
+
+if _enabled:
+    atexit.register(_report_at_exit, os.getpid())
@@ -0,0 +1,279 @@
+"""Precomputed ranking of guns by ttk over distance.
+
+Each gun's ttk is a constant plus the bullet's time of flight over each of
+its btk intervals, so it is a straight line in distance between its btk
+steps. The order of the guns can then only change at one of their btk steps
+or where two of their lines cross. Splitting the distances at all of those
+points leaves intervals over which the order doesn't change, and the order is
+worked out once for each. Asking for the fastest guns at a distance is then a
+binary search for its interval and a slice of that interval's order.
+
+Guns with the same ttk keep the order they were given in. Exactly at the
+distance two guns cross they have the same ttk, so either order is right
+there.
+
+Like 'Gun.btk_intervals' each interval holds for start < dist <= end, as at a
+btk step the lower btk still holds. The steps in the falloff range are found
+with floats though, so a distance exactly on the start of an interval is
+ranked by the guns' 'Gun.ttk' there instead.
+
+Classes:
+--------
+RankingIndex - the order of a set of guns by ttk over each distance interval.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from math import inf
+import numpy as np
+
+import ttk_matrix
+
+
+class RankingIndex():
+    """The guns of an arsenal ordered by ttk over distance intervals.
+
+    When a gun's loadout changes, 'update_gun' (or 'refresh' to find the
+    changed guns) reworks only the parts of the index that gun touches: its
+    btk steps, where it crosses the other guns and where it sits in each
+    interval's order.
+
+    Instance Variables:
+    -------------------
+    guns     - list of gun objects, in the order ties are broken
+    max_dist - the distance the index goes up to, meters
+    inc_ads  - bool, whether the ttk includes the aim down sights time
+    """
+
+    def __init__(self, guns, max_dist=inf, inc_ads=False):
+        """Rank the guns over the distances from 0 to max_dist.
+
+        Inputs:
+        -------
+        guns     - an Arsenal or iterable of gun objects
+        max_dist - the distance to rank up to, meters. Defaults to infinity.
+        inc_ads  - bool, include the aim down sights time in the ttk
+
+        Raises:
+        -------
+        ValueError - if max_dist isn't more than 0.
+        """
+        if not max_dist > 0:
+            raise ValueError("RankingIndex: max_dist must be more than 0.")
+        self.guns = ttk_matrix._gun_list(guns)
+        self.max_dist = max_dist
+        self.inc_ads = inc_ads
+        self._positions = {id(gun): pos for pos, gun in enumerate(self.guns)}
+        self._steps = [self._gun_steps(gun) for gun in self.guns]
+        self._fingerprints = [gun.fingerprint() for gun in self.guns]
+        self._points = Counter()  # distance -> number of steps/crossings at it
+        for steps in self._steps:
+            self._points.update(steps[0][1:])
+        self._crossings = {}      # (pos, pos) -> distances the pair cross at
+        lines = ttk_matrix._segment_lines(self._steps, self.max_dist)
+        for pos in range(len(self.guns) - 1):
+            self._set_crossings(pos, range(pos + 1, len(self.guns)), lines)
+
+        self._starts = [0] + sorted(self._points)
+        # stable so that equal ttks keep the order the guns were given in
+        self._orders = [tuple(order.tolist()) for order in np.argsort(
+            self._interval_ttks(), axis=0, kind="stable").T]
+
+    def _gun_steps(self, gun):
+        """Return the gun's btk interval starts, ttk less tof and ms/m."""
+        intervals = gun.btk_intervals(0, self.max_dist, inc_ads=self.inc_ads)
+        return ([interval[0] for interval in intervals],
+                np.array([interval[3] for interval in intervals]),
+                gun.velocity)
+
+    def _ttk_without_tof(self, pos, dists):
+        """Return the ttk less tof of the gun at pos at dists.
+
+        dists is an array, or a float for which a float is returned.
+        """
+        starts, ttk_without_tof, _ = self._steps[pos]
+        if isinstance(dists, float):
+            # a bisect of the list is much quicker than numpy for one distance
+            return float(ttk_without_tof[bisect_right(starts, dists) - 1])
+        return ttk_without_tof[np.searchsorted(starts, dists, side="right") - 1]
+
+    def _segments(self, starts):
+        """Return the starts, ends and a distance inside each segment.
+
+        Inputs:
+        -------
+        starts - sorted list of the distances the segments start at, the first
+                 being 0.
+        """
+        starts = np.array(starts, dtype=float)
+        ends = np.append(starts[1:], self.max_dist)
+        # nothing changes past the last start so any distance will do there
+        mids = (starts + np.append(ends[:-1], min(self.max_dist,
+                                                  starts[-1] + 2)))/2
+        return starts, ends, mids
+
+    def _gun_ttks(self, pos, dists):
+        """Return the ttk of the gun at pos at dists, an array or a float."""
+        # same order of operations as Gun.ttk
+        return (self._ttk_without_tof(pos, dists)
+                + dists/self._steps[pos][2]*1000)
+
+    def _interval_ttks(self):
+        """Return the (guns x intervals) ttk of each gun inside each interval."""
+        _, _, mids = self._segments(self._starts)
+        return np.array([self._gun_ttks(pos, mids)
+                         for pos in range(len(self.guns))]
+                        ).reshape(len(self.guns), mids.size)
+
+    def _set_crossings(self, pos, others, lines):
+        """Work out where the gun at pos crosses each of the others.
+
+        Between the btk steps of every gun each ttk is a line, so the pair
+        cross at most once in each of those segments.
+
+        Inputs:
+        -------
+        pos    - the position of the gun
+        others - iterable of the positions of the other guns
+        lines  - the guns' ttk lines, see 'ttk_matrix._segment_lines'
+        """
+        others = np.fromiter(others, dtype=int)
+        if others.size == 0:
+            return
+        starts, ends, consts, slopes = lines
+        # only uses the pair's own stats, so the distances found don't depend
+        # on the other guns in the index
+        dists, crosses = ttk_matrix._line_crossings(
+            starts, ends, consts[pos] - consts[others],
+            slopes[pos] - slopes[others])
+        for other, other_dists, other_crosses in zip(others.tolist(), dists,
+                                                     crosses):
+            if other_crosses.any():
+                found = other_dists[other_crosses].tolist()
+                self._crossings[min(pos, other), max(pos, other)] = found
+                self._points.update(found)
+
+    def _position(self, gun):
+        """Return the position of the gun object, raising ValueError if absent."""
+        try:
+            return self._positions[id(gun)]
+        except KeyError:
+            raise ValueError(f"RankingIndex: '{gun.name}' isn't one of the"
+                             " indexed guns.") from None
+
+    def _interval(self, dist):
+        """Return the index of the interval holding dist, see 'intervals'.
+
+        Raises:
+        -------
+        ValueError - if dist is outside 0 to max_dist.
+        """
+        if not 0 <= dist <= self.max_dist:
+            raise ValueError(f"RankingIndex: dist must be between 0 and"
+                             f" {self.max_dist:g}.")
+        return max(0, bisect_left(self._starts, dist) - 1)
+
+    def top(self, dist, k=None):
+        """Return the k guns with the lowest ttk at dist, fastest first.
+
+        All of the guns are returned if k is None.
+        """
+        interval = self._interval(dist)
+        if (interval + 1 < len(self._starts)
+                and self._starts[interval + 1] == dist):
+            # on a step, which side of it 'Gun.btk' gives isn't certain
+            ttks = [gun.ttk(dist, inc_ads=self.inc_ads) for gun in self.guns]
+            order = sorted(range(len(self.guns)),
+                           key=lambda pos: (ttks[pos], pos))
+        else:
+            order = self._orders[interval]
+        return [self.guns[pos] for pos in order[:k]]
+
+    def intervals(self):
+        """Return the intervals over which the order of the guns is fixed.
+
+        Returns:
+        --------
+        list of (start_m, end_m, list of gun objects fastest first) tuples
+        ordered by distance. Each order holds for start_m < dist <= end_m,
+        and the first from 0 on. Exactly on a btk step a gun can have the btk
+        of the interval after, see 'Gun.btk_intervals'.
+        """
+        ends = self._starts[1:] + [self.max_dist]
+        return [(start, end, [self.guns[pos] for pos in order])
+                for start, end, order in zip(self._starts, ends, self._orders)]
+
+    def leaders(self):
+        """Return the fastest gun over each range of distances.
+
+        Returns:
+        --------
+        list of (start_m, end_m, gun object) tuples ordered by distance, with
+        the neighbouring intervals that have the same fastest gun merged.
+        """
+        leaders = []
+        for start, end, guns in self.intervals():
+            if not guns:
+                break
+            if leaders and leaders[-1][2] is guns[0]:
+                leaders[-1] = (leaders[-1][0], end, guns[0])
+            else:
+                leaders.append((start, end, guns[0]))
+        return leaders
+
+    def update_gun(self, gun):
+        """Rework the index after the loadout of one of its guns changed.
+
+        Only the gun's own btk steps and crossings are worked out again. The
+        other guns keep their order relative to each other in every interval,
+        so the gun is taken out of each order and put back in at its new ttk.
+        The other guns' ttk are only worked out for those the binary search
+        compares it with.
+
+        Raises:
+        -------
+        ValueError - if the gun object isn't one of the indexed guns.
+        """
+        pos = self._position(gun)
+        old_starts, old_orders = self._starts, self._orders
+
+        self._points.subtract(self._steps[pos][0][1:])
+        for other in range(len(self.guns)):
+            if other != pos:
+                self._points.subtract(
+                    self._crossings.pop((min(pos, other), max(pos, other)), ()))
+        self._steps[pos] = self._gun_steps(gun)
+        self._fingerprints[pos] = gun.fingerprint()
+        self._points.update(self._steps[pos][0][1:])
+        self._set_crossings(pos, (other for other in range(len(self.guns))
+                                  if other != pos),
+                            ttk_matrix._segment_lines(self._steps,
+                                                      self.max_dist))
+        self._points = +self._points  # drop the distances no longer used
+
+        self._starts = [0] + sorted(self._points)
+        _, _, mids = self._segments(self._starts)
+        self._orders = []
+        for mid, ttk in zip(mids.tolist(), self._gun_ttks(pos, mids).tolist()):
+            order = [other for other
+                     in old_orders[bisect_right(old_starts, mid) - 1]
+                     if other != pos]
+            order.insert(bisect_right(
+                order, (ttk, pos),
+                key=lambda other: (self._gun_ttks(other, mid), other)),
+                pos)
+            self._orders.append(tuple(order))
+
+    def refresh(self):
+        """Update the index for every gun whose loadout has changed.
+
+        Returns:
+        --------
+        list of gun objects that were updated.
+        """
+        changed = [gun for gun, fingerprint in zip(self.guns,
+                                                   self._fingerprints)
+                   if gun.fingerprint() != fingerprint]
+        for gun in changed:
+            self.update_gun(gun)
+        return changed
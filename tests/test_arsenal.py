@@ -53,6 +53,10 @@ class GenArsenalTesting(unittest.TestCase):
         a.remove_gun_obj(gun_obj.Mp5())
         self.assertEqual(a.gun_rack, {"AR": [gun_list[1]]})
         self.assertEqual(a.num_in_storage, 1)
+        with self.assertRaises(ValueError):
+            a.remove_gun_obj(gun_obj.Ak74())  # an AR, but not in the rack
+        self.assertEqual(a.gun_rack, {"AR": [gun_list[1]]})
+        self.assertEqual(a.num_in_storage, 1)
         a.remove_gun_obj(gun_obj.ScarH())
         self.assertEqual(a.gun_rack, None)
         self.assertEqual(a.num_in_storage, 0)
@@ -79,5 +83,27 @@ class GenArsenalTesting(unittest.TestCase):
         self.assertEqual(a.get_guns_or_types_and_return_valid_names(["SMG", "MP7"]), ([gun_list[2], gun_list[3]], ["SMG"]))
         self.assertEqual(a.get_guns_or_types_and_return_valid_names(["Patriot"]), ([gun_list[4]], ["Patriot"]))
 
+    def test_indexes_follow_add_and_remove(self):
+        scar = gun_obj.ScarH()
+        patriot = gun_obj.ScarH(gun_name="Patriot")
+        a = ga.Arsenal([scar, gun_obj.Mp5()])
+        a.add_gun(patriot)
+        self.assertIs(a.get_weapon_by_name("Patriot"), patriot)
+        # patriot is equal to the scar so the scar, added first, is removed
+        a.remove_gun_obj(patriot)
+        self.assertIsNone(a.get_weapon_by_name("SCAR-H"))
+        self.assertIs(a.get_weapon_by_name("Patriot"), patriot)
+        a.remove_gun_obj(gun_obj.Mp5())
+        self.assertEqual(a.get_all_gun_types(), ["AR"])
+        self.assertEqual(a.get_guns_or_types_and_return_valid_names(["SMG"]),
+                         ([], []))
+
+    def test_many_names(self):
+        guns = [gun_obj.Mp7(gun_name=f"MP7 {num}") for num in range(500)]
+        a = ga.Arsenal(guns)
+        names = [gun.name for gun in reversed(guns)] + ["MP7 0", "banana"]
+        self.assertEqual(a.get_guns_or_types_and_return_valid_names(names),
+                         (guns[::-1], names[:-2]))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Test batch_plot.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_batch_plot.py
+"""
+
+import json
+import os
+import tempfile
+import unittest
+import batch_plot
+
+
+FIGURES = [{"data": "ttk_dat", "weapons": ["MP7", "M4A1"], "inc_ads": True,
+            "fig_name": "Test", "y_lim": [0, 1100]},
+           {"data": "ttk_dat", "weapons": ["M4A1", "AK15"]}]
+
+
+class TestBatchPlot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.tmp_dir.name, "figures.json")
+        with open(self.manifest, "w", encoding="utf-8") as manifest:
+            json.dump(FIGURES, manifest)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_load_manifest_fills_in_defaults(self):
+        figure_args = batch_plot.load_manifest(self.manifest)
+        self.assertEqual(len(figure_args), 2)
+        self.assertEqual(figure_args[0].y_lim, [0, 1100])
+        self.assertEqual(figure_args[0].inc_ads, True)
+        self.assertEqual(figure_args[1].y_lim, [0, 900])
+        self.assertEqual(figure_args[1].inc_ads, False)
+
+    def test_load_manifest_rejects_unknown_settings(self):
+        with open(self.manifest, "w", encoding="utf-8") as manifest:
+            json.dump([{"data": "ttk_dat", "weapons": ["MP7"],
+                        "colour": "red"}], manifest)
+        with self.assertRaises(ValueError):
+            batch_plot.load_manifest(self.manifest)
+
+    def test_figure_jobs_share_curves(self):
+        figure_args = batch_plot.load_manifest(self.manifest)
+        figure_args[1].inc_ads = True
+        jobs = batch_plot.figure_jobs(figure_args)
+        self.assertEqual(jobs[0]["title"], "Time to Kill Test + ADS Time")
+        self.assertEqual([c[0] for c in jobs[1]["curves"]], ["M4A1", "AK15"])
+        # the M4A1 curve is only worked out once
+        self.assertIs(jobs[0]["curves"][1], jobs[1]["curves"][0])
+
+    def test_render_figures(self):
+        jobs = batch_plot.figure_jobs(batch_plot.load_manifest(self.manifest))
+        save_dir = os.path.join(self.tmp_dir.name, "plots")
+        titles = batch_plot.render_figures(jobs, save_dir, workers=1)
+        self.assertEqual(titles, [job["title"] for job in jobs])
+        self.assertEqual(sorted(os.listdir(save_dir)),
+                         sorted(title + ".png" for title in titles))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Test benchmarks/bench_suite.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_bench_suite.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import bench_suite
+from preset_arsenals import ARSENALS
+
+
+class TestBenchSuite(unittest.TestCase):
+    def test_required_benchmarks_registered(self):
+        required = {"gun.shot_dam_at_range", "gun.btk", "gun.ttk",
+                    "gun.swap_attach", "gun.apply_loadout",
+                    "gun.with_attachments", "arsenal.build", "arsenal.lookup",
+                    "expected_ttk.head_sweep", "monte_carlo.simulate",
+                    "plot_obj_ttk.figure"}
+        required.update(f"preset_arsenals.{name}" for name in ARSENALS)
+        self.assertLessEqual(required, set(bench_suite.BENCHMARKS))
+
+    def test_mann_whitney_p(self):
+        rng = np.random.default_rng(19)
+        baseline = rng.normal(1.0, 0.05, 15)
+        self.assertLess(bench_suite.mann_whitney_p(baseline,
+                                                   baseline + 0.5), 0.001)
+        self.assertGreater(bench_suite.mann_whitney_p(baseline,
+                                                      baseline - 0.5), 0.999)
+        same = bench_suite.mann_whitney_p(baseline, rng.normal(1.0, 0.05, 15))
+        self.assertGreater(same, 0.01)
+        self.assertEqual(bench_suite.mann_whitney_p([1.0] * 5, [1.0] * 5), 1.0)
+
+    def test_compare(self):
+        baseline = {"fast": {"median": 1.0, "samples": [0.99, 1.0, 1.01] * 5},
+                    "gone": {"median": 1.0, "samples": [1.0] * 15}}
+        results = {"fast": {"median": 2.0, "samples": [1.99, 2.0, 2.01] * 5},
+                   "new": {"median": 1.0, "samples": [1.0] * 15}}
+        self.assertEqual([(name, regressed) for name, _, _, _, regressed
+                          in bench_suite.compare(baseline, results)],
+                         [("fast", True)])
+        # slower, but not by more than the threshold
+        self.assertFalse(bench_suite.compare(baseline, results,
+                                             threshold=1.5)[0][4])
+
+    def test_run_save_and_load(self):
+        results = bench_suite.run_benchmarks(["arsenal.lookup", "gun.btk"],
+                                             repeats=3, min_time=0.001)
+        self.assertEqual(sorted(results), ["arsenal.lookup", "gun.btk"])
+        self.assertEqual(len(results["gun.btk"]["samples"]), 3)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "baseline.json")
+            bench_suite.save_baseline(path, results)
+            self.assertEqual(bench_suite.load_baseline(path), results)
+
+    def test_benchmarks_set_up(self):
+        for name in ("gun.shot_dam_at_range", "gun.ttk", "gun.swap_attach",
+                     "arsenal.build", "preset_arsenals.ttk_dat"):
+            self.assertIn(name, bench_suite.BENCHMARKS)
+            bench_suite.BENCHMARKS[name]()()
+
+
+if __name__ == "__main__":
+    unittest.main()
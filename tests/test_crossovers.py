@@ -0,0 +1,66 @@
+"""Test crossovers.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_crossovers.py
+"""
+
+import unittest
+import numpy as np
+import gun_obj
+from crossovers import all_crossovers, crossovers
+from preset_arsenals import ARSENALS
+
+
+def sampled_crossovers(ttk_a, ttk_b, dists):
+    """Return the (before, after) sampled distances either side of each swap."""
+    signs = np.sign(ttk_a - ttk_b)
+    nonzero = np.nonzero(signs)[0]
+    swaps = np.nonzero(signs[nonzero][1:] != signs[nonzero][:-1])[0]
+    return [(dists[nonzero[i]], dists[nonzero[i + 1]]) for i in swaps]
+
+
+class TestCrossovers(unittest.TestCase):
+    def test_matches_dense_sampling(self):
+        arsenal = ARSENALS["ttk_dat"]()
+        guns, _ = arsenal.get_guns_or_types_and_return_valid_names(["SMG",
+                                                                    "AR"])
+        dists = np.linspace(0, 190, 190001)
+        found = {(id(a), id(b)): crossings for a, b, crossings
+                 in all_crossovers(guns, max_dist=190)}
+        ttks = [gun.ttk_array(dists) for gun in guns]
+        for i, gun_a in enumerate(guns):
+            for j, gun_b in enumerate(guns[i + 1:], start=i + 1):
+                sampled = sampled_crossovers(ttks[i], ttks[j], dists)
+                crossings = found.get((id(gun_a), id(gun_b)), [])
+                self.assertEqual(len(crossings), len(sampled),
+                                 (gun_a.name, gun_b.name))
+                for (before, after), (dist, faster) in zip(sampled,
+                                                           crossings):
+                    self.assertTrue(before <= dist <= after)
+                    self.assertLessEqual(faster.ttk(after),
+                                         ({gun_a, gun_b} - {faster}).pop()
+                                         .ttk(after))
+
+    def test_crossovers(self):
+        mp7, ak74 = gun_obj.Mp7(), gun_obj.Ak74()
+        found = crossovers(mp7, ak74, max_dist=150)
+        self.assertTrue(found)
+        for dist, faster in found:
+            slower = ak74 if faster is mp7 else mp7
+            self.assertLess(faster.ttk(dist + 1e-6), slower.ttk(dist + 1e-6))
+            self.assertGreater(faster.ttk(dist - 1e-6),
+                               slower.ttk(dist - 1e-6))
+        # the range limits which crossovers are found
+        first = found[0][0]
+        self.assertEqual(crossovers(mp7, ak74, min_dist=first + 1,
+                                    max_dist=150), found[1:])
+
+    def test_no_crossovers(self):
+        self.assertEqual(crossovers(gun_obj.Mp7(), gun_obj.Mp7()), [])
+        self.assertEqual(all_crossovers([gun_obj.Mp7()]), [])
+        with self.assertRaises(ValueError):
+            crossovers(gun_obj.Mp7(), gun_obj.Ak74(), min_dist=10, max_dist=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
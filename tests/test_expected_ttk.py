@@ -0,0 +1,102 @@
+"""Test expected_ttk.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_expected_ttk.py
+"""
+
+from itertools import product
+from math import comb
+import unittest
+import numpy as np
+import gun_obj
+import ttk_matrix
+from expected_ttk import expected_ttk
+from preset_arsenals import ARSENALS
+
+
+def enumerated_hits_pmf(gun, dist, head_prob):
+    """Return the chance of needing each number of hits by listing every
+    sequence of body and head hits."""
+    body = gun.shot_dam_at_range(dist)
+    head = body*gun._HEAD_MULT
+    pmf = {}
+    for hits in product((False, True), repeat=gun.btk(dist)):
+        heads = sum(hits)
+        chance = head_prob**heads*(1 - head_prob)**(len(hits) - heads)
+        dealt = 0
+        for needed, is_head in enumerate(hits, start=1):
+            dealt += head if is_head else body
+            if dealt >= 100:
+                pmf[needed] = pmf.get(needed, 0) + chance
+                break
+    return pmf
+
+def shots_cdf(hits_pmf, hit_prob, shots):
+    """Return the chance of the kill taking at most shots shots."""
+    return sum(chance*sum(comb(shots, hit)*hit_prob**hit
+                          *(1 - hit_prob)**(shots - hit)
+                          for hit in range(needed, shots + 1))
+               for needed, chance in hits_pmf.items())
+
+
+class TestExpectedTtk(unittest.TestCase):
+    def test_body_shots_match_ttk(self):
+        guns = ARSENALS["ttk_dat"]().get_all_guns()
+        dists = np.linspace(0, 150, 301)
+        found = expected_ttk(guns, dists, percentiles=(1, 50, 100),
+                             inc_ads=True)
+        ttk = ttk_matrix.ttk_matrix(guns, dists, inc_ads=True)["ttk"]
+        self.assertTrue(np.array_equal(found["mean"], ttk))
+        for percentile in (1, 50, 100):
+            self.assertTrue(np.array_equal(found["percentiles"][percentile],
+                                           ttk))
+
+    def test_matches_enumeration(self):
+        gun = gun_obj.Ak74()
+        shot_ms = 60000/gun.rof
+        for dist, head_prob, hit_prob in ((10, 0.3, 1), (60, 0.25, 0.6),
+                                          (120, 0.9, 0.35)):
+            pmf = enumerated_hits_pmf(gun, dist, head_prob)
+            found = expected_ttk([gun], [dist], head_prob=head_prob,
+                                 hit_prob=hit_prob, percentiles=(50, 90))
+            tof = dist/gun.velocity*1000
+            mean_hits = sum(needed*chance for needed, chance in pmf.items())
+            self.assertAlmostEqual(found["mean_hits"][0, 0], mean_hits)
+            self.assertAlmostEqual(found["mean"][0, 0],
+                                   shot_ms*(mean_hits/hit_prob - 1) + tof)
+            for percentile in (50, 90):
+                shots = round((found["percentiles"][percentile][0, 0]
+                               - tof)/shot_ms) + 1
+                self.assertGreaterEqual(shots_cdf(pmf, hit_prob, shots),
+                                        percentile/100 - 1e-12)
+                self.assertLess(shots_cdf(pmf, hit_prob, shots - 1),
+                                percentile/100)
+
+    def test_grid(self):
+        guns = ARSENALS["naked"](["AR", "SMG"]).get_all_guns()
+        heads = np.linspace(0, 1, 101)
+        found = expected_ttk(guns, [0, 50, 100], head_prob=heads[:, None],
+                             hit_prob=[1, 0.5], percentiles=(50, 100))
+        self.assertEqual(found["mean"].shape, (101, 2, len(guns), 3))
+        # more headshots never slows the kill, more misses always does
+        self.assertTrue(np.all(np.diff(found["mean"], axis=0) <= 1e-9))
+        self.assertTrue(np.all(found["mean"][:, 1] > found["mean"][:, 0]))
+        self.assertTrue(np.all(np.isfinite(found["percentiles"][100][:, 0])))
+        self.assertTrue(np.all(found["percentiles"][100][:, 1] == np.inf))
+        single = expected_ttk(guns, [0, 50, 100], head_prob=0.37,
+                              hit_prob=0.5)
+        self.assertTrue(np.allclose(single["mean"], found["mean"][37, 1]))
+
+    def test_bad_arguments(self):
+        gun = gun_obj.Mp7()
+        for kwargs in ({"head_prob": 1.5}, {"head_prob": -0.1},
+                       {"hit_prob": 0}, {"hit_prob": [0.5, 1.1]},
+                       {"percentiles": (0,)}, {"percentiles": (101,)}):
+            with self.assertRaises(ValueError):
+                expected_ttk([gun], [10], **kwargs)
+        with self.assertRaises(ValueError):
+            expected_ttk([gun], [-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
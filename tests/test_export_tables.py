@@ -0,0 +1,90 @@
+"""Test export_tables.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_export_tables.py
+"""
+
+import csv
+import importlib.util
+import os
+import tempfile
+import unittest
+import numpy as np
+import export_tables
+import ttk_matrix
+from preset_arsenals import ARSENALS
+
+
+class TestExportTables(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.guns = ARSENALS["ttk_dat"]().get_all_guns()
+        self.dists = np.linspace(0, 200, 41)
+        self.expected = ttk_matrix.ttk_matrix(self.guns, self.dists,
+                                              inc_ads=True)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def export(self, fmt):
+        # small chunks so the tables are written in several goes
+        path = os.path.join(self.tmp_dir.name, "tables." + fmt)
+        export_tables.export_tables(self.guns, self.dists, path, fmt,
+                                    inc_ads=True, chunk_cells=100)
+        return path
+
+    def test_table_chunks(self):
+        chunks = list(export_tables.table_chunks(self.guns, self.dists,
+                                                 chunk_cells=100))
+        self.assertEqual([start for start, _ in chunks],
+                         list(range(0, len(self.guns), 2)))
+        np.testing.assert_array_equal(
+            np.vstack([table["ttk"] for _, table in chunks]),
+            ttk_matrix.ttk_matrix(self.guns, self.dists)["ttk"])
+
+    def test_csv(self):
+        with open(self.export("csv"), newline="", encoding="utf-8") as table:
+            rows = list(csv.DictReader(table))
+        self.assertEqual(len(rows), len(self.guns) * len(self.dists))
+        row = rows[len(self.dists) + 3]    # 2nd gun, 4th distance
+        self.assertEqual(row["name"], self.expected["names"][1])
+        self.assertEqual(float(row["dist"]), self.dists[3])
+        self.assertEqual(int(row["btk"]), self.expected["btk"][1, 3])
+        self.assertEqual(float(row["ttk"]), self.expected["ttk"][1, 3])
+
+    def test_npy_and_npz_memory_mapped(self):
+        for fmt in ("npy", "npz"):
+            tables = export_tables.load_tables(self.export(fmt))
+            self.assertEqual(list(tables["names"]), self.expected["names"])
+            np.testing.assert_array_equal(tables["dists"], self.dists)
+            for key in ("dam", "btk", "ttk"):
+                self.assertIsInstance(tables[key], np.memmap)
+                np.testing.assert_array_equal(tables[key],
+                                              self.expected[key])
+        # numpy can read the npz too
+        with np.load(self.export("npz")) as npz:
+            np.testing.assert_array_equal(npz["ttk"], self.expected["ttk"])
+
+    def test_compressed_npz_rejected(self):
+        path = os.path.join(self.tmp_dir.name, "compressed.npz")
+        np.savez_compressed(path, ttk=self.expected["ttk"])
+        with self.assertRaises(ValueError):
+            export_tables.load_tables(path)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.export("xlsx")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"),
+                         "pyarrow isn't installed")
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self.export("parquet")).to_pydict()
+        self.assertEqual(len(table["name"]), len(self.guns) * len(self.dists))
+        self.assertEqual(table["ttk"][len(self.dists) + 3],
+                         self.expected["ttk"][1, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
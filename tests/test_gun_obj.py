@@ -4,12 +4,21 @@ Run this from project root via:
 python3 -m unittest discover ./tests/ test_gun_obj.py
 """
 
+import os
+import random
+import subprocess
+import sys
+import textwrap
 import unittest
+import numpy as np
 from modeling_tools import gen_realdam_dict
 import gun_obj
 import arsenal
 from preset_arsenals import ARSENALS
 
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
 class TestGunObj(unittest.TestCase):
     def test_gun__init__(self):
         gun = gun_obj.Ak15()
@@ -25,6 +34,20 @@ class TestGunObj(unittest.TestCase):
         gun = gun_obj.Ak15("Custom AK15")
         self.assertEqual(str(gun), "Custom AK15")
 
+    def test_guns_are_compact(self):
+        gun = gun_obj.Famas()
+        self.assertFalse(hasattr(gun, "__dict__"))
+        with self.assertRaises(AttributeError):
+            gun.not_a_stat = 1
+        # valid attachments are shared by the class, not copied per gun
+        self.assertIs(gun.val_barrels, gun_obj.Famas().val_barrels)
+        self.assertIsInstance(gun.val_barrels, frozenset)
+        self.assertEqual(gun.val_barrels,
+                         {gun_obj.Ranger, gun_obj.LongBarrel})
+        self.assertEqual(gun_obj.Ak74().val_barrels,
+                         {gun_obj.HeavyBarrel, gun_obj.LongBarrel})
+        self.assertEqual(gun_obj.Mp5().val_barrels, frozenset())
+
     def test_swap_attach(self):
         gun = gun_obj.Famas()
         self.assertEqual(gun.barrel, gun_obj.EmptyBarrel)
@@ -38,6 +61,89 @@ class TestGunObj(unittest.TestCase):
         gun.swap_attach(gun_obj.EmptyBarrel)
         self.assertEqual(gun.barrel, gun_obj.EmptyBarrel)
 
+    def test_apply_loadout(self):
+        gun = gun_obj.Ak74()
+        swapped = gun_obj.Ak74()
+        swapped.swap_attach(gun_obj.HeavyBarrel)
+        gun.apply_loadout({"barrel": gun_obj.HeavyBarrel,
+                           "sight": gun_obj.EmptySight})
+        self.assertEqual(gun, swapped)
+        self.assertEqual(gun.get_attachments()["barrel"], "HeavyBarrel")
+
+        # nothing is put on if any of the attachments can't go on
+        for bad in ({"barrel": gun_obj.EmptyBarrel, "muzzle": gun_obj.Ranger},
+                    {"barrel": gun_obj.EmptyBarrel, "sight": gun_obj.Ranger},
+                    {"barrel": gun_obj.EmptyBarrel, "barrel ": gun_obj.Ranger}):
+            with self.assertRaises(ValueError):
+                gun.apply_loadout(bad)
+            self.assertEqual(gun, swapped)
+
+        with self.assertRaises(AttributeError):
+            gun.barrel = gun_obj.EmptyBarrel  # only swapped via the methods
+
+    def test_with_attachments(self):
+        gun = gun_obj.Ak74()
+        gun.shot_dam_at_range(100)  # fill the falloff cache
+        variant = gun.with_attachments(barrel=gun_obj.HeavyBarrel,
+                                       name="AK74_HB")
+        self.assertIs(type(variant), gun_obj.Ak74)
+        self.assertFalse(hasattr(variant, "__dict__"))
+        self.assertEqual((variant.name, variant.gun_type),
+                         ("AK74_HB", gun.gun_type))
+        self.assertEqual(variant.barrel, gun_obj.HeavyBarrel)
+        self.assertEqual(gun.barrel, gun_obj.EmptyBarrel)  # parent untouched
+        self.assertIs(variant._dam_prof, gun._dam_prof)
+
+        made = gun_obj.Ak74("AK74_HB")
+        made.swap_barrel(gun_obj.HeavyBarrel)
+        self.assertEqual(variant, made)
+        self.assertEqual(variant.shot_dam_at_range(100),
+                         made.shot_dam_at_range(100))
+
+        same = gun.with_attachments()
+        self.assertEqual((same.name, same), (gun.name, gun))
+        self.assertIs(same._falloff_consts(), gun._falloff_consts())
+        with self.assertRaises(ValueError):
+            gun.with_attachments(barrel=gun_obj.Ranger)
+
+    def test_register_slot(self):
+        # in a fresh interpreter as the slot is added to every gun
+        code = textwrap.dedent("""
+            import gun_obj
+
+            class EmptyTestSlot(gun_obj.AttachmentBaseClass):
+                TYPE = "test_slot"
+                NAME = "Empty"
+
+            class Boost(EmptyTestSlot):
+                NAME = "Boost"
+                _DAM = 2
+
+            made_before = gun_obj.Ak74()
+            gun_obj.register_slot("test_slot", EmptyTestSlot, "val_test_slots")
+            try:
+                gun_obj.register_slot("test_slot", EmptyTestSlot, "x")
+                raise AssertionError("registered test_slot twice")
+            except ValueError:
+                pass
+            assert made_before.test_slot is EmptyTestSlot
+            assert made_before == gun_obj.Ak74()
+            try:
+                made_before.swap_attach(Boost)
+                raise AssertionError("no gun takes Boost yet")
+            except ValueError:
+                pass
+
+            gun_obj.Ak74.val_test_slots = frozenset({Boost})
+            made_before.swap_attach(Boost)
+            assert made_before.get_attachments()["test_slot"] == "Boost"
+            assert (made_before.shot_dam_at_range(0)
+                    == 2*gun_obj.Ak74().shot_dam_at_range(0))
+            """)
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                              capture_output=True, text=True, check=False)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
     def test_gun_damage_changes_after_attaching_barrel(self):
         gun = gun_obj.Ak15()
         self.assertEqual(gun.barrel, gun_obj.EmptyBarrel)
@@ -53,6 +159,47 @@ class TestGunObj(unittest.TestCase):
         gun.swap_attach(barrel_to_swap)
         self.assertEqual(gun.shot_dam_at_range(0), gun_damage_with_empty_barrel)
 
+    def test_no_drift_after_many_swaps(self):
+        gun = gun_obj.Ak74()
+        barrels = [gun_obj.EmptyBarrel, gun_obj.HeavyBarrel,
+                   gun_obj.LongBarrel]
+        expected = {}
+        for barrel in barrels:
+            fresh = gun_obj.Ak74()
+            fresh.swap_barrel(barrel)
+            expected[barrel] = (fresh._dam, fresh.velocity, fresh.rof,
+                                fresh.aim_down)
+        self.assertEqual(expected[gun_obj.HeavyBarrel][0],
+                         gun._BASE_DAM * gun_obj.HeavyBarrel._DAM)
+
+        swaps = random.Random(21).choices(barrels, k=10**6)
+        for i, barrel in enumerate(swaps):
+            gun.swap_attach(barrel)
+            if i % 1000 == 0:
+                self.assertEqual((gun._dam, gun.velocity, gun.rof,
+                                  gun.aim_down), expected[barrel])
+        self.assertEqual((gun._dam, gun.velocity, gun.rof, gun.aim_down),
+                         expected[swaps[-1]])
+        gun.swap_attach(gun_obj.EmptyBarrel)
+        self.assertEqual((gun._dam, gun.velocity, gun.rof, gun.aim_down),
+                         (gun._BASE_DAM, gun._BASE_VELOCITY, gun._BASE_ROF,
+                          gun._BASE_AIM_DOWN))
+
+    def test_falloff_consts_cached_until_swap(self):
+        gun = gun_obj.Ak74()
+        consts = gun._falloff_consts()
+        self.assertIs(gun._falloff_consts(), consts)
+        dam_in_falloff = gun.shot_dam_at_range(100)
+
+        gun.swap_barrel(gun_obj.HeavyBarrel)
+        self.assertIsNot(gun._falloff_consts(), consts)
+        self.assertEqual(gun._falloff_consts()[4], gun._dam)
+        self.assertGreater(gun.shot_dam_at_range(100), dam_in_falloff)
+
+        gun.swap_barrel(gun_obj.EmptyBarrel)
+        self.assertEqual(gun._falloff_consts(), consts)
+        self.assertEqual(gun.shot_dam_at_range(100), dam_in_falloff)
+
     def test_gun_eq(self):
         gun = gun_obj.Ak15()
         gun2 = gun_obj.Ak15("Custom AK15")
@@ -64,6 +211,25 @@ class TestGunObj(unittest.TestCase):
         gun2.swap_attach(gun_obj.EmptyBarrel)
         self.assertEqual(gun, gun2)
 
+        faster = gun_obj.Ak15()
+        faster.rof = gun.rof + 100
+        self.assertNotEqual(gun, faster)
+        self.assertNotEqual(gun, "AK15")
+
+    def test_gun_hash(self):
+        gun = gun_obj.Ak15()
+        gun2 = gun_obj.Ak15("Custom AK15")
+        self.assertEqual(hash(gun), hash(gun2))
+        self.assertEqual(len({gun, gun2, gun_obj.Mp7()}), 2)
+        self.assertEqual({gun: "found"}[gun2], "found")
+
+        fingerprint = gun.fingerprint()
+        gun.swap_attach(gun_obj.LongBarrel)
+        self.assertNotEqual(gun.fingerprint(), fingerprint)
+        self.assertNotEqual(hash(gun), hash(gun2))
+        gun.swap_attach(gun_obj.EmptyBarrel)
+        self.assertEqual(gun.fingerprint(), fingerprint)
+
     def get_max_dam_helper(self, gun):
         assert gun.barrel == gun_obj.EmptyBarrel
         # damage points. These are point that are given on the curves in the
@@ -127,6 +293,67 @@ class TestGunObj(unittest.TestCase):
                                      f" from real damage {real_dam} for"
                                      f" {gun.name} at range {dist}")
 
+    def test_array_methods_match_scalar_methods(self):
+        dists = np.linspace(0, 1000, 10001)
+        guns = ARSENALS["barrel_compare"]().get_all_guns()
+        guns.extend([gun_obj.Mp5(), gun_obj.Famas(), gun_obj.AsVal()])
+        for gun in guns:
+            dams = gun.shot_dam_at_ranges(dists)
+            btks = gun.btk_array(dists)
+            ttks = gun.ttk_array(dists)
+            ttks_ads = gun.ttk_array(dists, inc_ads=True)
+            for ind, dist in enumerate(dists):
+                self.assertEqual(dams[ind], gun.shot_dam_at_range(dist))
+                self.assertEqual(btks[ind], gun.btk(dist))
+                self.assertEqual(ttks[ind], gun.ttk(dist))
+                self.assertEqual(ttks_ads[ind], gun.ttk(dist, inc_ads=True))
+
+    def test_array_methods_reject_negative_distances(self):
+        gun = gun_obj.Ak15()
+        with self.assertRaises(ValueError):
+            gun.shot_dam_at_ranges([10, -1])
+        with self.assertRaises(ValueError):
+            gun.ttk_array(np.array([-5.0]))
+
+    def test_btk_intervals_match_sampled_btk(self):
+        dists = np.linspace(0, 1000, 100001)
+        guns = ARSENALS["barrel_compare"]().get_all_guns()
+        guns.extend([gun_obj.Mp5(), gun_obj.Famas(), gun_obj.AsVal()])
+        for gun in guns:
+            btks = gun.btk_array(dists)
+            intervals = gun.btk_intervals()
+            self.assertEqual(intervals[0][0], 0)
+            self.assertEqual(intervals[-1][1], float("inf"))
+            for (_, end, btk, _), (start, _, next_btk, _) in zip(
+                    intervals[:-1], intervals[1:]):
+                self.assertEqual(end, start)
+                self.assertNotEqual(btk, next_btk)
+            for start, end, btk, ttk_without_tof in intervals:
+                # stay clear of the breakpoints themselves
+                inside = (dists > start + 10**-6) & (dists < end - 10**-6)
+                self.assertTrue(np.all(btks[inside] == btk))
+                mid = start + 1 if end == float("inf") else (start + end)/2
+                self.assertAlmostEqual(ttk_without_tof,
+                                       gun.ttk(mid) - mid/gun.velocity*1000)
+
+    def test_btk_intervals_range(self):
+        gun = gun_obj.Ak74()
+        intervals = gun.btk_intervals(10, 200, inc_ads=True)
+        self.assertEqual(intervals[0][0], 10)
+        self.assertEqual(intervals[-1][1], 200)
+        self.assertEqual(intervals[0][2], gun.btk(10))
+        self.assertAlmostEqual(intervals[0][3],
+                               gun.ttk(10, inc_ads=True) - 10/gun.velocity*1000)
+        with self.assertRaises(ValueError):
+            gun.btk_intervals(100, 100)
+
+    def test_ttk_curve(self):
+        gun = gun_obj.Mp7()
+        x, y = gun.ttk_curve(0, 150, inc_ads=True)
+        self.assertEqual((x[0], x[-1]), (0, 150))
+        self.assertAlmostEqual(y[0], gun.ttk(0, inc_ads=True))
+        self.assertAlmostEqual(y[-1], gun.ttk(150, inc_ads=True))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
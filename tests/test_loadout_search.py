@@ -0,0 +1,128 @@
+"""Test loadout_search.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_loadout_search.py
+"""
+
+import itertools
+import os
+import subprocess
+import sys
+import textwrap
+import unittest
+import numpy as np
+import gun_obj
+import loadout_search
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FastSight(gun_obj.SightBaseClass):
+    NAME = "FastSight"
+    _AIM_DOWN = 0.9
+
+
+class AnotherFastSight(gun_obj.SightBaseClass):
+    NAME = "AnotherFastSight"
+    _AIM_DOWN = 0.9
+
+
+class Grip(gun_obj.URailBaseClass):
+    NAME = "Grip"
+    _ROF = 1.1
+    _AIM_DOWN = 1.2
+
+
+class SlowMag(gun_obj.MagBaseClass):
+    NAME = "SlowMag"
+    _AIM_DOWN = 1.1
+
+
+class KittedAk74(gun_obj.Ak74):
+    __slots__ = ()
+    val_sights = frozenset({FastSight, AnotherFastSight})
+    val_u_rails = frozenset({Grip})
+    val_mags = frozenset({SlowMag})
+
+
+def brute_force_front(gun_cls, dists):
+    """Return the (ttk, aim_down) Pareto front by trying every loadout."""
+    slot_choices = [[empty] + list(getattr(gun_cls, val_attr))
+                    for empty, val_attr in gun_obj.SLOTS.values()]
+    points = []
+    for loadout in itertools.product(*slot_choices):
+        gun = gun_cls()
+        for attach in loadout:
+            gun.swap_attach(attach)
+        points.append((float(np.mean(gun.ttk_array(dists))), gun.aim_down))
+    return sorted({p for p in points
+                   if not any(q[0] <= p[0] and q[1] <= p[1] and q != p
+                              for q in points)},
+                  key=lambda p: p[1])
+
+
+class TestLoadoutSearch(unittest.TestCase):
+    def test_slot_options_drop_duplicate_stats(self):
+        options = loadout_search.slot_options(KittedAk74)
+        self.assertEqual(options["sight"][0], gun_obj.EmptySight)
+        self.assertEqual(len(options["sight"]), 2)
+        self.assertEqual(options["barrel"], [gun_obj.EmptyBarrel,
+                                             gun_obj.HeavyBarrel,
+                                             gun_obj.LongBarrel])
+        self.assertEqual(loadout_search.slot_options(gun_obj.Mp5)["barrel"],
+                         [gun_obj.EmptyBarrel])
+
+    def test_distinct_loadouts(self):
+        loadouts = loadout_search.distinct_loadouts(KittedAk74)
+        # 3 barrels x 2 rofs, the sights and mag only change the aim down
+        self.assertEqual(len(loadouts), 6)
+        for attachments, mults in loadouts:
+            self.assertIn(attachments["sight"], KittedAk74.val_sights)
+            self.assertEqual(attachments["mag"], gun_obj.EmptyMag)
+            self.assertEqual(len(attachments), 6)
+
+    def test_pareto_front_matches_brute_force(self):
+        dists = np.linspace(0, 150, 151)
+        front = loadout_search.pareto_loadouts(KittedAk74, dists)
+        self.assertEqual([(c["ttk"], c["aim_down"]) for c in front],
+                         brute_force_front(KittedAk74, dists))
+        for cand in front:
+            self.assertEqual(cand["gun"].get_attachments(),
+                             {slot: attach.NAME for slot, attach
+                              in cand["attachments"].items()})
+
+    def test_pareto_front_real_catalogue(self):
+        front = loadout_search.pareto_loadouts(gun_obj.Ak74,
+                                               np.linspace(0, 150, 151))
+        self.assertEqual(len(front), 1)
+        self.assertEqual(front[0]["attachments"]["barrel"],
+                         gun_obj.HeavyBarrel)
+
+    def test_searches_registered_slots(self):
+        # in a fresh interpreter as the slot is added to every gun
+        code = textwrap.dedent("""
+            import gun_obj
+            import loadout_search
+
+            class EmptyMuzzle(gun_obj.AttachmentBaseClass):
+                TYPE = "muzzle"
+                NAME = "Empty"
+
+            class Compensator(EmptyMuzzle):
+                NAME = "Compensator"
+                _VELOCITY = 1.2
+
+            gun_obj.register_slot("muzzle", EmptyMuzzle, "val_muzzles")
+            gun_obj.Ak74.val_muzzles = frozenset({Compensator})
+            options = loadout_search.slot_options(gun_obj.Ak74)
+            assert options["muzzle"] == [EmptyMuzzle, Compensator], options
+            assert any(attachments["muzzle"] is Compensator for attachments,
+                       _ in loadout_search.distinct_loadouts(gun_obj.Ak74))
+            """)
+        proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                              capture_output=True, text=True, check=False)
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
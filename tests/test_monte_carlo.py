@@ -0,0 +1,112 @@
+"""Test monte_carlo.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_monte_carlo.py
+"""
+
+import unittest
+import numpy as np
+import gun_obj
+import monte_carlo
+import ttk_matrix
+from expected_ttk import expected_ttk
+from preset_arsenals import ARSENALS
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def test_sure_body_shots_match_ttk(self):
+        guns = ARSENALS["ttk_dat"]().get_all_guns()
+        found = monte_carlo.simulate(guns, 65, engagements=100, inc_ads=True,
+                                     seed=1, keep_samples=True)
+        ttk = ttk_matrix.ttk_matrix(guns, [65], inc_ads=True)["ttk"]
+        self.assertTrue(np.array_equal(found["ttk"],
+                                       np.repeat(ttk, 100, axis=1)))
+        # every ttk in a bin is the same, so the percentiles are exact
+        for percentile in (10, 50, 90):
+            self.assertTrue(np.array_equal(found["percentiles"][percentile],
+                                           ttk[:, 0]))
+        self.assertTrue(np.allclose(found["std"], 0))
+
+    def test_same_seed_same_results_whatever_the_workers(self):
+        guns = [gun_obj.Ak74(), gun_obj.Mp7()]
+        engagements = 2*monte_carlo._CHUNK + 7
+        kwargs = {"engagements": engagements, "head_prob": 0.3,
+                  "hit_prob": 0.6, "reaction_ms": (180, 40), "seed": 25,
+                  "keep_samples": True}
+        alone = monte_carlo.simulate(guns, 30, workers=1, **kwargs)
+        pooled = monte_carlo.simulate(guns, 30, workers=2, **kwargs)
+        self.assertEqual(alone["ttk"].shape, (2, engagements))
+        self.assertTrue(np.array_equal(alone["ttk"], pooled["ttk"]))
+        for key in ("mean", "std", "win_rate"):
+            self.assertTrue(np.array_equal(alone[key], pooled[key]), key)
+        self.assertEqual(alone["seed"], 25)
+
+        other = monte_carlo.simulate(guns, 30, **{**kwargs, "seed": 26})
+        self.assertFalse(np.array_equal(alone["ttk"], other["ttk"]))
+        fresh = monte_carlo.simulate(guns, 30, engagements=10, seed=None)
+        again = monte_carlo.simulate(guns, 30, engagements=10,
+                                     seed=fresh["seed"])
+        self.assertTrue(np.array_equal(fresh["mean"], again["mean"]))
+
+    def test_summary_matches_samples(self):
+        guns = ARSENALS["naked"](["SMG"]).get_all_guns()
+        engagements = 3*monte_carlo._CHUNK + 11
+        found = monte_carlo.simulate(guns, 35, engagements=engagements,
+                                     head_prob=0.2, hit_prob=0.8,
+                                     reaction_ms=(200, 50), seed=8,
+                                     percentiles=(0, 10, 50, 90, 100),
+                                     keep_samples=True)
+        ttk = found["ttk"]
+        self.assertTrue(np.allclose(found["mean"], ttk.mean(axis=1)))
+        self.assertTrue(np.allclose(found["std"], ttk.std(axis=1)))
+        for percentile in (0, 10, 50, 90, 100):
+            exact = np.percentile(ttk, percentile, axis=1,
+                                  method="inverted_cdf")
+            difference = found["percentiles"][percentile] - exact
+            self.assertTrue(np.all((difference >= 0)
+                                   & (difference < monte_carlo._BIN_MS)))
+        fastest = ttk == ttk.min(axis=0)
+        self.assertTrue(np.allclose(
+            found["win_rate"], (fastest/fastest.sum(axis=0)).mean(axis=1)))
+        self.assertAlmostEqual(found["win_rate"].sum(), 1)
+
+        summary = monte_carlo.simulate(guns, 35, engagements=engagements,
+                                       head_prob=0.2, hit_prob=0.8,
+                                       reaction_ms=(200, 50), seed=8)
+        self.assertNotIn("ttk", summary)
+        self.assertTrue(np.array_equal(summary["mean"], found["mean"]))
+
+    def test_mean_matches_expected_ttk(self):
+        guns = ARSENALS["naked"](["SMG", "AR"]).get_all_guns()
+        found = monte_carlo.simulate(guns, 45, engagements=200000,
+                                     head_prob=0.25, hit_prob=0.7, seed=3)
+        expected = expected_ttk(guns, [45], head_prob=0.25,
+                                hit_prob=0.7)["mean"][:, 0]
+        std_err = found["std"]/np.sqrt(200000)
+        self.assertTrue(np.all(np.abs(found["mean"] - expected) < 5*std_err))
+
+    def test_reaction_time(self):
+        gun = gun_obj.Mp7()
+        found = monte_carlo.simulate([gun], 10, engagements=1000,
+                                     reaction_ms=(150, 0), seed=4,
+                                     keep_samples=True)
+        self.assertTrue(np.allclose(found["ttk"], gun.ttk(10) + 150))
+        spread = monte_carlo.simulate([gun], 10, engagements=1000,
+                                      reaction_ms=(20, 30), seed=4,
+                                      keep_samples=True)
+        self.assertTrue(np.all(spread["ttk"] >= gun.ttk(10)))
+        self.assertGreater(spread["percentiles"][90][0],
+                           spread["percentiles"][10][0])
+
+    def test_bad_arguments(self):
+        gun = gun_obj.Mp7()
+        for kwargs in ({"head_prob": 1.5}, {"hit_prob": 0},
+                       {"engagements": 0}, {"percentiles": (101,)}):
+            with self.assertRaises(ValueError):
+                monte_carlo.simulate([gun], 10, **kwargs)
+        with self.assertRaises(ValueError):
+            monte_carlo.simulate([gun], -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
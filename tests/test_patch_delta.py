@@ -0,0 +1,114 @@
+"""Test patch_delta.py and building arsenals as of a patch.
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_patch_delta.py
+"""
+
+import copy
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import gun_obj
+import patch_delta
+import ttk_cache
+from preset_arsenals import ARSENALS
+
+
+def patched_registry():
+    """Return the registry with a couple of made up patches."""
+    registry = copy.deepcopy(gun_obj._REGISTRY)
+    as_val = registry["weapons"].pop("AsVal")
+    registry["patches"] = [
+        {"patch": "1.1", "weapons": {"Ak74": {"dam": 30},
+                                     "Mp7": {"rof": 1000}}},
+        {"patch": "1.2", "weapons": {"AsVal": as_val, "Mp7": {"rof": 950}}}]
+    return registry
+
+
+class TestPatchDelta(unittest.TestCase):
+    def setUp(self):
+        patchers = [mock.patch.object(gun_obj, "_REGISTRY", patched_registry()),
+                    mock.patch.dict(gun_obj._PATCH_CLASSES, clear=True)]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.dists = np.linspace(0, 150, 151)
+
+    def test_arsenal_as_of_patch(self):
+        base = ARSENALS["naked"](patch="base")
+        self.assertIsNone(base.get_weapon_by_name("AS_VAL"))
+        self.assertEqual(base.get_weapon_by_name("AK74")._dam, 33)
+        self.assertEqual(base.get_weapon_by_name("MP7").rof, 950)
+        # unchanged weapons are the module's own classes
+        self.assertIs(type(base.get_weapon_by_name("MP5")), gun_obj.Mp5)
+
+        patch_11 = ARSENALS["ttk_dat"](["AK74", "AK74_HB", "MP7"],
+                                       patch="1.1")
+        self.assertEqual(patch_11.get_weapon_by_name("AK74")._dam, 30)
+        self.assertEqual(patch_11.get_weapon_by_name("AK74_HB")._dam, 33)
+        self.assertEqual(patch_11.get_weapon_by_name("MP7").rof, 1000)
+        self.assertIsInstance(patch_11.get_weapon_by_name("AK74"), gun_obj.Ar)
+
+        with self.assertRaises(ValueError):
+            ARSENALS["naked"](patch="0.9")
+
+    def test_changed_weapons(self):
+        self.assertEqual(patch_delta.changed_weapons("base", "1.1"),
+                         ["Ak74", "Mp7"])
+        self.assertEqual(patch_delta.changed_weapons("base", "1.2"),
+                         ["Ak74", "AsVal"])
+
+    def test_patch_delta(self):
+        rows = {row["name"]: row for row in patch_delta.patch_delta(
+            "ttk_dat", "base", "1.2", self.dists)}
+        self.assertEqual(rows["AS_VAL"]["status"], "added")
+        self.assertEqual(rows["MP7"]["status"], "unchanged")
+        self.assertFalse(rows["MP5"]["recomputed"])
+        self.assertFalse(np.any(rows["MP5"]["ttk_change"]))
+
+        ak74 = rows["AK74"]
+        self.assertEqual((ak74["status"], ak74["stats"]),
+                         ("changed", {"dam": (33, 30)}))
+        old_gun, new_gun = gun_obj.Ak74(), gun_obj.weapon_classes("1.2")["Ak74"]()
+        np.testing.assert_array_equal(
+            ak74["ttk_change"],
+            new_gun.ttk_array(self.dists) - old_gun.ttk_array(self.dists))
+        self.assertEqual(sum(row["recomputed"] for row in rows.values()), 3)
+
+        report = patch_delta.format_delta(list(rows.values()), self.dists)
+        self.assertIn("AK74: changed (dam 33 -> 30)", report)
+        self.assertIn("AK74_HB: changed", report)
+        self.assertIn("AS_VAL: added", report)
+        self.assertNotIn("MP5", report)
+
+    def test_cache_shared_across_patches(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ttk_cache.TtkCache(tmp_dir)
+            patch_delta.patch_delta("naked", "base", "1.1", self.dists,
+                                    names=["AK74", "MP7", "MP5"], cache=cache)
+            patch_delta.patch_delta("naked", "1.1", "1.2", self.dists,
+                                    names=["AK74", "MP7", "MP5"], cache=cache)
+            # AK74 at 33 and 30 damage and MP7 at 950 and 1000 rof, the MP7
+            # going back to 950 in 1.2 is read back, the MP5 never changed
+            self.assertEqual(len(os.listdir(tmp_dir)), 4)
+
+    def test_only_changed_guns_worked_out(self):
+        with mock.patch.object(patch_delta, "_gun_tables",
+                               wraps=patch_delta._gun_tables) as tables:
+            rows = patch_delta.patch_delta("ttk_dat", "1.2", "1.2",
+                                           self.dists)
+            tables.assert_not_called()
+            self.assertTrue(all(row["status"] == "unchanged"
+                                for row in rows))
+            rows = patch_delta.patch_delta("ttk_dat", "base", "1.1",
+                                           self.dists)
+        worked_out = {call.args[0].name for call in tables.call_args_list}
+        self.assertEqual(worked_out, {"AK74", "AK74_HB", "MP7"})
+        self.assertEqual({row["name"] for row in rows if row["recomputed"]},
+                         worked_out)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Test preset_arsenals.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_preset_arsenals.py
+"""
+
+import unittest
+import gun_obj
+import preset_arsenals
+from preset_arsenals import ARSENALS
+
+
+class TestPresetArsenals(unittest.TestCase):
+    def test_only_asked_for_guns_made(self):
+        arsenal = ARSENALS["ttk_dat"](["MP7", "AK74_HB", "LMG", "banana"])
+        self.assertEqual(sorted(gun.name for gun in arsenal.get_all_guns()),
+                         ["AK74_HB", "L86A1", "L86A1_LB", "M249", "MP7"])
+        self.assertEqual(ARSENALS["naked"](["banana"]).num_in_storage, 0)
+
+    def test_guns_match_constructed_guns(self):
+        hb_lb = ARSENALS["hb_lb_dat"]()
+        self.assertIsNone(hb_lb.get_weapon_by_name("AK74"))
+        ak74 = gun_obj.Ak74(gun_name="AK74_HB")
+        ak74.swap_barrel(gun_obj.HeavyBarrel)
+        self.assertEqual(hb_lb.get_weapon_by_name("AK74_HB"), ak74)
+        for gun in ARSENALS["naked"]().get_all_guns():
+            fresh = type(gun)()
+            self.assertEqual((gun.name, gun.gun_type),
+                             (fresh.name, fresh.gun_type))
+            self.assertEqual(gun, fresh)
+
+    def test_templates_not_shared(self):
+        gun = ARSENALS["naked"](["AK74"]).get_weapon_by_name("AK74")
+        gun.swap_barrel(gun_obj.HeavyBarrel)
+        gun.name = "changed"
+        template = preset_arsenals._template(gun_obj.Ak74)
+        self.assertEqual((template.name, template.barrel),
+                         ("AK74", gun_obj.EmptyBarrel))
+        self.assertEqual(ARSENALS["naked"](["AK74"]).get_all_guns(),
+                         [gun_obj.Ak74()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Test profiling.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_profiling.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import batch_plot
+import profiling
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@profiling.profiled("test.double")
+def double(number):
+    return number*2
+
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = profiling.enabled()
+        profiling.reset()
+
+    def tearDown(self):
+        profiling.enable(self.was_enabled)
+        profiling.reset()
+
+    def test_off_collects_nothing(self):
+        profiling.enable(False)
+        with profiling.span("test.block"):
+            pass
+        self.assertEqual(double(2), 4)
+        profiling.count("test.things")
+        self.assertEqual(profiling.stats(), {"spans": {}, "counters": {}})
+        self.assertEqual(profiling.trace()["traceEvents"], [])
+
+    def test_spans_and_counters(self):
+        profiling.enable()
+        for number in range(5):
+            self.assertEqual(double(number), number*2)
+        with profiling.span("test.block"):
+            profiling.count("test.things", 3)
+        profiling.count("test.things")
+        with self.assertRaises(KeyError):
+            with profiling.span("test.block"):
+                raise KeyError("still timed")
+
+        collected = profiling.stats()
+        self.assertEqual(collected["spans"]["test.double"]["calls"], 5)
+        block = collected["spans"]["test.block"]
+        self.assertEqual(block["calls"], 2)
+        self.assertLessEqual(block["min_ms"], block["p50_ms"])
+        self.assertLessEqual(block["p99_ms"], block["max_ms"])
+        self.assertEqual(collected["counters"], {"test.things": 4})
+        self.assertIn("test.double", profiling.summary())
+
+        events = profiling.trace()["traceEvents"]
+        self.assertEqual(sum(event["ph"] == "X" for event in events), 7)
+        self.assertEqual([event["args"] for event in events
+                          if event["ph"] == "C"],
+                         [{"test.things": 3}, {"test.things": 4}])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "trace.json")
+            profiling.write_trace(path)
+            with open(path, encoding="utf-8") as trace_file:
+                self.assertEqual(json.load(trace_file)["traceEvents"],
+                                 events)
+
+    def test_snapshot_and_merge(self):
+        profiling.enable()
+        double(1)
+        profiling.count("test.things", 2)
+        collected = profiling.snapshot(clear=True)
+        self.assertEqual(profiling.stats()["spans"], {})
+        profiling.merge(collected)
+        profiling.merge(collected)
+        self.assertEqual(profiling.stats()["spans"]["test.double"]["calls"], 2)
+        self.assertEqual(profiling.stats()["counters"], {"test.things": 4})
+
+    def test_batch_plot_workers_are_merged(self):
+        profiling.enable()
+        figure_args = batch_plot.load_manifest(
+            os.path.join(ROOT, "guide_plots.json"))[:2]
+        jobs = batch_plot.figure_jobs(figure_args)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            batch_plot.render_figures(jobs, tmp_dir, workers=2)
+        spans = profiling.stats()["spans"]
+        self.assertEqual(spans["batch.jobs"]["calls"], 1)
+        self.assertEqual(spans["figure.render"]["calls"], 2)
+        self.assertEqual(spans["figure.save"]["calls"], 2)
+
+    def test_environment_variables(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "trace.json")
+            proc = subprocess.run(
+                [sys.executable, "-c", "import preset_arsenals;"
+                 " preset_arsenals.ARSENALS['ttk_dat']()"],
+                cwd=ROOT, capture_output=True, text=True, check=True,
+                env=dict(os.environ, BB_PROFILE="1", BB_PROFILE_TRACE=path))
+            self.assertIn("arsenal.build", proc.stderr)
+            with open(path, encoding="utf-8") as trace_file:
+                names = {event["name"] for event
+                         in json.load(trace_file)["traceEvents"]}
+            self.assertIn("arsenal.build", names)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""Test ranking_index.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_ranking_index.py
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+import gun_obj
+from preset_arsenals import ARSENALS
+from ranking_index import RankingIndex
+
+
+def brute_force_order(guns, dist, inc_ads=False):
+    """Return the guns sorted by their ttk at dist, ties in the given order."""
+    ttks = [gun.ttk(dist, inc_ads=inc_ads) for gun in guns]
+    return [guns[i] for i in np.argsort(ttks, kind="stable")]
+
+
+class TestRankingIndex(unittest.TestCase):
+    def setUp(self):
+        self.arsenal = ARSENALS["ttk_dat"]()
+        self.guns = self.arsenal.get_all_guns()
+        # random distances never land exactly where two guns cross
+        self.dists = np.random.default_rng(17).uniform(0, 400, 500)
+
+    def test_matches_brute_force(self):
+        for inc_ads in (False, True):
+            index = RankingIndex(self.arsenal, inc_ads=inc_ads)
+            for dist in self.dists:
+                self.assertEqual(index.top(dist),
+                                 brute_force_order(self.guns, dist, inc_ads))
+        self.assertEqual(index.top(85, k=3), index.top(85)[:3])
+
+    def test_matches_brute_force_on_steps(self):
+        # whole distances and the btk steps land on the interval boundaries.
+        # Some whole distances are where two guns cross, where either order
+        # is right, so the ttks are compared rather than the guns.
+        steps = {interval[1] for gun in self.guns
+                 for interval in gun.btk_intervals(0, 400)[:-1]}
+        for inc_ads in (False, True):
+            index = RankingIndex(self.arsenal, inc_ads=inc_ads)
+            for dist in np.concatenate([np.arange(301), sorted(steps)]):
+                self.assertEqual(
+                    [gun.ttk(dist, inc_ads=inc_ads) for gun in index.top(dist)],
+                    [gun.ttk(dist, inc_ads=inc_ads) for gun
+                     in brute_force_order(self.guns, dist, inc_ads)], dist)
+        index = RankingIndex(self.arsenal)
+        names = [gun.name for gun in index.top(50)]
+        self.assertLess(names.index("MP7"), names.index("GROZA"))
+        self.assertLess(names.index("ACR"), names.index("PP2000"))
+
+    def test_intervals_and_leaders(self):
+        index = RankingIndex(self.arsenal, max_dist=150)
+        intervals = index.intervals()
+        self.assertEqual(intervals[0][0], 0)
+        self.assertEqual(intervals[-1][1], 150)
+        for (_, end, _), (start, _, _) in zip(intervals[:-1], intervals[1:]):
+            self.assertEqual(end, start)
+        for start, end, gun in index.leaders():
+            self.assertIs(index.top((start + end)/2, k=1)[0], gun)
+        with self.assertRaises(ValueError):
+            index.top(151)
+
+    def test_ties_keep_given_order(self):
+        first, second = gun_obj.Mp7("first"), gun_obj.Mp7("second")
+        index = RankingIndex([first, gun_obj.Ak74(), second])
+        names = [gun.name for gun in index.top(30)]
+        self.assertLess(names.index("first"), names.index("second"))
+
+    def test_update_matches_rebuild(self):
+        index = RankingIndex(self.arsenal)
+        for gun in self.guns[::4]:
+            barrels = sorted((cls for cls in gun.val_barrels
+                              if cls is not gun.barrel),
+                             key=lambda cls: cls.__name__)
+            if not barrels:
+                continue
+            gun.swap_attach(barrels[0])
+            # the other guns' ttk aren't all worked out again
+            with mock.patch.object(index, "_interval_ttks") as interval_ttks:
+                self.assertEqual(index.refresh(), [gun])
+                interval_ttks.assert_not_called()
+            rebuilt = RankingIndex(self.arsenal)
+            self.assertEqual(index.intervals(), rebuilt.intervals())
+        self.assertEqual(index.refresh(), [])
+        with self.assertRaises(ValueError):
+            index.update_gun(gun_obj.Mp7())
+
+    def test_empty(self):
+        index = RankingIndex([])
+        self.assertEqual(index.top(10), [])
+        self.assertEqual(index.leaders(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
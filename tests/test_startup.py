@@ -0,0 +1,49 @@
+"""Test the scripts start up without importing matplotlib.
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_startup.py
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(code, cwd=ROOT):
+    """Return the plotting and fitting modules loaded by running code."""
+    code += ("\nimport sys"
+             "\nprint(sorted({'matplotlib', 'scipy'} & sys.modules.keys()),"
+             " file=sys.stderr)")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd,
+                          capture_output=True, text=True, check=True,
+                          env=dict(os.environ, BB_TTK_CACHE="off"))
+    return proc.stderr.strip().splitlines()[-1]
+
+
+class TestStartup(unittest.TestCase):
+    def test_importing_scripts(self):
+        for module in ("plot_obj_ttk", "batch_plot", "kill_change",
+                       "patch_delta", "export_tables", "ttk_server",
+                       "crossovers", "expected_ttk", "monte_carlo"):
+            self.assertEqual(loaded_after(f"import {module}"), "[]", module)
+        for module in ("model_accuracy", "polyfit_realdat"):
+            self.assertEqual(loaded_after(f"import {module}",
+                                          os.path.join(ROOT, "modeling_tools")),
+                             "[]", module)
+
+    def test_compute_only(self):
+        self.assertEqual(loaded_after(
+            "import plot_obj_ttk\n"
+            "plot_obj_ttk.main(['ttk_dat', 'MP7', 'AR', '--compute_only'])"),
+            "[]")
+        self.assertEqual(loaded_after(
+            "import model_accuracy\n"
+            "model_accuracy.main(['--compute_only'])",
+            os.path.join(ROOT, "modeling_tools")), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Test ttk_cache.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_ttk_cache.py
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import gun_obj
+import ttk_cache
+
+
+class TestTtkCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ttk_cache.TtkCache(self.tmp_dir.name)
+        self.dists = np.linspace(0, 300, 301)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def cached_files(self):
+        return [name for name in os.listdir(self.tmp_dir.name)
+                if name.endswith(".npz")]
+
+    def test_gun_tables_match_gun_methods(self):
+        gun = gun_obj.Ak74()
+        for _ in range(2):  # miss then hit
+            for inc_ads in (False, True):
+                tables = self.cache.gun_tables(gun, self.dists, inc_ads=inc_ads)
+                np.testing.assert_array_equal(tables["dam"],
+                                              gun.shot_dam_at_ranges(self.dists))
+                np.testing.assert_array_equal(tables["btk"],
+                                              gun.btk_array(self.dists))
+                np.testing.assert_array_equal(
+                    tables["ttk"], gun.ttk_array(self.dists, inc_ads=inc_ads))
+        self.assertEqual(len(self.cached_files()), 1)
+
+    def test_hit_skips_compute(self):
+        gun = gun_obj.Mp7()
+        compute = mock.Mock(return_value={"x": np.arange(3)})
+        self.cache.get_or_compute(gun, "query", compute)
+        arrays = self.cache.get_or_compute(gun, "query", compute)
+        self.assertEqual(compute.call_count, 1)
+        np.testing.assert_array_equal(arrays["x"], np.arange(3))
+
+    def test_key_includes_loadout_range_and_model(self):
+        gun = gun_obj.Ak74()
+        self.cache.gun_tables(gun, self.dists)
+        self.cache.gun_tables(gun, self.dists[:100])
+        gun.swap_barrel(gun_obj.HeavyBarrel)
+        self.cache.gun_tables(gun, self.dists)
+        # the name doesn't change the results so is not part of the key
+        self.cache.gun_tables(gun_obj.Ak74(gun_name="Other"), self.dists)
+        self.assertEqual(len(self.cached_files()), 3)
+
+        with mock.patch.object(gun_obj, "MODEL_VERSION",
+                               gun_obj.MODEL_VERSION + 1):
+            new_model_cache = ttk_cache.TtkCache(self.tmp_dir.name)
+        self.assertNotEqual(new_model_cache._model_version,
+                            self.cache._model_version)
+        new_model_cache.gun_tables(gun, self.dists)
+        self.assertEqual(len(self.cached_files()), 4)
+
+    def test_btk_intervals(self):
+        gun = gun_obj.Mp5()
+        for _ in range(2):
+            self.assertEqual(self.cache.btk_intervals(gun), gun.btk_intervals())
+            self.assertEqual(self.cache.btk_intervals(gun, 10, 150),
+                             gun.btk_intervals(10, 150))
+
+    def test_least_recently_used_evicted(self):
+        gun = gun_obj.Ak15()
+        for num in (10, 20, 30):
+            self.cache.gun_tables(gun, self.dists[:num])
+        paths = sorted((os.path.join(self.tmp_dir.name, name)
+                        for name in self.cached_files()),
+                       key=os.path.getsize)
+        for age, path in enumerate(paths):
+            os.utime(path, (1000 + age, 1000 + age))
+        # reading the oldest entry makes it the most recently used
+        self.cache.gun_tables(gun, self.dists[:10])
+        self.cache.max_bytes = sum(os.path.getsize(path)
+                                   for path in paths[::2])
+        self.cache.evict()
+        self.assertEqual(sorted(self.cached_files()),
+                         sorted(os.path.basename(path) for path in paths[::2]))
+
+    def test_evicts_only_past_max_bytes(self):
+        gun = gun_obj.Ak15()
+        with mock.patch.object(self.cache, "evict",
+                               wraps=self.cache.evict) as evict:
+            for num in range(10, 60, 10):
+                self.cache.gun_tables(gun, self.dists[:num])
+            # only the first save scans the directory, to find its size
+            self.assertEqual(evict.call_count, 1)
+            self.cache.max_bytes = 1
+            self.cache.gun_tables(gun, self.dists[:60])
+            self.assertEqual(evict.call_count, 2)
+        self.assertEqual(self.cached_files(), [])
+
+    def test_unwritable_cache_dir(self):
+        compute = mock.Mock(return_value={"x": np.arange(3)})
+        with mock.patch("tempfile.mkstemp",
+                        side_effect=PermissionError("read only")):
+            arrays = self.cache.get_or_compute(gun_obj.Mp7(), "query", compute)
+        np.testing.assert_array_equal(arrays["x"], np.arange(3))
+        self.assertEqual(self.cached_files(), [])
+
+    def test_corrupt_file_recomputed(self):
+        gun = gun_obj.P90()
+        self.cache.gun_tables(gun, self.dists)
+        path = os.path.join(self.tmp_dir.name, self.cached_files()[0])
+        with open(path, "wb") as cached:
+            cached.write(b"not an npz file")
+        tables = self.cache.gun_tables(gun, self.dists)
+        np.testing.assert_array_equal(tables["ttk"], gun.ttk_array(self.dists))
+
+    def test_disabled_cache(self):
+        cache = ttk_cache.TtkCache(None)
+        compute = mock.Mock(return_value={"x": np.arange(3)})
+        cache.get_or_compute(gun_obj.Mp7(), "query", compute)
+        cache.get_or_compute(gun_obj.Mp7(), "query", compute)
+        self.assertEqual(compute.call_count, 2)
+        with mock.patch.dict(os.environ, {"BB_TTK_CACHE": "off"}):
+            self.assertIsNone(ttk_cache.default_cache().cache_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
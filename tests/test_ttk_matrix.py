@@ -0,0 +1,51 @@
+"""Test ttk_matrix.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_ttk_matrix.py
+"""
+
+import unittest
+import numpy as np
+import gun_obj
+import ttk_matrix
+from preset_arsenals import ARSENALS
+
+
+class TestTtkMatrix(unittest.TestCase):
+    def test_matches_gun_methods(self):
+        arsenal = ARSENALS["ttk_dat"]()
+        dists = np.linspace(0, 1000, 10001)
+        for inc_ads in (False, True):
+            table = ttk_matrix.ttk_matrix(arsenal, dists, inc_ads=inc_ads)
+            guns = arsenal.get_all_guns()
+            self.assertEqual(table["names"], [gun.name for gun in guns])
+            self.assertEqual(table["ttk"].shape, (len(guns), len(dists)))
+            for row, gun in enumerate(guns):
+                np.testing.assert_array_equal(table["dam"][row],
+                                              gun.shot_dam_at_ranges(dists))
+                np.testing.assert_array_equal(table["btk"][row],
+                                              gun.btk_array(dists))
+                np.testing.assert_array_equal(
+                    table["ttk"][row], gun.ttk_array(dists, inc_ads=inc_ads))
+
+    def test_accepts_selected_gun_list(self):
+        arsenal = ARSENALS["ttk_dat"]()
+        guns, _ = arsenal.get_guns_or_types_and_return_valid_names(["SMG",
+                                                                    "M4A1"])
+        table = ttk_matrix.ttk_matrix(guns, [0, 50, 150])
+        self.assertEqual(table["names"], [gun.name for gun in guns])
+        self.assertEqual(table["btk"].shape, (len(guns), 3))
+
+    def test_pack_guns(self):
+        cols = ttk_matrix.pack_guns([gun_obj.Ak15(), gun_obj.Mp5()])
+        self.assertEqual(cols["names"], ["AK15", "MP5"])
+        self.assertEqual(cols["dam"].shape, (2, 1))
+        self.assertEqual(list(cols["rof"][:, 0]), [540, 800])
+
+    def test_negative_distances(self):
+        with self.assertRaises(ValueError):
+            ttk_matrix.ttk_matrix([gun_obj.Ak15()], [-1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""Test ttk_server.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_ttk_server.py
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import unittest
+import numpy as np
+import gun_obj
+import ttk_server
+from preset_arsenals import ARSENALS
+
+
+async def get(reader, writer, target, close=False):
+    """Send a GET for target and return the (status, json body) reply."""
+    headers = "Host: test\r\n" + ("Connection: close\r\n" if close else "")
+    writer.write(f"GET {target} HTTP/1.1\r\n{headers}\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) != b"\r\n":
+        key, _, value = line.decode().partition(":")
+        headers[key.lower()] = value.strip()
+    body = await reader.readexactly(int(headers["content-length"]))
+    return status, json.loads(body)
+
+
+class TestTtkTables(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = ttk_server.TtkTables(ARSENALS["ttk_dat"](), max_dist=150)
+
+    def test_gun_ttk_matches_gun(self):
+        mp7 = gun_obj.Mp7()
+        for dist in (0, 12.3, 85, 150):
+            answer = self.tables.gun_ttk("MP7", dist, inc_ads=True)
+            self.assertEqual(answer["dist"], dist)
+            self.assertEqual(answer["ttk"], mp7.ttk(dist, inc_ads=True))
+            self.assertEqual(answer["btk"], mp7.btk(dist))
+        # rounded to the nearest grid point
+        self.assertEqual(self.tables.gun_ttk("MP7", 85.04)["dist"], 85)
+        for name, dist in (("MP7", 151), ("MP7", -1), ("banana", 10)):
+            with self.assertRaises(ValueError):
+                self.tables.gun_ttk(name, dist)
+
+    def test_rank(self):
+        guns = ARSENALS["ttk_dat"]().get_all_guns()
+        ranking = self.tables.rank(dist=85, inc_ads=True)
+        expected = sorted(guns, key=lambda gun: gun.ttk(85, inc_ads=True))
+        self.assertEqual([entry["ttk"] for entry in ranking],
+                         [gun.ttk(85, inc_ads=True) for gun in expected])
+        self.assertEqual(len(self.tables.rank(dist=85, top=3)), 3)
+
+        smgs = self.tables.rank(dist=20, weapons=["SMG", "M4A1"])
+        self.assertEqual(sorted(entry["gun"] for entry in smgs),
+                         ["KRISS_VECTOR", "M4A1", "MP5", "MP7", "PP19",
+                          "PP2000", "UMP-45"])
+
+        mean_ranking = self.tables.rank(dist_range=(20, 40), top=1)
+        mean_ttks = {gun.name: np.mean([gun.ttk(d) for d
+                                        in np.round(np.arange(20, 40.05, 0.1),
+                                                    6)])
+                     for gun in guns}
+        self.assertEqual(mean_ranking[0]["gun"],
+                         min(mean_ttks, key=mean_ttks.get))
+        with self.assertRaises(ValueError):
+            self.tables.rank()
+
+    def test_curve(self):
+        curve = self.tables.curve("AK74", 10, 20)
+        self.assertEqual(len(curve["dists"]), 101)
+        self.assertEqual(curve["ttk"][-1], gun_obj.Ak74().ttk(20))
+
+
+class TestTtkServer(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tables = {"ttk_dat": ttk_server.TtkTables(ARSENALS["ttk_dat"](),
+                                                      max_dist=150)}
+
+    async def asyncSetUp(self):
+        self.server = await ttk_server.TtkServer(self.tables).start(port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_queries_on_one_connection(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        status, body = await get(reader, writer,
+                                 "/ttk?data=ttk_dat&gun=MP7&dist=85&ads=1")
+        self.assertEqual(status, 200)
+        self.assertEqual(body["ttk"], gun_obj.Mp7().ttk(85, inc_ads=True))
+
+        status, body = await get(reader, writer, "/rank?dist=85&top=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body["ranking"]), 2)
+
+        status, body = await get(reader, writer, "/curve?gun=MP7&min=0&max=1")
+        self.assertEqual(len(body["ttk"]), 11)
+
+        status, body = await get(reader, writer, "/ttk?gun=MP7", close=True)
+        self.assertEqual(status, 400)
+        self.assertIn("dist", body["error"])
+        self.assertEqual(await reader.read(), b"")  # closed as asked
+        writer.close()
+        await writer.wait_closed()
+
+    async def test_bad_queries(self):
+        for target, status in (("/nowhere", 404), ("/ttk?gun=MP7&dist=x", 400),
+                               ("/ttk?data=nope&gun=MP7&dist=1", 400),
+                               ("/rank?dist=10&min=1&max=2", 400)):
+            reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                           self.port)
+            self.assertEqual((await get(reader, writer, target))[0], status,
+                             target)
+            writer.close()
+            await writer.wait_closed()
+
+    async def test_overlong_request_line(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        status, body = await get(reader, writer, "/ttk?gun=" + "x"*2**17)
+        self.assertEqual(status, 400)
+        self.assertIn("too long", body["error"])
+        self.assertEqual(await reader.read(), b"")
+        writer.close()
+        await writer.wait_closed()
+
+        # the server carries on answering other connections
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        self.assertEqual((await get(reader, writer, "/ttk?gun=MP7&dist=1"))[0],
+                         200)
+        writer.close()
+        await writer.wait_closed()
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "no unix sockets")
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "ttk.sock")
+            server = await ttk_server.TtkServer(self.tables).start(
+                unix_path=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            status, body = await get(reader, writer, "/rank?dist=5&top=1",
+                                     close=True)
+            self.assertEqual(status, 200)
+            self.assertEqual(len(body["ranking"]), 1)
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+
+if __name__ == "__main__":
+    unittest.main()
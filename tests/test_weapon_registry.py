@@ -0,0 +1,158 @@
+"""Test weapon_registry.py
+
+Run this from project root via:
+python3 -m unittest discover ./tests/ test_weapon_registry.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import gun_obj
+import weapon_registry
+
+
+class TestWeaponRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "weapons.json")
+        shutil.copy(weapon_registry.REGISTRY_PATH, self.path)
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        env = mock.patch.dict(os.environ, {"BB_TTK_CACHE_DIR": self.cache_dir})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def rewrite(self, change):
+        with open(self.path, encoding="utf-8") as table:
+            registry = json.load(table)
+        change(registry)
+        with open(self.path, "w", encoding="utf-8") as table:
+            json.dump(registry, table)
+
+    def snapshots(self):
+        registry_dir = os.path.join(self.cache_dir, "registry")
+        if not os.path.isdir(registry_dir):
+            return []
+        return os.listdir(registry_dir)
+
+    @mock.patch.object(sys, "dont_write_bytecode", False)
+    def test_snapshot_reused_until_table_changes(self):
+        first = weapon_registry.load_registry(self.path)
+        self.assertEqual(len(self.snapshots()), 1)
+        with mock.patch.object(weapon_registry, "_parse") as parse:
+            self.assertEqual(weapon_registry.load_registry(self.path), first)
+            parse.assert_not_called()
+
+        def faster_ak74(registry):
+            registry["weapons"]["Ak74"]["rof"] = 1000
+        self.rewrite(faster_ak74)
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(
+            weapon_registry.load_registry(self.path)["weapons"]["Ak74"]["rof"],
+            1000)
+        # the snapshot of the old table is replaced, not kept alongside
+        snapshots = self.snapshots()
+        self.assertEqual(len(snapshots), 1)
+        self.assertTrue(snapshots[0].endswith(
+            f"-1-{os.path.getsize(self.path)}.pickle"))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir.name,
+                                                     "__pycache__")))
+
+    @mock.patch.object(sys, "dont_write_bytecode", True)
+    def test_no_snapshot_if_bytecode_isnt_written(self):
+        first = weapon_registry.load_registry(self.path)
+        self.assertEqual(self.snapshots(), [])
+        self.assertEqual(weapon_registry.load_registry(self.path), first)
+        self.assertEqual(self.snapshots(), [])
+
+    def test_malformed_table_rejected(self):
+        def bad_category(registry):
+            registry["weapons"]["Mp7"]["category"] = "Pistol"
+        def missing_stat(registry):
+            del registry["weapons"]["Mp7"]["rof"]
+        def backwards_falloff(registry):
+            registry["weapons"]["Mp7"]["falloff"] = [200, 50]
+        for change in (bad_category, missing_stat, backwards_falloff):
+            self.rewrite(change)
+            with self.assertRaises(ValueError):
+                weapon_registry.load_registry(self.path)
+            shutil.copy(weapon_registry.REGISTRY_PATH, self.path)
+
+    def test_weapons_as_of_patch(self):
+        def add_patches(registry):
+            registry["patches"] = [
+                {"patch": "1.1", "weapons": {"Mp7": {"rof": 1000}}},
+                {"patch": "1.2", "weapons": {"Mp7": {"dam": 24}}}]
+        self.rewrite(add_patches)
+        registry = weapon_registry.load_registry(self.path)
+        self.assertEqual(weapon_registry.patch_names(registry),
+                         ["base", "1.1", "1.2"])
+        mp7 = [weapon_registry.weapons_as_of(registry, patch)["Mp7"]
+               for patch in ("base", "1.1", "1.2")]
+        self.assertEqual([(stats["dam"], stats["rof"]) for stats in mp7],
+                         [(25, 950), (25, 1000), (24, 1000)])
+        self.assertEqual(weapon_registry.weapons_as_of(registry)["Mp7"],
+                         mp7[-1])
+        # patches don't change the stats they are applied to
+        self.assertEqual(registry["weapons"]["Mp7"]["rof"], 950)
+        with self.assertRaises(ValueError):
+            weapon_registry.weapons_as_of(registry, "2.0")
+
+    def test_malformed_patches_rejected(self):
+        def repeated_patch(registry):
+            registry["patches"] = [{"patch": "1.1", "weapons": {}},
+                                   {"patch": "1.1", "weapons": {}}]
+        def unknown_stat(registry):
+            registry["patches"] = [{"patch": "1.1",
+                                    "weapons": {"Mp7": {"recoil": 2}}}]
+        def incomplete_new_weapon(registry):
+            registry["patches"] = [{"patch": "1.1",
+                                    "weapons": {"Mp9": {"dam": 22}}}]
+        for change in (repeated_patch, unknown_stat, incomplete_new_weapon):
+            self.rewrite(change)
+            with self.assertRaises(ValueError):
+                weapon_registry.load_registry(self.path)
+            shutil.copy(weapon_registry.REGISTRY_PATH, self.path)
+
+    def test_classes_made_from_table(self):
+        registry = weapon_registry.load_registry()
+        for cls_name, stats in registry["weapons"].items():
+            gun = getattr(gun_obj, cls_name)()
+            category = getattr(gun_obj, stats["category"])
+            self.assertIsInstance(gun, category)
+            self.assertEqual((gun.name, gun.gun_type, gun._dam, gun.rof),
+                             (stats["name"], category.GUN_TYPE, stats["dam"],
+                              stats["rof"]))
+            self.assertEqual(gun._dam_prof, [(stats["falloff"][0], 1),
+                                             (stats["falloff"][1],
+                                              category._MIN_CO)])
+        self.assertEqual(gun_obj.G36c.val_barrels,
+                         {gun_obj.Ranger, gun_obj.LongBarrel})
+        self.assertEqual(gun_obj.Ak74.val_barrels,
+                         {gun_obj.HeavyBarrel, gun_obj.LongBarrel})
+
+    def test_new_weapon(self):
+        def add_weapon(registry):
+            registry["weapons"]["Mp9"] = {
+                "category": "Smg", "name": "MP9", "dam": 22,
+                "falloff": [40, 180], "rof": 1000, "velocity": 380,
+                "aim_down": 0.15, "val_barrels": ["LongBarrel"]}
+        self.rewrite(add_weapon)
+        classes = gun_obj._make_gun_classes(
+            weapon_registry.load_registry(self.path))
+        gun = classes["Mp9"](gun_name="Custom MP9")
+        gun.swap_barrel(gun_obj.LongBarrel)
+        self.assertEqual((gun.name, gun.gun_type), ("Custom MP9", "SMG"))
+        self.assertEqual(gun.btk(0), gun_obj.Mp7().btk(0) + 1)
+        with self.assertRaises(ValueError):
+            gun_obj._attachment_classes(["Gun"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""On disk cache of damage, btk and ttk results.
+
+The same curves get worked out over and over with identical guns and ranges.
+Results are saved as .npz files named after a hash of everything they depend
+on: the gun's stats, damage profile and attachments, the distances asked for
+and the version of the damage model. Changing any of those gives a different
+file name, so stale results are never read back. The least recently used files
+are deleted when the cache grows past its size limit. An unwritable cache
+directory just means nothing gets cached.
+
+Environment Variables:
+----------------------
+BB_TTK_CACHE           - set to 'off' to stop results being cached.
+BB_TTK_CACHE_DIR       - where to keep the cache, defaults to
+                         ~/.cache/battlebit_gun_analysis
+BB_TTK_CACHE_MAX_BYTES - the size the cache is trimmed down to, defaults to
+                         256MB.
+
+Classes:
+--------
+TtkCache - a directory of cached results.
+
+Functions:
+----------
+model_version() - return a hash that changes whenever the damage model does.
+default_cache() - return the cache configured by the environment variables.
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+import numpy as np
+
+import file_sys
+import gun_obj
+import profiling
+
+# bump if the layout of the saved files changes
+_CACHE_FORMAT = 1
+_DEFAULT_MAX_BYTES = 256 * 1024**2
+
+
+def model_version():
+    """Return a hash that changes whenever the gun_obj damage model does.
+
+    Most of the model's constants live inside its functions, so rather than
+    listing them here the functions are evaluated at a few probe points. Any
+    change to a constant changes the output and so the hash.
+    """
+    probes = np.linspace(0, 300, 7)
+    parts = (_CACHE_FORMAT, gun_obj.MODEL_VERSION,
+             gun_obj._falloff_cubic(probes).tolist(),
+             gun_obj._falloff_scales(50, 300, 0.25),
+             gun_obj._falloff_coef(probes, 1.5, 1.2).tolist())
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:16]
+
+def _gun_key(gun):
+    """Return everything about the gun that its results depend on."""
+    return (type(gun).__name__, gun._MIN_CO) + gun.fingerprint()
+
+
+class TtkCache():
+    """A size bounded directory of cached gun results.
+
+    Instance Variables:
+    -------------------
+    cache_dir - str, the directory the results are saved in, None when the
+                cache is disabled
+    max_bytes - int, the size the cache is trimmed down to once it grows past
+                it
+    """
+
+    def __init__(self, cache_dir, max_bytes=_DEFAULT_MAX_BYTES):
+        """Use cache_dir for the cache, None gives a cache that stores nothing."""
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._model_version = model_version()
+        # bytes in the cache as of the last evict plus those saved since, so
+        # the directory is only scanned once it may have grown past max_bytes
+        self._tracked_bytes = None
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, gun, query):
+        """Return the file the results of the query for the gun are kept in."""
+        key = repr((self._model_version, _gun_key(gun), query))
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, name + ".npz")
+
+    def _load(self, path):
+        """Return the arrays saved at path or None if there aren't any."""
+        try:
+            with np.load(path) as saved:
+                arrays = {key: saved[key] for key in saved.files}
+            os.utime(path)     # mark as recently used
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            # missing, or a half written/corrupt file that will be remade
+            return None
+        return arrays
+
+    def _save(self, path, arrays):
+        """Save the arrays to path without readers seeing a partial file."""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as tmp_file:
+                np.savez(tmp_file, **arrays)
+                size = tmp_file.tell()
+            os.replace(tmp_path, path)
+        except OSError:
+            # eg: a read only cache directory, the results just aren't kept
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        if self._tracked_bytes is not None:
+            self._tracked_bytes += size
+        if self._tracked_bytes is None or self._tracked_bytes > self.max_bytes:
+            self.evict()
+
+    def get_or_compute(self, gun, query, compute):
+        """Return the cached arrays for the query, computing them if needed.
+
+        Inputs:
+        -------
+        gun     - the gun object the results are for
+        query   - anything with a stable repr that, with the gun, determines
+                  the results, eg: the distances asked for
+        compute - function that returns a dict of str -> np.ndarray
+        """
+        if self.cache_dir is None:
+            return compute()
+        path = self._path(gun, query)
+        arrays = self._load(path)
+        if arrays is None:
+            profiling.count("ttk_cache.miss")
+            arrays = compute()
+            self._save(path, arrays)
+        else:
+            profiling.count("ttk_cache.hit")
+        return arrays
+
+    def gun_tables(self, gun, dists, inc_ads=False):
+        """Return the gun's damage, btk and ttk at each of the distances.
+
+        Returns:
+        --------
+        dict with the keys "dam", "btk" and "ttk", each an np.ndarray the same
+        shape as dists. The values are identical to the Gun array methods.
+        """
+        dists = np.asarray(dists, dtype=float)
+        query = ("tables", dists.shape,
+                 hashlib.sha256(dists.tobytes()).hexdigest())
+        tables = self.get_or_compute(
+            gun, query,
+            lambda: {"dam": gun.shot_dam_at_ranges(dists),
+                     "btk": gun.btk_array(dists),
+                     "ttk": gun.ttk_array(dists)})
+        if inc_ads:
+            # ttk_array adds the ads time last, so this matches it exactly
+            tables["ttk"] = tables["ttk"] + gun.aim_down*1000
+        return tables
+
+    def btk_intervals(self, gun, min_dist=0, max_dist=float("inf")):
+        """Return the gun's btk intervals, see 'Gun.btk_intervals'."""
+        intervals = self.get_or_compute(
+            gun, ("btk_intervals", min_dist, max_dist),
+            lambda: {"intervals": np.array(gun.btk_intervals(min_dist,
+                                                             max_dist))})
+        return [(start, end, int(btk), ttk_without_tof)
+                for start, end, btk, ttk_without_tof
+                in intervals["intervals"].tolist()]
+
+    def evict(self):
+        """Delete the least recently used results until under max_bytes."""
+        if self.cache_dir is None:
+            return
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:   # another process got there first
+                pass
+            total -= size
+        self._tracked_bytes = total
+
+    def clear(self):
+        """Delete everything in the cache."""
+        max_bytes = self.max_bytes
+        self.max_bytes = 0
+        self.evict()
+        self.max_bytes = max_bytes
+
+
+def default_cache():
+    """Return the cache set up by the BB_TTK_CACHE environment variables."""
+    if os.environ.get("BB_TTK_CACHE", "on").lower() in ("off", "0", "false"):
+        return TtkCache(None)
+    cache_dir = file_sys.cache_dir()
+    max_bytes = int(os.environ.get("BB_TTK_CACHE_MAX_BYTES",
+                                   _DEFAULT_MAX_BYTES))
+    return TtkCache(cache_dir, max_bytes=max_bytes)
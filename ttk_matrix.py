@@ -0,0 +1,160 @@
+"""Batched damage, btk and ttk calculations for many guns at once.
+
+Rather than asking each gun object for its ttk one distance at a time, the
+stats of every gun are packed into column arrays and the damage model is
+evaluated for all guns and distances in one go with numpy broadcasting. The
+values produced are identical to those of the Gun methods.
+
+Between the btk steps of every gun each ttk is a straight line in distance,
+so where guns' ttk cross is also worked out here as arrays, for
+crossovers.py and ranking_index.py.
+
+Functions:
+----------
+pack_guns()  - return the stats of a list of guns as column arrays.
+ttk_matrix() - return guns x distances matrices of damage, btk and ttk.
+"""
+
+import numpy as np
+
+from arsenal import Arsenal
+import gun_obj
+import profiling
+
+
+def _gun_list(guns):
+    """Return the guns as a list, unpacking an arsenal if given one."""
+    if isinstance(guns, Arsenal):
+        if guns.gun_rack is None:
+            return []
+        return guns.get_all_guns()
+    return list(guns)
+
+def pack_guns(guns):
+    """Return the stats the damage model needs as one array per stat.
+
+    Each array has a row per gun, in the order the guns were given, and a
+    single column so that it broadcasts against a row of distances.
+
+    Input:
+    ------
+    guns - an Arsenal or an iterable of gun objects.
+
+    Returns:
+    --------
+    dict: "names" holds a list of the gun names, every other key holds a
+          (num guns, 1) float array.
+    """
+    guns = _gun_list(guns)
+
+    def column(values):
+        return np.array(values, dtype=float).reshape(-1, 1)
+
+    return {"names": [gun.name for gun in guns],
+            "dam": column([gun._dam for gun in guns]),
+            "falloff_start": column([gun._dam_prof[0][0] for gun in guns]),
+            "falloff_end": column([gun._dam_prof[1][0] for gun in guns]),
+            "start_coef": column([gun._dam_prof[0][1] for gun in guns]),
+            "end_coef": column([gun._dam_prof[1][1] for gun in guns]),
+            "min_co": column([gun._MIN_CO for gun in guns]),
+            "head_mult": column([gun._HEAD_MULT for gun in guns]),
+            "rof": column([gun.rof for gun in guns]),
+            "velocity": column([gun.velocity for gun in guns]),
+            "aim_down": column([gun.aim_down for gun in guns])}
+
+@profiling.profiled("ttk.matrix")
+def ttk_matrix(guns, dists, inc_ads=False):
+    """Return the damage, btk and ttk of every gun at every distance.
+
+    Inputs:
+    -------
+    guns    - an Arsenal, the list returned by
+              'get_guns_or_types_and_return_valid_names' or any other
+              iterable of gun objects.
+    dists   - 1d array like of distances to the target, positive values,
+              meters.
+    inc_ads - bool, include the aim down sights time in the ttk.
+
+    Returns:
+    --------
+    dict with the keys:
+        "names" - list of str, the gun name for each row
+        "dists" - np.ndarray, the distances for each column
+        "dam"   - np.ndarray (guns x distances), damage per shot
+        "btk"   - np.ndarray (guns x distances), bullets to kill
+        "ttk"   - np.ndarray (guns x distances), time to kill in ms
+
+    Raises:
+    -------
+    ValueError - if any of the distances are negative.
+    """
+    cols = pack_guns(guns)
+    dists = np.asarray(dists, dtype=float)
+    if np.any(dists < 0):
+        raise ValueError("ttk_matrix: distances must be positive.")
+    row = dists.reshape(1, -1)
+    profiling.count("ttk.matrix_cells", len(cols["names"])*dists.size)
+
+    xscale, yscale = gun_obj._falloff_scales(cols["falloff_start"],
+                                             cols["falloff_end"],
+                                             cols["min_co"])
+    falloff_coefs = gun_obj._falloff_coef(row - cols["falloff_start"],
+                                          xscale, yscale)
+    dam = np.where(row <= cols["falloff_start"],
+                   cols["dam"] * cols["start_coef"],
+                   np.where(row >= cols["falloff_end"],
+                            cols["end_coef"] * cols["dam"],
+                            cols["dam"] * falloff_coefs))
+
+    btk = np.ceil(100/dam).astype(int)
+    # same order of operations as Gun.ttk so the results match exactly
+    shoot_time = 1/cols["rof"] * 60000 * (btk - 1)
+    tof = row/cols["velocity"]*1000
+    ads_time = cols["aim_down"]*1000 if inc_ads else 0
+
+    return {"names": cols["names"], "dists": dists, "dam": dam, "btk": btk,
+            "ttk": shoot_time + tof + ads_time}
+
+def _segment_lines(steps, max_dist):
+    """Return the segments between every gun's btk steps and the ttk lines.
+
+    Inputs:
+    -------
+    steps    - list of (btk interval starts, np.ndarray of the ttk less the
+               time of flight on each interval, velocity) for each gun, see
+               'Gun.btk_intervals'
+    max_dist - the distance the last segment ends at, meters
+
+    Returns:
+    --------
+    tuple of (segment starts, segment ends, (guns x segments) ttk less the
+    time of flight, (guns x 1) ms of flight per meter)
+    """
+    starts = np.array(sorted({start for gun_steps in steps
+                              for start in gun_steps[0]}), dtype=float)
+    ends = np.append(starts[1:], max_dist)
+    consts = np.array([
+        ttk_without_tof[np.searchsorted(gun_starts, starts, side="right") - 1]
+        for gun_starts, ttk_without_tof, _ in steps]
+                      ).reshape(len(steps), starts.size)
+    slopes = np.array([[1000/velocity] for _, _, velocity in steps]
+                      ).reshape(len(steps), 1)
+    return starts, ends, consts, slopes
+
+def _line_crossings(starts, ends, const_diff, slope_diff):
+    """Return where each pair's difference in ttk is zero on each segment.
+
+    Inputs:
+    -------
+    starts, ends - (segments,) arrays, where the segments start and end
+    const_diff   - (pairs x segments) array, the difference in ttk less tof
+    slope_diff   - (pairs x 1) array, the difference in ms of flight per meter
+
+    Returns:
+    --------
+    tuple of (pairs x segments) arrays, the distance the difference's line
+    goes through zero and whether that is strictly inside the segment.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        roots = -const_diff/slope_diff
+    return roots, np.isfinite(roots) & (roots > starts) & (roots < ends)
@@ -0,0 +1,341 @@
+"""Local HTTP server that answers ttk questions from precomputed tables.
+
+Every preset arsenal is built once when the server starts and the ttk and btk
+of each of its guns worked out on a dense grid of distances. Queries are then
+just lookups and sorts of those tables, so they take microseconds rather than
+the time it takes to start a script. Distances between grid points are
+rounded to the nearest one, and the distance used is given in the response.
+
+All queries are GETs that return json. 'data' is the preset arsenal,
+defaulting to ttk_dat, and 'ads' is 1 to include the aim down sights time:
+
+    /ttk?gun=MP7&dist=85&ads=1          - the ttk and btk of a gun
+    /rank?dist=85&top=5&weapons=AR,SMG  - the guns fastest to kill at dist
+    /rank?min=20&max=60                 - the guns with the lowest mean ttk
+                                          over a range of distances
+    /curve?gun=MP7&min=0&max=50         - the ttk of a gun over a range
+
+Bad queries get a 400 with an "error" message, as do request or header lines
+longer than the stream's limit, after which the connection is closed.
+Connections are kept open between requests unless the client asks for them to
+be closed.
+
+Classes:
+--------
+TtkTables - the precomputed tables of an arsenal and the queries on them.
+TtkServer - the asyncio server answering queries from the tables.
+
+Functions:
+----------
+build_tables() - return the tables of every preset arsenal.
+main()         - serve the tables on the address given on the command line.
+"""
+
+import argparse
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+import ttk_matrix
+from preset_arsenals import ARSENALS
+
+_DEFAULT_DATA = "ttk_dat"
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed"}
+# how long to read and throw away what's left of a request that was too long
+# before closing, so the client gets the 400 rather than a reset connection
+_LINGER_S = 1
+
+
+class TtkTables():
+    """The ttk and btk of an arsenal's guns on a grid of distances.
+
+    Instance Variables:
+    -------------------
+    names    - list of str, the gun name of each row
+    dists    - np.ndarray, the distance of each column
+    btk      - np.ndarray (guns x distances), bullets to kill
+    ttk      - np.ndarray (guns x distances), time to kill in ms without the
+               aim down sights time
+    aim_down - np.ndarray (guns x 1), the aim down sights time of each gun in
+               ms
+    """
+
+    def __init__(self, arsenal, max_dist=300, step=0.1):
+        """Work out the tables of the arsenal's guns from 0 to max_dist."""
+        self._arsenal = arsenal
+        guns = ttk_matrix._gun_list(arsenal)
+        self.step = step
+        dists = np.round(np.arange(0, max_dist + step/2, step), 6)
+        table = ttk_matrix.ttk_matrix(guns, dists)
+        self.names = table["names"]
+        self.dists = table["dists"]
+        self.btk = table["btk"]
+        self.ttk = table["ttk"]
+        self.aim_down = np.array([[gun.aim_down*1000] for gun in guns])
+        self._rows = {name: row for row, name in enumerate(self.names)}
+
+    def _column(self, dist):
+        """Return the column of the grid distance nearest dist.
+
+        Raises:
+        -------
+        ValueError - if dist is outside the grid.
+        """
+        if not 0 <= dist <= self.dists[-1]:
+            raise ValueError(f"dist must be between 0 and {self.dists[-1]:g}.")
+        return int(round(dist/self.step))
+
+    def _columns(self, min_dist, max_dist):
+        """Return the slice of the columns from min_dist to max_dist."""
+        if min_dist > max_dist:
+            raise ValueError("min must not be more than max.")
+        return slice(self._column(min_dist), self._column(max_dist) + 1)
+
+    def _row(self, name):
+        """Return the row of the named gun, raising ValueError if unknown."""
+        try:
+            return self._rows[name]
+        except KeyError:
+            raise ValueError(f"There is no gun called '{name}'.") from None
+
+    def _ttk(self, rows, cols, inc_ads):
+        """Return the ttk of the rows at the cols, with ads time if asked."""
+        ttk = self.ttk[rows, cols]
+        if inc_ads:
+            aim_down = self.aim_down[rows, 0]
+            if isinstance(cols, slice):
+                aim_down = aim_down[..., None]
+            # ttk_matrix adds the ads time last, so this matches it exactly
+            ttk = ttk + aim_down
+        return ttk
+
+    def gun_ttk(self, name, dist, inc_ads=False):
+        """Return a dict of the ttk and btk of the named gun at dist."""
+        row, col = self._row(name), self._column(dist)
+        return {"gun": name, "dist": float(self.dists[col]),
+                "ttk": float(self._ttk(row, col, inc_ads)),
+                "btk": int(self.btk[row, col])}
+
+    def _weapon_rows(self, weapons):
+        """Return the rows of the guns or gun types in weapons, all if None."""
+        if weapons is None:
+            return np.arange(len(self.names))
+        guns, _ = self._arsenal.get_guns_or_types_and_return_valid_names(
+            weapons)
+        return np.array([self._rows[gun.name] for gun in guns], dtype=int)
+
+    def rank(self, dist=None, dist_range=None, inc_ads=False, weapons=None,
+             top=None):
+        """Return the guns fastest to kill at dist or over dist_range.
+
+        Over a range the guns are ranked by their mean ttk across it. Ties
+        keep the order of the arsenal.
+
+        Returns:
+        --------
+        list of dict with the gun name and its ttk (or mean ttk), fastest
+        first.
+        """
+        if (dist is None) == (dist_range is None):
+            raise ValueError("Give either dist or both min and max.")
+        rows = self._weapon_rows(weapons)
+        if dist is not None:
+            ttks = self._ttk(rows, self._column(dist), inc_ads)
+        else:
+            cols = self._columns(*dist_range)
+            ttks = self._ttk(rows, cols, inc_ads).mean(axis=1)
+        order = np.argsort(ttks, kind="stable")[:top]
+        return [{"gun": self.names[rows[i]], "ttk": float(ttks[i])}
+                for i in order]
+
+    def curve(self, name, min_dist, max_dist, inc_ads=False):
+        """Return a dict of the named gun's ttk over the range."""
+        row, cols = self._row(name), self._columns(min_dist, max_dist)
+        return {"gun": name, "dists": self.dists[cols].tolist(),
+                "ttk": self._ttk(row, cols, inc_ads).tolist()}
+
+
+def build_tables(max_dist=300, step=0.1):
+    """Return a dict of preset arsenal name -> TtkTables of its guns."""
+    return {data: TtkTables(make_arsenal(), max_dist=max_dist, step=step)
+            for data, make_arsenal in ARSENALS.items()}
+
+
+class TtkServer():
+    """Answers ttk queries over HTTP from precomputed tables.
+
+    Instance Variables:
+    -------------------
+    tables - dict of preset arsenal name -> TtkTables
+    """
+
+    def __init__(self, tables):
+        """Serve the given tables, see 'build_tables'."""
+        self.tables = tables
+
+    def query(self, target):
+        """Return the (status, json body) answering the request target.
+
+        Inputs:
+        -------
+        target - str, the path and query string, eg: '/ttk?gun=MP7&dist=85'
+        """
+        url = urlsplit(target)
+        params = {key: values[-1]
+                  for key, values in parse_qs(url.query).items()}
+        handlers = {"/ttk": self._ttk_query, "/rank": self._rank_query,
+                    "/curve": self._curve_query}
+        if url.path not in handlers:
+            return 404, {"error": f"Unknown query '{url.path}'."}
+        try:
+            data = params.get("data", _DEFAULT_DATA)
+            if data not in self.tables:
+                raise ValueError(f"There is no data called '{data}'.")
+            return 200, handlers[url.path](self.tables[data], params)
+        except (KeyError, ValueError) as err:
+            if isinstance(err, KeyError):
+                err = f"Missing the '{err.args[0]}' parameter."
+            return 400, {"error": str(err)}
+
+    @staticmethod
+    def _ttk_query(tables, params):
+        return tables.gun_ttk(params["gun"], float(params["dist"]),
+                              inc_ads=params.get("ads") == "1")
+
+    @staticmethod
+    def _rank_query(tables, params):
+        dist = float(params["dist"]) if "dist" in params else None
+        dist_range = None
+        if "min" in params or "max" in params:
+            dist_range = (float(params["min"]), float(params["max"]))
+        weapons = params["weapons"].split(",") if "weapons" in params else None
+        top = int(params["top"]) if "top" in params else None
+        return {"ranking": tables.rank(dist=dist, dist_range=dist_range,
+                                       inc_ads=params.get("ads") == "1",
+                                       weapons=weapons, top=top)}
+
+    @staticmethod
+    def _curve_query(tables, params):
+        return tables.curve(params["gun"], float(params["min"]),
+                            float(params["max"]),
+                            inc_ads=params.get("ads") == "1")
+
+    @staticmethod
+    async def _respond(writer, status, body, keep_alive):
+        """Write the response with the json body and wait for it to be sent."""
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+            "\r\n\r\n".encode() + payload)
+        await writer.drain()
+
+    @staticmethod
+    async def _discard_input(reader):
+        """Read and throw away what the client sends until it stops."""
+        while await reader.read(2**16):
+            pass
+
+    async def handle_connection(self, reader, writer):
+        """Answer the requests sent on a connection until it is closed.
+
+        A line too long for the reader's limit can't be told apart from the
+        rest of the request, so it is answered with a 400 and the connection
+        closed.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                if request_line in (b"\r\n", b"\n"):
+                    continue  # stray line ends between requests are allowed
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip().lower()
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:
+                    status, body = 400, {"error": "Malformed request."}
+                elif parts[0] != "GET":
+                    status, body = 405, {"error": "Only GET is supported."}
+                else:
+                    status, body = self.query(parts[1])
+                keep_alive = (len(parts) == 3 and parts[2] == "HTTP/1.1"
+                              and headers.get("connection") != "close")
+                await self._respond(writer, status, body, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.LimitOverrunError, asyncio.IncompleteReadError,
+                ValueError):
+            # readline raises ValueError for a line over the limit
+            try:
+                await self._respond(writer, 400,
+                                    {"error": "Request line or header too"
+                                     " long."}, False)
+                if writer.can_write_eof():
+                    writer.write_eof()
+                await asyncio.wait_for(self._discard_input(reader), _LINGER_S)
+            except (ConnectionError, asyncio.TimeoutError):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080, unix_path=None):
+        """Start serving on host and port, or on a unix socket if given one.
+
+        Returns:
+        --------
+        asyncio.Server: the running server, close it to stop serving.
+        """
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_connection,
+                                                   path=unix_path)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def _serve(args):
+    """Build the tables and serve them until cancelled."""
+    server = await TtkServer(build_tables(max_dist=args.max_dist,
+                                          step=args.step)).start(
+        host=args.host, port=args.port, unix_path=args.unix)
+    address = args.unix
+    if address is None:
+        address = f"http://{args.host}:{server.sockets[0].getsockname()[1]}"
+    print(f"Serving ttk queries on {address}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    """Serve the ttk tables on the address given on the command line."""
+    parser = argparse.ArgumentParser(description="Answer ttk queries over"
+                                     " HTTP from precomputed tables.")
+    parser.add_argument('--host', type=str, default="127.0.0.1",
+                        help="The address to listen on.")
+    parser.add_argument('--port', type=int, default=8080,
+                        help="The port to listen on.")
+    parser.add_argument('--unix', type=str, default=None,
+                        help="Listen on this unix socket instead of a port.")
+    parser.add_argument('--max_dist', type=float, default=300,
+                        help="The furthest distance the tables go to.")
+    parser.add_argument('--step', type=float, default=0.1,
+                        help="The distance between the points of the tables.")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
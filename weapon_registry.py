@@ -0,0 +1,217 @@
+"""Loads the weapon and weapon category stats from weapons.json.
+
+The stats of every weapon live in one table, weapons.json, rather than in a
+class each. gun_obj.py builds its weapon classes from it. Parsing and checking
+the table is only done when the file changes: the result is pickled into the
+cache directory (see ttk_cache.py) and read back from there on later imports.
+Like python's bytecode, it isn't written if sys.dont_write_bytecode is set,
+eg: by PYTHONDONTWRITEBYTECODE.
+
+The table has three sections:
+    categories - class name -> gun_type, head_mult, min_co and val_barrels
+    weapons    - class name -> category, name, dam, falloff (start and end of
+                 the falloff range), rof, velocity, aim_down and optionally
+                 val_barrels, which replaces the category's.
+    patches    - list of balance patches, oldest first. Each has a "patch"
+                 name and "weapons": class name -> the stats the patch changed.
+                 A weapon added by a patch gives all its stats.
+
+The weapons section holds the stats before the first listed patch, known as
+the "base" patch. The stats as of a patch are those plus the changes of every
+patch up to and including it. Attachments are referred to by their gun_obj
+class name, eg: "HeavyBarrel".
+
+Functions:
+----------
+load_registry() - return the categories, weapons and patches in the table.
+patch_names()   - return the names of the patches, oldest first.
+weapons_as_of() - return the stats of every weapon as of a patch.
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+
+import file_sys
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "weapons.json")
+
+BASE_PATCH = "base"
+
+# bump if the layout of the snapshot or the checks below change
+_SNAPSHOT_FORMAT = 2
+_CATEGORY_KEYS = {"gun_type", "head_mult", "min_co", "val_barrels"}
+_WEAPON_KEYS = {"category", "name", "dam", "falloff", "rof", "velocity",
+                "aim_down"}
+_OPTIONAL_WEAPON_KEYS = {"val_barrels"}
+_PATCH_KEYS = {"patch", "weapons"}
+
+
+def _check_entry(section, cls_name, entry, required, optional=frozenset()):
+    """Raise ValueError if the entry is missing keys or has unknown ones."""
+    missing = required - entry.keys()
+    unknown = entry.keys() - required - optional
+    if missing or unknown:
+        raise ValueError(f"{section} entry '{cls_name}' is missing"
+                         f" {sorted(missing)} or has unknown {sorted(unknown)}.")
+
+def _check_weapon(cls_name, weapon, categories):
+    """Raise ValueError if the weapon's stats are malformed."""
+    _check_entry("Weapon", cls_name, weapon, _WEAPON_KEYS,
+                 _OPTIONAL_WEAPON_KEYS)
+    if weapon["category"] not in categories:
+        raise ValueError(f"Weapon '{cls_name}' has unknown category"
+                         f" '{weapon['category']}'.")
+    falloff_start, falloff_end = weapon["falloff"]
+    if not 0 <= falloff_start < falloff_end:
+        raise ValueError(f"Weapon '{cls_name}' falloff must start before"
+                         " it ends.")
+
+def _parse(path):
+    """Return the checked contents of the table at path.
+
+    Raises:
+    -------
+    ValueError - if an entry has missing or unknown keys, a weapon's category
+                 isn't in the table, its falloff range is backwards or two
+                 patches have the same name.
+    """
+    import json     # only needed when the snapshot is out of date
+
+    with open(path, encoding="utf-8") as table:
+        registry = json.load(table)
+    registry.setdefault("patches", [])
+    for cls_name, category in registry["categories"].items():
+        _check_entry("Category", cls_name, category, _CATEGORY_KEYS)
+    for cls_name, weapon in registry["weapons"].items():
+        _check_weapon(cls_name, weapon, registry["categories"])
+
+    names = [BASE_PATCH]
+    for patch in registry["patches"]:
+        _check_entry("Patch", patch.get("patch"), patch, _PATCH_KEYS)
+        if patch["patch"] in names:
+            raise ValueError(f"Patch '{patch['patch']}' is listed twice.")
+        names.append(patch["patch"])
+        # every patch has to leave the weapons it touches complete
+        weapons = weapons_as_of(registry, patch["patch"])
+        for cls_name in patch["weapons"]:
+            _check_weapon(cls_name, weapons[cls_name], registry["categories"])
+    return registry
+
+def _snapshot_prefix(path):
+    """Return the start of the file names of the snapshots of the table."""
+    path_hash = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(file_sys.cache_dir(), "registry",
+                        f"{os.path.basename(path)}-{path_hash[:16]}-")
+
+def _snapshot_path(path, stat):
+    """Return where the snapshot of the table at path is kept.
+
+    The name has the table's mtime and size in it, so an edited table never
+    reads back the snapshot of its old contents.
+    """
+    return f"{_snapshot_prefix(path)}{stat.st_mtime_ns}-{stat.st_size}.pickle"
+
+def _read_snapshot(snapshot_path, signature):
+    """Return the snapshot if it was taken of the same file, else None."""
+    try:
+        with open(snapshot_path, "rb") as snapshot:
+            saved_signature, registry = pickle.load(snapshot)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if saved_signature != signature:
+        return None
+    return registry
+
+def _write_snapshot(snapshot_path, signature, registry, old_prefix):
+    """Save the snapshot, giving up quietly if it can't be written.
+
+    The other snapshots whose names start with old_prefix, those of older
+    versions of the table, are deleted.
+    """
+    import glob
+    import tempfile
+
+    if sys.dont_write_bytecode:
+        return
+    try:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(snapshot_path),
+                                        suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            pickle.dump((signature, registry), tmp_file,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    for old_path in glob.glob(glob.escape(old_prefix) + "*.pickle"):
+        if old_path != snapshot_path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+def load_registry(path=REGISTRY_PATH):
+    """Return the categories, weapons and patches in the table at path.
+
+    The snapshot is used if the table hasn't changed since it was taken,
+    otherwise the table is parsed and a new snapshot taken.
+
+    Returns:
+    --------
+    dict with the keys "categories" and "weapons", each a dict of class name
+    -> stats in the order they appear in the table, and "patches", the list of
+    patches.
+
+    Raises:
+    -------
+    ValueError - if the table is malformed, see '_parse'.
+    """
+    stat = os.stat(path)
+    signature = (_SNAPSHOT_FORMAT, stat.st_mtime_ns, stat.st_size)
+    snapshot_path = _snapshot_path(path, stat)
+    registry = _read_snapshot(snapshot_path, signature)
+    if registry is None:
+        registry = _parse(path)
+        _write_snapshot(snapshot_path, signature, registry,
+                        _snapshot_prefix(path))
+    return registry
+
+def patch_names(registry):
+    """Return the names of the patches in the registry, oldest first."""
+    return [BASE_PATCH] + [patch["patch"] for patch in registry["patches"]]
+
+def weapons_as_of(registry, patch=None):
+    """Return the stats of every weapon as of the patch.
+
+    Inputs:
+    -------
+    registry - dict, as returned by 'load_registry'
+    patch    - str, the name of the patch, defaults to the latest one
+
+    Returns:
+    --------
+    dict of class name -> stats. Weapons added after the patch are left out.
+
+    Raises:
+    -------
+    ValueError - if the registry has no patch with that name.
+    """
+    names = patch_names(registry)
+    if patch is None:
+        patch = names[-1]
+    if patch not in names:
+        raise ValueError(f"There is no patch called '{patch}'.")
+    weapons = {cls_name: dict(stats)
+               for cls_name, stats in registry["weapons"].items()}
+    for applied in registry["patches"][:names.index(patch)]:
+        for cls_name, changes in applied["weapons"].items():
+            weapons.setdefault(cls_name, {}).update(changes)
+    return weapons